@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+import numpy as np
+from pathlib import Path
+import configparser
+import argparse
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import json
+import time
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+GRAPHS_SCRIPT = CURRENT_DIR + "/graphs.py"
+TESTS_DIR = CURRENT_DIR + "/tests"
+FIO_CONFIG = TESTS_DIR + "/fio-job.cfg"
+HISTORY_FILE = CURRENT_DIR + "/benchmark_history.json"
+
+SEED = 29047
+KiB = 1024
+MiB = 1024 * KiB
+
+# file systems with the device their df line is read from, see graphs.py
+FS_MOUNT_POINTS = {
+    "btrfs": "/dev/loop0",
+    "copyfs": "/dev/sda1",
+    "nilfs": "/dev/loop0",
+    "nilfs-dedup": "/dev/loop0",
+    "waybackfs": "/dev/sda1",
+}
+
+# mean bandwidth of sequential reads in KiB/s and the slowdown of every loop
+# over the same file, versioning file systems keep the old versions around
+FS_PROFILES = {
+    "btrfs": (220_000, 0.00),
+    "copyfs": (60_000, 0.03),
+    "nilfs": (150_000, 0.02),
+    "nilfs-dedup": (140_000, 0.02),
+    "waybackfs": (45_000, 0.04),
+}
+
+DEDUP_TOOLS = [
+    ("dedup", "nilfs-dedup", "dedup/dedup"),
+    ("duperemove", "btrfs", "dedup/duperemove"),
+    ("dduper", "btrfs", "dedup/dduper"),
+]
+
+# graphs.py stages reported in the history, plot export is timed separately
+STAGES = ["ingest", "bonnie", "fio", "dedup"]
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler())
+
+
+@dataclass
+class Scale:
+    fio_size: str = "64MiB"
+    bonnie_runs: int = 10
+    dedup_sizes: int = 64
+
+    # graphs.py compares the checksum validation of files from 208M up
+    min_dedup_sizes = 13
+
+    @staticmethod
+    def parse_dedup_sizes(value: str) -> int:
+        sizes = int(value)
+        if sizes < Scale.min_dedup_sizes:
+            raise argparse.ArgumentTypeError(
+                f"at least {Scale.min_dedup_sizes} sizes, graphs.py needs files of "
+                f"{16 * Scale.min_dedup_sizes}M"
+            )
+        return sizes
+
+
+class SyntheticResults:
+    """
+    Writes fake fs/<fs>/out trees in the formats produced by the test scripts,
+    so graphs.py can be benchmarked without running the virtual machines. The
+    numbers are random but shaped like real runs: file systems differ in speed,
+    versioning file systems slow down with every fio loop and the first I/Os
+    of a test are slower than the steady state.
+    """
+
+    fio_tests = {
+        "sequential_read_test": (1.0, 0),
+        "sequential_write_test": (0.7, 1),
+        "random_read_test": (0.3, 0),
+        "random_write_test": (0.2, 1),
+    }
+    warm_up = 0.02  # part of the I/Os of a test before the steady state
+    chunk_size = 100_000  # fio log lines formatted at once
+
+    def __init__(self, root: str, scale: Scale, seed: int = SEED):
+        self.root = root
+        self.scale = scale
+        self.rng = np.random.default_rng(seed)
+
+        config = configparser.ConfigParser()
+        config.read(FIO_CONFIG)
+        self.fio_config = config
+        self.block_size = parse_size(config["global"]["blocksize"])
+        self.loops = int(config["global"]["loops"])
+        self.file_size = parse_size(scale.fio_size)
+        self.lines = 0
+
+    def generate(self):
+        start = time.perf_counter()
+        self.__write_fio_config()
+        for fs_type in FS_MOUNT_POINTS:
+            self.__bonnie(fs_type)
+            self.__fio(fs_type)
+
+        for tool, fs_type, output_dir in DEDUP_TOOLS:
+            self.__dedup(tool, fs_type, f"{self.root}/fs/{fs_type}/out/{output_dir}")
+
+        logger.info(
+            f"Generated {self.lines} fio log lines in {self.root} in {time.perf_counter() - start:.2f} s"
+        )
+
+    def __write_fio_config(self):
+        # graphs.py splits the fio logs into loops by the size of the job file
+        self.fio_config["global"]["size"] = self.scale.fio_size
+        os.makedirs(f"{self.root}/tests", exist_ok=True)
+        with open(f"{self.root}/tests/fio-job.cfg", "w") as file:
+            self.fio_config.write(file, space_around_delimiters=False)
+
+    def __bonnie(self, fs_type: str):
+        out_dir = f"{self.root}/fs/{fs_type}/out/bonnie"
+        os.makedirs(out_dir, exist_ok=True)
+        bandwidth, _ = FS_PROFILES[fs_type]
+
+        used = int(self.rng.integers(1, 5) * MiB)
+        with open(f"{out_dir}/out.csv", "w") as csv, open(
+            f"{out_dir}/df_before_bonnie.txt", "w"
+        ) as before, open(f"{out_dir}/df_after_bonnie.txt", "w") as after:
+            for run in range(self.scale.bonnie_runs):
+                before.write(self.__df(fs_type, used))
+                csv.write(self.__bonnie_line(fs_type, bandwidth, run))
+                used += int(self.rng.integers(0, 64) * KiB)
+                after.write(self.__df(fs_type, used))
+
+    def __bonnie_line(self, fs_type: str, bandwidth: float, run: int) -> str:
+        def noisy(mean: float) -> int:
+            return max(1, int(mean * self.rng.lognormal(0, 0.15)))
+
+        def cpu() -> int:
+            return int(self.rng.integers(1, 99))
+
+        io = [
+            noisy(bandwidth * 0.005),  # putc
+            cpu(),
+            noisy(bandwidth * 0.6),  # put_block
+            cpu(),
+            noisy(bandwidth * 0.3),  # rewrite
+            cpu(),
+            noisy(bandwidth * 0.007),  # getc
+            cpu(),
+            noisy(bandwidth),  # get_block
+            cpu(),
+            noisy(bandwidth * 0.002),  # seeks
+            cpu(),
+        ]
+        # stat and delete of 32 files are too fast to be measured on any run
+        files = []
+        for name in ["create", "stat", "delete"] * 2:
+            if name == "create" or self.rng.random() < 0.2:
+                files += [noisy(bandwidth * 0.1), cpu()]
+            else:
+                files += ["+++++", "+++"]
+
+        latencies = [
+            format_latency(self.rng.lognormal(np.log(mean), 1.0))
+            for mean in [50, 2_000, 300_000, 40, 3_000, 150_000] + [800, 50] * 3
+        ]
+        timestamp = 1686000000 + run * 3600
+        fields = ["1.98", "1.98", fs_type, 1, timestamp, "1G", 4096, 8192, 5]
+        fields += io + [32, "", "", "", ""] + files + latencies
+        return ",".join(map(str, fields)) + "\n"
+
+    def __fio(self, fs_type: str):
+        out_dir = f"{self.root}/fs/{fs_type}/out/fio"
+        os.makedirs(out_dir, exist_ok=True)
+        bandwidth, slowdown = FS_PROFILES[fs_type]
+
+        used = int(self.rng.integers(1, 5) * MiB)
+        for test, (speed, direction) in self.fio_tests.items():
+            with open(f"{out_dir}/df_before_fio_{test}.txt", "w") as file:
+                file.write(self.__df(fs_type, used))
+            self.__fio_logs(
+                f"{out_dir}/{test}",
+                bandwidth * speed,
+                slowdown if direction == 1 else 0,
+                direction,
+                random="random" in test,
+            )
+            # the test file stays, versioning file systems also keep the writes
+            used += self.file_size // KiB
+            if direction == 1:
+                used += int(self.file_size // KiB * self.loops * slowdown * 10)
+            with open(f"{out_dir}/df_after_fio_{test}.txt", "w") as file:
+                file.write(self.__df(fs_type, used))
+
+    def __fio_logs(
+        self,
+        prefix: str,
+        bandwidth: float,
+        slowdown: float,
+        direction: int,
+        random: bool,
+    ):
+        blocks = self.file_size // self.block_size
+        count = blocks * self.loops
+        loop = np.arange(count) // blocks
+        ramp = np.minimum(1, 0.3 + 0.7 * np.arange(count) / (count * self.warm_up))
+
+        bw = bandwidth * ramp * (1 - slowdown) ** loop
+        bw = np.maximum(1, bw * self.rng.lognormal(0, 0.25, count))
+        clat = self.block_size / (bw * KiB) * 1e9 * self.rng.lognormal(0, 0.1, count)
+        slat = self.rng.lognormal(np.log(2_000), 0.5, count)
+        lat = clat + slat
+        when = np.cumsum(lat) / 1e6  # ms since the start of the job
+
+        if random:
+            offsets = np.concatenate(
+                [self.rng.permutation(blocks) for _ in loop[::blocks]]
+            )
+        else:
+            offsets = np.arange(count) % blocks
+        offsets *= self.block_size
+
+        values = {
+            "bw": bw,
+            "iops": np.maximum(1, bw * KiB / self.block_size),
+            "lat": lat,
+            "clat": clat,
+            "slat": slat,
+        }
+        for log_type, value in values.items():
+            columns = np.column_stack(
+                [
+                    when.astype(np.int64),
+                    value.astype(np.int64),
+                    np.full(count, direction),
+                    np.full(count, self.block_size),
+                    offsets,
+                ]
+            )
+            self.__write_log(f"{prefix}_{log_type}.1.log", columns)
+
+    def __write_log(self, path: str, columns: np.ndarray):
+        with open(path, "w") as file:
+            for start in range(0, len(columns), self.chunk_size):
+                chunk = columns[start : start + self.chunk_size]
+                line = "%d, %d, %d, %d, %d\n"
+                file.write(line * len(chunk) % tuple(chunk.ravel().tolist()))
+        self.lines += len(columns)
+
+    def __dedup(self, tool: str, fs_type: str, out_dir: str):
+        os.makedirs(out_dir, exist_ok=True)
+        # dduper deduplicates only part of the blocks of the files
+        ratio = {"dedup": 0.98, "duperemove": 0.95, "dduper": 0.6}[tool]
+
+        with open(f"{out_dir}/time-whole.csv", "w") as whole, open(
+            f"{out_dir}/time-csum-validate.csv", "w"
+        ) as validate:
+            whole.write(
+                "real-time,system-time,user-time,max-memory,file-size,file-name\n"
+            )
+            validate.write(
+                "real-time,system-time,user-time,max-memory,file-size,file-name,when\n"
+            )
+            for step in range(1, self.scale.dedup_sizes + 1):
+                size = 16 * step  # MiB
+                used = int(self.rng.integers(1, 5) * MiB)
+                with open(
+                    f"{out_dir}/df_before_deduplication_{tool}_{size}M.txt", "w"
+                ) as file:
+                    file.write(self.__df(fs_type, used + 2 * size * KiB))
+                saved = int(size * KiB * ratio * self.rng.uniform(0.97, 1.0))
+                with open(
+                    f"{out_dir}/df_after_deduplication_{tool}_{size}M.txt", "w"
+                ) as file:
+                    file.write(self.__df(fs_type, used + 2 * size * KiB - saved))
+
+                real = size * 0.02 * self.rng.lognormal(0, 0.1)
+                memory = int(3_000 + size * 40 * self.rng.lognormal(0, 0.05))
+                whole.write(
+                    f"{real:.2f},{real * 0.4:.2f},{real * 0.3:.2f},{memory},{size}M,f\n"
+                )
+                for file_name in ("f1", "f2"):
+                    for when in ("before", "after"):
+                        # reading deduplicated extents is a bit slower
+                        real = size * 0.004 * (1.2 if when == "after" else 1)
+                        real *= self.rng.lognormal(0, 0.1)
+                        validate.write(
+                            f"{real:.2f},{real * 0.1:.2f},{real * 0.8:.2f},2048,{size}M,{file_name},{when}\n"
+                        )
+
+    def __df(self, fs_type: str, used: int) -> str:
+        """Output of df in 1K blocks, used is the space on the tested device"""
+        device = FS_MOUNT_POINTS[fs_type]
+        rows = [
+            ("udev", 4_000_000, 0, "/dev"),
+            ("tmpfs", 800_000, 1_000, "/run"),
+            ("/dev/sda1", 41_000_000, 9_000_000, "/"),
+            ("tmpfs", 4_000_000, 0, "/dev/shm"),
+        ]
+        if device == "/dev/sda1":
+            rows[2] = ("/dev/sda1", 41_000_000, 9_000_000 + used, "/")
+        else:
+            rows.append((device, 20 * MiB, used, "/mnt"))
+
+        lines = ["Filesystem     1K-blocks     Used Available Use% Mounted on"]
+        for name, size, used_blocks, mount in rows:
+            available = size - used_blocks
+            percent = -(-100 * used_blocks // size)
+            lines.append(
+                f"{name:<14} {size:>9} {used_blocks:>8} {available:>9} {percent:>3}% {mount}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+class GraphsBenchmark:
+    """
+    Times graphs.py on generated results in a scratch directory, so the
+    outputs of the repository are left alone, and appends the timings of
+    every stage to a JSON history.
+    """
+
+    def __init__(self, work_dir: str, scale: Scale, repeat: int, graphs_args: list):
+        self.work_dir = work_dir
+        self.scale = scale
+        self.repeat = repeat
+        self.graphs_args = graphs_args
+
+    def run(self) -> dict:
+        generator = SyntheticResults(self.work_dir, self.scale)
+        start = time.perf_counter()
+        generator.generate()
+        generate_time = time.perf_counter() - start
+        shutil.copy(GRAPHS_SCRIPT, self.work_dir)
+        for path in Path(TESTS_DIR).iterdir():
+            # keep the job file of the generated fio logs
+            if path.is_file() and path.name != "fio-job.cfg":
+                shutil.copy(path, f"{self.work_dir}/tests")
+
+        self.__check_export()
+        runs = [self.__run_graphs(i) for i in range(self.repeat)]
+        return {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "scale": asdict(self.scale),
+            "data": {
+                "fio_log_lines": generator.lines,
+                "bytes": directory_size(f"{self.work_dir}/fs"),
+                "generate_time": generate_time,
+            },
+            "graphs_args": self.graphs_args,
+            "runs": runs,
+            "median": GraphsBenchmark.median(runs),
+        }
+
+    def __check_export(self):
+        """Raster figures are cropped by graphs.py itself, as savefig would"""
+        os.makedirs(f"{self.work_dir}/logs", exist_ok=True)
+        process = subprocess.run(
+            [sys.executable, "graphs.py", "--check-export"],
+            cwd=self.work_dir,
+            env=os.environ | {"MPLBACKEND": "Agg"},
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"Tight crop of graphs.py does not match savefig:\n{process.stdout}{process.stderr}"
+            )
+
+    def __run_graphs(self, index: int) -> dict:
+        timings = f"{self.work_dir}/timings.json"
+        command = [sys.executable, "graphs.py", "--force", "--timings", timings]
+        command += self.graphs_args
+        logger.info(f"Run {index + 1}/{self.repeat}: {' '.join(command[1:])}")
+
+        os.makedirs(f"{self.work_dir}/logs", exist_ok=True)
+        with open(f"{self.work_dir}/logs/benchmark.log", "a") as log:
+            process = subprocess.run(
+                command,
+                cwd=self.work_dir,
+                env=os.environ | {"MPLBACKEND": "Agg"},
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"graphs.py exited with status {process.returncode}, see {self.work_dir}/logs/benchmark.log"
+            )
+
+        with open(timings) as file:
+            return json.load(file)
+
+    @staticmethod
+    def median(runs: list[dict]) -> dict:
+        def stage_time(run: dict, stage: str) -> float:
+            return run["stages"].get(stage, {}).get("wall_time", 0.0)
+
+        median = {
+            stage: statistics.median(stage_time(run, stage) for run in runs)
+            for stage in STAGES
+        }
+        median["plot_export"] = statistics.median(
+            run["plot_export"]["cpu_time"] for run in runs
+        )
+        median["total"] = statistics.median(run["total_time"] for run in runs)
+        median["peak_rss_mib"] = statistics.median(
+            max(run["peak_rss"].values()) / MiB for run in runs
+        )
+        return median
+
+
+def parse_size(size: str) -> int:
+    # same suffixes as parse_size of graphs.py, kept here to not import it
+    size = size.strip().lower().removesuffix("b").removesuffix("i")
+    units = " kmgtp"
+    if size[-1] in units:
+        return int(size[:-1]) * 1024 ** units.index(size[-1])
+    return int(size)
+
+
+def format_latency(latency_us: float) -> str:
+    """Latency as printed by bonnie++, with the unit keeping at most 4 digits"""
+    if latency_us < 10_000:
+        return f"{int(latency_us)}us"
+    if latency_us < 10_000_000:
+        return f"{int(latency_us / 1_000)}ms"
+    return f"{int(latency_us / 1_000_000)}s"
+
+
+def directory_size(directory: str) -> int:
+    return sum(
+        path.stat().st_size for path in Path(directory).rglob("*") if path.is_file()
+    )
+
+
+def git_commit() -> str | None:
+    process = subprocess.run(
+        ["git", "describe", "--always", "--dirty"],
+        cwd=CURRENT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    return process.stdout.strip() if process.returncode == 0 else None
+
+
+def load_history(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return json.load(file)
+
+
+def report(entry: dict, history: list[dict]):
+    # compare with the last entry run on the same data
+    previous = next(
+        (
+            old
+            for old in reversed(history)
+            if all(old[key] == entry[key] for key in ("scale", "cpus", "graphs_args"))
+        ),
+        None,
+    )
+    for name, value in entry["median"].items():
+        line = f"{name:>14}: {value:10.2f}"
+        if previous is not None and previous["median"].get(name):
+            change = value / previous["median"][name] - 1
+            line += f" ({change:+.1%} since {previous['commit']})"
+        logger.info(line)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="benchmark_graphs",
+        description="Benchmark graphs.py on synthetic results of the tests",
+    )
+    parser.add_argument(
+        "--fio-size",
+        default=Scale.fio_size,
+        help="size of the fio test file, every log has size / 4k * loops lines",
+    )
+    parser.add_argument(
+        "--bonnie-runs",
+        type=int,
+        default=Scale.bonnie_runs,
+        help="bonnie++ runs of every file system",
+    )
+    parser.add_argument(
+        "--dedup-sizes",
+        type=Scale.parse_dedup_sizes,
+        default=Scale.dedup_sizes,
+        help="file sizes of every deduplication tool, in steps of 16M, "
+        f"at least {Scale.min_dedup_sizes}",
+    )
+    parser.add_argument(
+        "--generate",
+        metavar="DIR",
+        help="only write the synthetic results into DIR",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=3,
+        help="runs of graphs.py, the history keeps the median",
+    )
+    parser.add_argument(
+        "--history",
+        default=HISTORY_FILE,
+        metavar="FILE",
+        help="JSON file the timings are appended to",
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="keep the scratch directory with the results and outputs",
+    )
+    parser.add_argument(
+        "graphs_args",
+        nargs=argparse.REMAINDER,
+        help="arguments passed to graphs.py after --, ex. -- -b fio -m 512",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scale = Scale(args.fio_size, args.bonnie_runs, args.dedup_sizes)
+    if args.generate is not None:
+        SyntheticResults(args.generate, scale).generate()
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="graphs-benchmark-")
+    graphs_args = [arg for arg in args.graphs_args if arg != "--"]
+    try:
+        entry = GraphsBenchmark(work_dir, scale, args.repeat, graphs_args).run()
+    finally:
+        if args.keep:
+            logger.info(f"Kept scratch directory {work_dir}")
+        else:
+            shutil.rmtree(work_dir)
+
+    history = load_history(args.history)
+    report(entry, history)
+    history.append(entry)
+    with open(args.history, "w") as file:
+        json.dump(history, file, indent=2)
+    logger.info(f"Appended results to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
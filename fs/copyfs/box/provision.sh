@@ -10,7 +10,7 @@ resize_partition() {
 packages() {
     apt-get update && \
         export DEBIAN_FRONTEND=noninteractive && \
-        apt-get install -y --allow-unauthenticated wget make g++ libfuse-dev
+        apt-get install -y --allow-unauthenticated wget make g++ libfuse-dev libaio-dev
 
     wget -O - http://cpanmin.us | perl - --self-upgrade
     sudo cpanm install Algorithm::Diff
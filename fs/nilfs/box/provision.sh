@@ -10,7 +10,7 @@ resize_partition() {
 apt_packages() {
     apt-get update && \
         export DEBIAN_FRONTEND=noninteractive && \
-        apt-get install -y --allow-unauthenticated nilfs-tools wget make g++
+        apt-get install -y --allow-unauthenticated nilfs-tools wget make g++ libaio-dev python3-numpy
 }
 
 bonnie() {
@@ -10,7 +10,7 @@ resize_partition() {
 apt_packages() {
     apt-get update && \
 	export DEBIAN_FRONTEND=noninteractive && \
-	apt-get install -y --allow-unauthenticated wget make g++ gcc libfuse-dev fuse pkg-config
+	apt-get install -y --allow-unauthenticated wget make g++ gcc libfuse-dev fuse pkg-config libaio-dev
 }
 
 bonnie() {
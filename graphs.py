@@ -2,20 +2,51 @@
 
 from dataclasses import dataclass
 from enum import Enum, StrEnum, auto
-import subprocess
-from multiprocessing import Pool, Process
-from itertools import repeat
-import matplotlib.pyplot as plt
+from multiprocessing import Pool
+import multiprocessing
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.transforms import Affine2D
+from PIL import Image
 import matplotlib.ticker as mtick
+from matplotlib.colors import to_rgba
 import numpy as np
 from pathlib import Path
 import shutil
 import os
+import re
 from numbers import Number
 import logging
+import hashlib
+import contextlib
+import cProfile
+import functools
+import pstats
+import tracemalloc
+import resource
+import json
+import sqlite3
 import pandas as pd
 import configparser
 import argparse
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import threading
+import time
+import sys
+import errno
+import gzip
+import io
+import tarfile
+import zlib
+from statistics import NormalDist
+
+try:
+    import zstandard
+except ImportError:  # needed only for zstd compressed results
+    zstandard = None
 
 
 class FilesystemType(Enum):
@@ -37,6 +68,8 @@ class ToolName(Enum):
     BONNIE_ALL = "bonnie-all"
     FIO = "fio"
     DEDUP = "dedup"
+    REGRESSION = "regression"
+    SCALING = "scaling"
 
 
 class FileExportType(Enum):
@@ -45,6 +78,8 @@ class FileExportType(Enum):
 
     SVG = "svg"
     JPG = "jpg"
+    PNG = "png"
+    WEBP = "webp"
     TEX = "tex"
 
 
@@ -83,6 +118,7 @@ LOG_DIR = CURRENT_DIR + "/logs"
 OUTPUT_DIR = CURRENT_DIR + "/output"
 GRAPHS_OUTPUT_DIR = f"{OUTPUT_DIR}/graphs"
 BONNIE_OUTPUT_DIR = f"{OUTPUT_DIR}/{ToolName.BONNIE}"
+PROFILE_OUTPUT_DIR = f"{OUTPUT_DIR}/profile"
 
 FIO_CONFIG = CURRENT_DIR + "/tests/fio-job.cfg"
 BONNIE_CONFIG = CURRENT_DIR + "/tests/test_env.sh"
@@ -93,477 +129,2040 @@ logger.addHandler(logging.FileHandler(f"{LOG_DIR}/graphs.log"))
 logger.addHandler(logging.StreamHandler())
 
 
-class PlotUnit(StrEnum):
-    PERCENT = auto()
-    SCALAR = auto()
+class BuildCache:
+    """Outputs of unchanged inputs, so their work is skipped between runs"""
 
+    hash_algorithm = "blake2b"
+    local = threading.local()
 
-class BarPlot:
-    out_dir_jpg = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.JPG}"
-    out_dir_svg = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.SVG}"
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.enabled = True
 
-    def __init__(
-        self,
-        x: list[str],
-        y: list[Number],
-        xlabel: str,
-        ylabel: str,
-        title: str,
-        filename: str,
-        tool_name: ToolName,
-        plot_unit: PlotUnit,
-    ):
-        self.x = x
-        self.y = y
-        self.xlabel = xlabel
-        self.ylabel = ylabel
-        self.title = title
-        self.filename = filename
-        self.plot_unit = plot_unit
+    class Target:
+        def __init__(self, cache: "BuildCache", name: str, digest: str):
+            self.cache = cache
+            self.name = name
+            self.digest = digest
+            self.outputs = []
 
-        self.out_dir_jpg += f"/{tool_name}"
-        self.out_dir_svg += f"/{tool_name}"
-        create_dir(self.out_dir_jpg)
-        create_dir(self.out_dir_svg)
-        self.out_jpg = f"{self.out_dir_jpg}/{self.filename}.{FileExportType.JPG}"
-        self.out_svg = f"{self.out_dir_svg}/{self.filename}.{FileExportType.SVG}"
+        def is_fresh(self) -> bool:
+            if not self.cache.enabled:
+                return False
 
-        self.__plot()
+            entry = self.cache.read_entry("targets", self.name)
+            if entry is None or entry["digest"] != self.digest:
+                return False
 
-    def __plot(self):
-        logger.info(
-            f"Generating {self.plot_unit} BarPlot: {self.out_jpg}, {self.out_svg}"
-        )
-        if self.plot_unit == PlotUnit.SCALAR:
-            self.__plot_scalar()
-        elif self.plot_unit == PlotUnit.PERCENT:
-            self.__plot_percent()
-        else:
-            raise RuntimeError(f"Unrecognized plot unit: {self.plot_unit}")
+            return all(os.path.exists(output) for output in entry["outputs"])
 
-    def __plot_scalar(self):
-        plt.bar(np.arange(len(self.y)), self.y, color="blue", edgecolor="black")
-        plt.xticks(np.arange(len(self.y)), self.x)
-        plt.xlabel(self.xlabel, fontsize=16)
-        plt.ylabel(self.ylabel, fontsize=16)
-        plt.title(self.title, fontsize=16)
-        plt.savefig(self.out_jpg, dpi=300)
-        plt.savefig(self.out_svg)
-        plt.cla()
-
-    def __plot_percent(self):
-        plt.bar(np.arange(len(self.y)), self.y, color="blue", edgecolor="black")
-        plt.gca().set_yticklabels([f"{x:.0%}" for x in plt.gca().get_yticks()])
-        plt.xticks(np.arange(len(self.y)), self.x)
-        plt.xlabel(self.xlabel, fontsize=16)
-        plt.ylabel(self.ylabel, fontsize=16)
-        plt.title(self.title, fontsize=16)
-        plt.savefig(self.out_jpg, dpi=300)
-        plt.savefig(self.out_svg)
-        plt.cla()
+        def __enter__(self):
+            BuildCache.active_targets().append(self)
+            return self
 
+        def __exit__(self, exc_type, exc_value, traceback):
+            BuildCache.active_targets().remove(self)
+            if exc_type is None:
+                entry = {"digest": self.digest, "outputs": self.outputs}
+                self.cache.write_entry("targets", self.name, entry)
 
-class TexTable:
-    def __init__(
-        self, df: pd.DataFrame, name: str, tool_name: ToolName, with_index: bool = True
-    ):
-        self.df = df
-        self.name = name
-        self.with_index = with_index
-        self.output_dir = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.TEX}/{tool_name}"
-        create_dir(self.output_dir)
+    def target(self, name: str, inputs: list[str], *extra) -> Target:
+        return BuildCache.Target(self, name, self.fingerprint(inputs, *extra))
 
-    def export(self):
-        filename = f"{self.output_dir}/{self.name}.{FileExportType.TEX}"
-        logger.info(f"Exporting latex table to {filename}")
-        self.df.to_latex(filename, index=self.with_index, float_format="%.2f")
+    @staticmethod
+    def active_targets() -> list[Target]:
+        # stages run concurrently, outputs belong to the targets of their thread
+        if not hasattr(BuildCache.local, "targets"):
+            BuildCache.local.targets = []
+        return BuildCache.local.targets
 
+    @staticmethod
+    def register_output(*paths: str):
+        for target in BuildCache.active_targets():
+            target.outputs.extend(paths)
+
+    def fingerprint(self, inputs: list[str], *extra) -> str:
+        digest = hashlib.new(self.hash_algorithm)
+        # changes in graph generation code invalidate all targets
+        for path in [os.path.abspath(__file__)] + inputs:
+            digest.update(f"{path}:{self.file_digest(path)}\n".encode())
+        # figures of other formats or resolution are other outputs
+        for value in extra + (EXPORT.profile(),):
+            digest.update(f"{value!r}\n".encode())
+
+        return digest.hexdigest()
+
+    def file_digest(self, path: str) -> str:
+        try:
+            path, member = SOURCES.resolve(path)
+        except FileNotFoundError:
+            return "missing"
+        if member is not None:
+            return member.digest
+
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.read_entry("files", key)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime_ns
+        ):
+            return entry["digest"]
+
+        logger.debug(f"Hashing input file {path}")
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, self.hash_algorithm).hexdigest()
+
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "digest": digest}
+        self.write_entry("files", key, entry)
+        return digest
+
+    def read_entry(self, kind: str, key: str):
+        try:
+            with open(self.__entry_path(kind, key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write_entry(self, kind: str, key: str, entry: dict):
+        # a file per entry, replaced at once, as threads and workers write them
+        path = self.__entry_path(kind, key)
+        create_dir(os.path.dirname(path))
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def __entry_path(self, kind: str, key: str):
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return f"{self.cache_dir}/{kind}/{name}.json"
+
+
+BUILD_CACHE = BuildCache(f"{OUTPUT_DIR}/cache")
+
+
+class ResultSources:
+    """Results read as plain, compressed or bundled files, by their plain path"""
+
+    compressions = (".gz", ".zst", ".fz")
+    bundles = (".tar.gz", ".tgz", ".tar.zst")
+    chunk_size = 2**20
+    max_cached_size = 2**20  # members read again from memory
+    max_cache_size = 256 * 2**20
+
+    @dataclass
+    class Member:
+        bundle: str
+        name: str
+        offset: int
+        size: int
+        mtime: int
+        digest: str
+
+    @dataclass
+    class Stat:
+        st_size: int
+        st_mtime_ns: int
+
+    class Slice(io.RawIOBase):
+        """Next size bytes of a stream"""
+
+        def __init__(self, stream, size: int):
+            self.stream = stream
+            self.remaining = size
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer) -> int:
+            data = self.stream.read(min(len(buffer), self.remaining))
+            buffer[: len(data)] = data
+            self.remaining -= len(data)
+            return len(data)
+
+    class ZlibStreams(io.RawIOBase):
+        """Concatenated zlib streams, the chunks of fio compressed logs (.fz)"""
+
+        def __init__(self, stream):
+            self.stream = stream
+            self.decompressor = zlib.decompressobj()
+            self.pending = memoryview(b"")
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer) -> int:
+            while len(self.pending) == 0:
+                data = b""
+                if self.decompressor.eof:
+                    data = self.decompressor.unused_data
+                    self.decompressor = zlib.decompressobj()
+                data = data or self.stream.read(ResultSources.chunk_size)
+                if not data:
+                    return 0
+                self.pending = memoryview(self.decompressor.decompress(data))
+
+            size = min(len(buffer), len(self.pending))
+            buffer[:size] = self.pending[:size]
+            self.pending = self.pending[size:]
+            return size
+
+    def __init__(self, root: str):
+        self.root = root
+        self.lock = threading.Lock()
+        self.members = None
+        self.scanned = set()
+        self.cache = {}
+        self.cache_size = 0
+
+    def resolve(self, path: str) -> tuple[str, Member | None]:
+        """File on disk holding path, with the member when it is a bundle"""
+        # ex. fs/btrfs/out/fio/random_read_test_bw.1.log is read from .log.gz,
+        # or from out/fio/random_read_test_bw.1.log.gz in fs/btrfs/out.tar.zst
+        if os.path.isfile(path):
+            return path, None
+        for suffix in self.compressions:
+            if os.path.isfile(path + suffix):
+                return path + suffix, None
+
+        member = self.__index().get(os.path.normpath(path))
+        if member is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return member.bundle, member
+
+    def exists(self, path: str) -> bool:
+        try:
+            self.resolve(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def stat(self, path: str):
+        file, member = self.resolve(path)
+        if member is not None:
+            return ResultSources.Stat(member.size, member.mtime)
+        return os.stat(file)
+
+    def files(self, directory: str, pattern: str = "") -> list[str]:
+        result = set()
+        for subdir, _, files in os.walk(directory):
+            for file in files:
+                if not file.endswith(self.bundles):
+                    result.add(os.path.join(subdir, self.__strip(file)))
+
+        prefix = os.path.join(os.path.normpath(directory), "")
+        result.update(path for path in self.__index() if path.startswith(prefix))
+        return sorted(path for path in result if pattern in os.path.basename(path))
+
+    @contextlib.contextmanager
+    def open(self, path: str, mode: str = "r"):
+        """Decompressed content of path, in text mode unless mode has b"""
+        file, member = self.resolve(path)
+        with contextlib.ExitStack() as stack:
+            if member is None:
+                stream = stack.enter_context(open(file, "rb"))
+                stream = self.__decompress(file, stream, stack)
+            else:
+                stream = self.__open_member(member, stack)
+                stream = self.__decompress(member.name, stream, stack)
+
+            if "b" not in mode:
+                stream = stack.enter_context(io.TextIOWrapper(stream))
+            yield stream
+
+    def __open_member(self, member: Member, stack: contextlib.ExitStack):
+        with self.lock:
+            small = member.size <= self.max_cached_size
+            if small and member.bundle not in self.scanned:
+                # one pass caches all small members of the bundle
+                self.__scan(member.bundle)
+            data = self.cache.get((member.bundle, member.name))
+        if data is not None:
+            return io.BytesIO(data)
+
+        # compressed tar streams have no random access, large members are
+        # reached by decompressing the bundle up to them
+        stream = stack.enter_context(open(member.bundle, "rb"))
+        stream = self.__decompress(member.bundle, stream, stack)
+        remaining = member.offset
+        while remaining > 0:
+            skipped = len(stream.read(min(self.chunk_size, remaining)))
+            if skipped == 0:
+                raise EOFError(f"Truncated bundle {member.bundle}")
+            remaining -= skipped
+
+        member_stream = ResultSources.Slice(stream, member.size)
+        return io.BufferedReader(member_stream, self.chunk_size)
+
+    def __decompress(self, name: str, stream, stack: contextlib.ExitStack):
+        if name.endswith((".gz", ".tgz")):
+            return stack.enter_context(gzip.GzipFile(fileobj=stream))
+        if name.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"Reading {name} needs the zstandard package")
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                stream, read_across_frames=True, closefd=False
+            )
+            return io.BufferedReader(stack.enter_context(reader), self.chunk_size)
+        if name.endswith(".fz"):
+            zlib_streams = ResultSources.ZlibStreams(stream)
+            return io.BufferedReader(zlib_streams, self.chunk_size)
+        return stream
+
+    def __strip(self, name: str) -> str:
+        for suffix in self.compressions:
+            if name.endswith(suffix):
+                return name.removesuffix(suffix)
+        return name
+
+    def __index(self) -> dict[str, Member]:
+        with self.lock:
+            if self.members is None:
+                self.members = {}
+                for subdir, _, files in os.walk(self.root):
+                    for file in sorted(files):
+                        if file.endswith(self.bundles):
+                            self.__add_bundle(os.path.join(subdir, file))
+
+            return self.members
+
+    def __add_bundle(self, bundle: str):
+        stat = os.stat(bundle)
+        key = os.path.abspath(bundle)
+        entry = BUILD_CACHE.read_entry("bundles", key)
+        if (
+            entry is None
+            or entry["size"] != stat.st_size
+            or entry["mtime"] != stat.st_mtime_ns
+        ):
+            logger.info(f"Indexing result bundle {bundle}")
+            members = self.__scan(bundle)
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+            entry["members"] = [vars(member) for member in members]
+            BUILD_CACHE.write_entry("bundles", key, entry)
+
+        for member in entry["members"]:
+            member = ResultSources.Member(**{**member, "bundle": bundle})
+            path = os.path.join(os.path.dirname(bundle), self.__strip(member.name))
+            self.members[os.path.normpath(path)] = member
+
+    def __scan(self, bundle: str) -> list[Member]:
+        """Members of the bundle in one streaming pass, caching the small ones"""
+        members = []
+        with contextlib.ExitStack() as stack:
+            stream = stack.enter_context(open(bundle, "rb"))
+            stream = self.__decompress(bundle, stream, stack)
+            tar = stack.enter_context(tarfile.open(fileobj=stream, mode="r|"))
+            for info in tar:
+                if not info.isfile():
+                    continue
+
+                cached = (
+                    info.size <= self.max_cached_size
+                    and self.cache_size + info.size <= self.max_cache_size
+                )
+                digest = hashlib.new(BUILD_CACHE.hash_algorithm)
+                chunks = []
+                data = tar.extractfile(info)
+                while chunk := data.read(self.chunk_size):
+                    digest.update(chunk)
+                    if cached:
+                        chunks.append(chunk)
+
+                if cached and (bundle, info.name) not in self.cache:
+                    self.cache[(bundle, info.name)] = b"".join(chunks)
+                    self.cache_size += info.size
+                members.append(
+                    ResultSources.Member(
+                        bundle,
+                        info.name,
+                        info.offset_data,
+                        info.size,
+                        int(info.mtime * 1e9),
+                        digest.hexdigest(),
+                    )
+                )
 
-class SpaceUsageDf:
-    class __DfResult:
-        def __init__(self, before, after, name):
-            self.before = before
-            self.after = after
-            self.name = name
+        self.scanned.add(bundle)
+        return members
 
-        def x(self):
-            return self.name
 
-        def y(self):
-            return (self.after - self.before) / 1000_000  # in gigabytes
+SOURCES = ResultSources("fs")
 
-    def __init__(
-        self,
-        input_file_before,
-        input_file_after,
-        output_image,
-        title,
-        tool_name: ToolName,
-        exclude_fs: list[FilesystemType] = [],
-    ):
-        self.input_file_before = input_file_before
-        self.input_file_after = input_file_after
-        self.output_image = output_image
-        self.title = title
-        self.exclude_fs = exclude_fs
 
-        result = self.__parse()
-        self.__plot(result, self.title, tool_name)
+class Profiler:
+    """Nested wall-clock timers of the tasks and their steps, with --profile"""
 
-    def __parse(self):
-        result = []
-        for path in FilesystemType:
-            if path in self.exclude_fs:
-                continue
+    class Option(StrEnum):
+        CPROFILE = "cprofile"
+        TRACEMALLOC = "tracemalloc"
 
-            before = 0
-            after = 0
-            df_line_start = FS_MOUNT_POINTS[path]
-            try:
-                with open(f"fs/{path}/{self.input_file_before}") as f:
-                    before = self.__df_results_read_file(f, df_line_start)
+    top_allocations = 10
 
-                with open(f"fs/{path}/{self.input_file_after}") as f:
-                    after = self.__df_results_read_file(f, df_line_start)
-                result.append(self.__DfResult(before, after, str(path)))
+    def __init__(self):
+        self.enabled = False
+        self.options = set()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.spans = {}  # stack of span names: [total seconds, calls]
+        self.stats = {}  # stage: pstats.Stats
+        self.memory = {}  # stage: peak traced bytes and top allocations
+
+    def enable(self, options: list[str]):
+        self.enabled = True
+        self.options = set(options)
+        if self.Option.TRACEMALLOC in self.options and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stack(self) -> list[str]:
+        # tasks run on threads, spans nest under the task of their thread
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
 
-            except FileNotFoundError:
-                logger.warning(f"Cannot read df file for '{path}'. Skipping")
+        stack = self.stack()
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__record(tuple(stack), time.perf_counter() - start, 1)
+            stack.pop()
+
+    @contextlib.contextmanager
+    def task(self, name: str):
+        """Root span of a task, profiled with the options of the run"""
+        if not self.enabled:
+            yield
+            return
 
+        profile = self.__start_cprofile()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        try:
+            with self.span(name):
+                yield
+        finally:
+            stage = name.split(":")[0]
+            if profile is not None:
+                profile.disable()
+                self.__add_stats(stage, pstats.Stats(profile))
+            if tracemalloc.is_tracing():
+                self.__add_memory(stage, *self.__snapshot())
+
+    def remote(self, function: Callable) -> Callable:
+        """Wraps a function sent to the workers, results go through collect"""
+        if not self.enabled:
+            return function
+        return Profiler.Remote(function, tuple(self.stack()), sorted(self.options))
+
+    def collect(self, result):
+        """Result of a remote call, with its profile merged into this process"""
+        if not self.enabled:
+            return result
+
+        result, profile = result
+        for stack, (total, calls) in profile["spans"].items():
+            self.__record(stack, total, calls)
+        stage = profile["stage"]
+        if profile["stats"] is not None:
+            stats = pstats.Stats()
+            stats.stats = profile["stats"]
+            stats.get_top_level_stats()
+            self.__add_stats(stage, stats)
+        if profile["memory"] is not None:
+            self.__add_memory(stage, *profile["memory"])
         return result
 
-    def __df_results_read_file(self, file, df_line_start):
-        lines = []
-        while line := file.readline():
-            if df_line_start in line:
-                lines.append(line)
+    class Remote:
+        def __init__(self, function: Callable, stack: tuple, options: list[str]):
+            self.function = function
+            self.stack = stack
+            self.options = options
+
+        def __call__(self, *args):
+            return PROFILER.call(self.function, self.stack, self.options, args)
+
+    def call(self, function: Callable, stack: tuple, options: list[str], args):
+        """Runs a remote call in a worker, returns the result with its profile"""
+        self.enable(options)
+        self.spans = {}
+        self.local.stack = list(stack)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+        profile = self.__start_cprofile()
+        with self.span("worker"):
+            result = function(*args)
+
+        stats = None
+        if profile is not None:
+            profile.disable()
+            profile.create_stats()
+            stats = profile.stats
+        profile = {
+            "spans": self.spans,
+            "stage": stack[0].split(":")[0] if len(stack) > 0 else "main",
+            "stats": stats,
+            "memory": self.__snapshot() if tracemalloc.is_tracing() else None,
+        }
+        return result, profile
+
+    def __record(self, stack: tuple, total: float, calls: int):
+        with self.lock:
+            span = self.spans.setdefault(stack, [0.0, 0])
+            span[0] += total
+            span[1] += calls
+
+    def __start_cprofile(self) -> cProfile.Profile | None:
+        if self.Option.CPROFILE not in self.options:
+            return None
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # python 3.12 allows only one active profiler, ex. of another task
+            logger.warning("cProfile is already active in this process, skipping")
+            return None
+        return profile
+
+    def __snapshot(self) -> tuple[int, list]:
+        # tracemalloc traces the whole process, the peak of a stage includes
+        # the tasks running at the same time
+        _, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics("lineno")
+        top = [
+            {"where": str(s.traceback), "size": s.size, "count": s.count}
+            for s in statistics[: self.top_allocations]
+        ]
+        return peak, top
 
-        bytes_used = [int(line.split()[2]) for line in lines]
-        return sum(bytes_used) / len(bytes_used)
+    def __add_stats(self, stage: str, stats: pstats.Stats):
+        with self.lock:
+            if stage in self.stats:
+                self.stats[stage].add(stats)
+            else:
+                self.stats[stage] = stats
 
-    def __plot(self, results, title: str, tool_name: ToolName):
-        x = [result.x() for result in results]
-        y = [result.y() for result in results]
-        xlabel = "File system"
-        ylabel = "Space used (GB)"
-        filename = self.output_image
+    def __add_memory(self, stage: str, peak: int, top: list):
+        with self.lock:
+            if peak >= self.memory.get(stage, {}).get("peak", -1):
+                self.memory[stage] = {"peak": peak, "top": top}
 
-        BarPlot(x, y, xlabel, ylabel, title, filename, tool_name, PlotUnit.SCALAR)
+    def export(self, output_dir: str):
+        """Writes report.json, stacks.txt for flame graphs and <stage>.prof"""
+        if not self.enabled:
+            return
 
+        create_dir(output_dir)
+        children = Counter()
+        for stack, (total, _) in self.spans.items():
+            children[stack[:-1]] += total
 
-class BonnieBenchmark:
-    output_html_path = GRAPHS_OUTPUT_DIR + "/html"
-    output_tex = GRAPHS_OUTPUT_DIR + "/tex"
-    output_csv = BONNIE_OUTPUT_DIR + "/bonnie++.csv"
-    output_csv_all = BONNIE_OUTPUT_DIR + "/bonnie++_all.csv"
-    output_html = output_html_path + "/bonnie-graphs.html"
-    output_html_all = output_html_path + "/bonnie-graphs_all.html"
-    tool_name = ToolName.BONNIE
+        spans = []
+        for stack, (total, calls) in sorted(self.spans.items()):
+            # spans of workers may outlast the span that submitted them
+            self_time = max(0.0, total - children[stack])
+            spans.append(
+                {
+                    "stack": list(stack),
+                    "total": total,
+                    "self": self_time,
+                    "calls": calls,
+                }
+            )
 
-    input_file = "out/bonnie/out.csv"
+        with open(f"{output_dir}/report.json", "w") as file:
+            report = {"options": sorted(self.options), "spans": spans}
+            report["memory"] = self.memory
+            json.dump(report, file, indent=2)
+
+        # collapsed stacks with self time in microseconds, ex. for flamegraph.pl
+        with open(f"{output_dir}/stacks.txt", "w") as file:
+            for span in spans:
+                if round(span["self"] * 1e6) > 0:
+                    file.write(
+                        f"{';'.join(span['stack'])} {round(span['self'] * 1e6)}\n"
+                    )
 
-    def __init__(self):
-        logger.info(
-            f"Initializing bonnie graphing with input {self.input_file} and output {self.output_csv}, {self.output_html_path}"
+        for stage, stats in self.stats.items():
+            stats.dump_stats(f"{output_dir}/{stage}.prof")
+
+        logger.info(f"Wrote profile of {len(spans)} spans to {output_dir}")
+        for span in sorted(spans, key=lambda span: span["self"], reverse=True)[:10]:
+            logger.info(
+                f"Profile {';'.join(span['stack'])}: {span['self']:.2f} s self, {span['total']:.2f} s total in {span['calls']} calls"
+            )
+
+
+PROFILER = Profiler()
+
+
+def profiled(function: Callable) -> Callable:
+    """Times every call of the function as a span named by its qualified name"""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with PROFILER.span(function.__qualname__):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+class ResultsWarehouse:
+    """
+    SQLite database of normalized benchmark results with one table per kind of
+    data. Rows carry the partition columns fs_type, tool, test and run_id plus
+    the source file they came from. A source is ingested once per size,
+    modification time and parser arguments, so the results of a new run are
+    appended without reprocessing the earlier ones.
+    """
+
+    partition = ["fs_type", "tool", "test", "run_id"]
+    schema_version = 3  # bump when parsers change, to ingest all sources again
+
+    def __init__(self, path: str):
+        self.path = path
+        self.run_id = "default"
+        self.reingest = False
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.ingested = 0
+        self.unchanged = 0
+
+    def connection(self) -> sqlite3.Connection:
+        # sqlite connections cannot be shared between the task threads
+        if not hasattr(self.local, "connection"):
+            create_dir(os.path.dirname(self.path))
+            connection = sqlite3.connect(self.path, timeout=60)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sources (source TEXT, run_id TEXT, "
+                "size INTEGER, mtime INTEGER, fingerprint TEXT, tables TEXT, "
+                "PRIMARY KEY (source, run_id))"
+            )
+            self.local.connection = connection
+
+        return self.local.connection
+
+    @profiled
+    def is_stale(self, source: str, *args) -> bool:
+        if self.reingest:
+            return True
+
+        stat = SOURCES.stat(source)
+        row = (
+            self.connection()
+            .execute(
+                "SELECT size, mtime, fingerprint FROM sources WHERE source = ? AND run_id = ?",
+                (source, self.run_id),
+            )
+            .fetchone()
         )
-        create_dir(self.output_tex)
-        create_dir(self.output_html_path)
-        result_all = self.__parse()
-        self.__save(result_all, self.output_csv_all)
+        if row != (stat.st_size, stat.st_mtime_ns, self.__fingerprint(args)):
+            return True
+
+        with self.lock:
+            self.unchanged += 1
+        return False
+
+    @profiled
+    def store(self, source: str, tables: dict[str, pd.DataFrame], *args, **partition):
+        """Replaces the rows of source in the current run with the parsed tables"""
+        stat = SOURCES.stat(source)
+        # sqlite binds only plain strings, not enum members
+        partition = {"run_id": self.run_id, **partition}
+        partition = {column: str(value) for column, value in partition.items()}
+
+        with self.lock, self.connection() as connection:
+            self.__delete(connection, source)
+            for table, df in tables.items():
+                df = df.assign(**partition, source=source)
+                df.to_sql(table, connection, if_exists="append", index=False)
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_partition "
+                    f"ON {table} ({', '.join(self.partition)}, source)"
+                )
+            connection.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    source,
+                    self.run_id,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    self.__fingerprint(args),
+                    json.dumps(list(tables)),
+                ),
+            )
+            self.ingested += 1
+
+    @profiled
+    def ingest(self, source: str, parser: Callable, *args, **partition) -> bool:
+        if not self.is_stale(source, *args):
+            return False
+
+        logger.debug(f"Ingesting {source}")
+        self.store(source, parser(source, *args), *args, **partition)
+        return True
+
+    @profiled
+    def query(self, table: str, partition: bool = False, **filters) -> pd.DataFrame:
+        """Rows of table in the current run matching the column filters"""
+        filters = {"run_id": self.run_id, **filters}
+        where = " AND ".join(f'"{column}" = ?' for column in filters)
         try:
-            self.__generate_table(
-                self.output_html_all, self.output_csv_all, ToolName.BONNIE_ALL
+            df = pd.read_sql_query(
+                f"SELECT * FROM {table} WHERE {where} ORDER BY rowid",
+                self.connection(),
+                params=[str(value) for value in filters.values()],
             )
-        except pd.errors.ParserError:
-            logger.warning(f"Failed to generate bonnie table: {self.input_file}")
-            return
+        except pd.errors.DatabaseError:
+            if self.__has_table(table):
+                raise
+            return pd.DataFrame()
 
-        result = self.__parse([FilesystemType.NILFS_DEDUP])
-        self.__save(result, self.output_csv)
-        self.__generate_table(self.output_html, self.output_csv, ToolName.BONNIE)
-        self.__df()
-        self.__test_configuration()
+        if not partition:
+            df = df.drop(columns=self.partition + ["source"])
+        return df
 
-    def __parse(self, exclude: list[FilesystemType] = []):
-        result = ""
-        for path in FilesystemType:
-            if path in exclude:
-                continue
+    def prune(self):
+        """Drops the rows of sources of the current run that no longer exist"""
+        with self.lock, self.connection() as connection:
+            sources = connection.execute(
+                "SELECT source FROM sources WHERE run_id = ?", (self.run_id,)
+            ).fetchall()
+            for (source,) in sources:
+                if not SOURCES.exists(source):
+                    logger.info(f"Removing results of deleted source {source}")
+                    self.__delete(connection, source)
+                    connection.execute(
+                        "DELETE FROM sources WHERE source = ? AND run_id = ?",
+                        (source, self.run_id),
+                    )
 
-            with open(f"fs/{path}/{self.input_file}") as f:
-                bonnie_output = ""
-                while line := f.readline().rstrip():
-                    bonnie_output += self.__convert_units(line)
-                result += self.__merge_rows_into_average(bonnie_output)
+    def __delete(self, connection: sqlite3.Connection, source: str):
+        row = connection.execute(
+            "SELECT tables FROM sources WHERE source = ? AND run_id = ?",
+            (source, self.run_id),
+        ).fetchone()
+        for table in json.loads(row[0]) if row is not None else []:
+            connection.execute(
+                f"DELETE FROM {table} WHERE source = ? AND run_id = ?",
+                (source, self.run_id),
+            )
 
-        return result
+    def __has_table(self, table: str) -> bool:
+        row = (
+            self.connection()
+            .execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,),
+            )
+            .fetchone()
+        )
+        return row is not None
 
-    def __convert_units(self, row: str) -> str:
-        splitted = row.split(",")
+    def __fingerprint(self, args: tuple) -> str:
+        return f"{self.schema_version}:{args!r}"
 
-        for i, field in enumerate(splitted):
-            # skip metadata and empty fields
-            if i < 10:
-                continue
+    def report(self):
+        logger.info(
+            f"Results warehouse {self.path}: {self.ingested} sources ingested, {self.unchanged} unchanged"
+        )
 
-            field = field.strip()
 
-            if field == "" or field == "+++++" or field == "+++":
-                splitted[i] = "0"
+WAREHOUSE = ResultsWarehouse(f"{OUTPUT_DIR}/results.sqlite")
+
+
+class MemoryBudget:
+    """
+    Splits an optional memory limit between the main process and the workers.
+    The main process is measured when the limit is set and grows by the results
+    it queries. A worker costs as much at start, as it imports the same
+    modules, plus the figures it renders before it is replaced and one chunk of
+    parsed log lines. The limit bounds the number of workers and the chunk
+    size of fio logs.
+    """
+
+    data_size = 64 * 2**20  # query results and plot specs of the main process
+    # fonts and canvas of the first figure, then about 10 MiB per figure
+    render_size = 160 * 2**20
+    row_size = 128  # parsed fio log line with the temporaries of aggregates
+    min_chunk_size = 10_000
+    max_chunk_size = 1_000_000
+    target_chunk_size = 100_000
+
+    def __init__(self, limit: int = None):
+        self.limit = limit
+        self.process_size = None
+
+    def set_limit(self, limit: int):
+        self.limit = limit
+        # resident size of the interpreter with numpy, pandas and matplotlib
+        self.process_size = self.peak_rss()[0]
+        minimum = self.process_size + self.data_size
+        minimum += self.__worker_size(self.min_chunk_size)
+        if self.limit < minimum:
+            logger.warning(
+                f"Memory limit of {limit // 2**20} MiB is below the main process "
+                f"and one worker ({minimum // 2**20} MiB)"
+            )
 
-            if "us" in field:
-                splitted[i] = str(int(field[:-2]) / 1000) + "ms"
-            elif "ms" in field:
-                splitted[i] = str(int(field[:-2])) + "ms"
-            elif "s" in field:
-                splitted[i] = str(int(field[:-1]) * 1000) + "ms"
+    def processes(self) -> int:
+        if self.limit is None:
+            return os.cpu_count()
 
-        splitted[-1] = str(splitted[-1]) + "\n"
+        worker_size = self.__worker_size(self.target_chunk_size)
+        return max(1, min(os.cpu_count(), self.__available() // worker_size))
 
-        return ",".join(splitted)
+    def chunk_size(self) -> int:
+        if self.limit is None:
+            return self.max_chunk_size
 
-    def __merge_rows_into_average(self, rows):
-        count = {}
-        len_rows = 0
-        for row in rows.split("\n"):
-            if "format_version" in row:
-                continue
-            if row.strip() == "":
-                continue
+        chunk_memory = self.__available() // self.processes() - self.__worker_size(0)
+        return max(
+            self.min_chunk_size,
+            min(self.max_chunk_size, chunk_memory // self.row_size),
+        )
 
-            len_rows += 1
-            to_skip = 10
-            for i, value in enumerate(row.split(",")):
-                if to_skip > 0:
-                    to_skip -= 1
-                    count[i] = value
-                elif "ms" in value:
-                    if i not in count.keys():
-                        count[i] = value
-                    else:
-                        count[i] = f"{int(float(count[i][:-2]) + float(value[:-2]))}ms"
-                elif "+" in value or value == "":
-                    count[i] = value
-                else:
-                    if i not in count.keys():
-                        count[i] = float(value)
-                    else:
-                        if (
-                            type(count[i]) is str
-                        ):  # handle case when in the same column there are +++++ and normal values
-                            count[i] = 0.0
-                        count[i] = float(count[i]) + float(value)
-
-        self.__average(len_rows, count)
-
-        return "1.98" + ",".join([str(i) for i in count.values()]) + "\n"
-
-    def __average(self, len_rows, count):
-        to_skip = 10
-        len_rows -= 1
-        for i in count.keys():
-            value = count[i]
-            if to_skip > 0:
-                to_skip -= 1
-            elif isinstance(value, str):
-                if "ms" in value:
-                    count[i] = f"{round(float(count[i][:-2]) / (len_rows + 1), 1)}ms"
-            else:
-                count[i] = round(float(count[i]) / (len_rows + 1), 1)
+    def __worker_size(self, chunk_size: int) -> int:
+        return self.process_size + self.render_size + chunk_size * self.row_size
+
+    def __available(self) -> int:
+        # the main process is resident for the whole run
+        return self.limit - self.process_size - self.data_size
+
+    def pool(self, **kwargs) -> Pool:
+        # workers are started while stage threads hold locks (ex. of logging),
+        # a forked worker could inherit one of them locked and deadlock
+        return multiprocessing.get_context("spawn").Pool(
+            self.processes(),
+            initializer=MemoryBudget.restore,
+            initargs=(self.limit, self.process_size),
+            **kwargs,
+        )
 
-    def __save(self, result, filename):
-        with open(filename, "w") as f:
-            f.write(result)
+    @staticmethod
+    def restore(limit: int, process_size: int):
+        MEMORY.limit = limit
+        MEMORY.process_size = process_size
 
-    def __generate_table(self, output_html, output_csv, tool_name: ToolName):
-        df = self.__load_csv(output_csv)
-        df = self.__convert_df_to_multidimentional(df)
+    @staticmethod
+    def peak_rss() -> tuple[int, int]:
+        """Peak RSS in bytes of the main process and of the largest worker"""
+        # ru_maxrss is in kilobytes, for children it is the largest process
+        main = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        worker = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+        return main, worker
+
+    def report(self):
+        main, worker = self.peak_rss()
+        # at most every worker at the peak of the largest one at once
+        total = main + self.processes() * worker
+        logger.info(
+            f"Peak RSS: {main / 2**20:.1f} MiB main process, {worker / 2**20:.1f} MiB largest worker, "
+            f"at most {total / 2**20:.1f} MiB with {self.processes()} workers"
+        )
+        if self.limit is not None and total > self.limit:
+            logger.warning(f"Peak RSS exceeded the limit of {self.limit // 2**20} MiB")
 
-        df.to_html(output_html)
 
-        total_tables = 12
-        columns_count = 2
-        for i in range(0, total_tables * columns_count, columns_count):
-            df_part = df.iloc[:, i : (i + columns_count)]
-            name = f"bonnie{int(i / columns_count + 1)}"
-            TexTable(df_part, name, tool_name).export()
+MEMORY = MemoryBudget()
+
+
+class WorkerPool:
+    """
+    Process pool shared by all stages of a run, sized by MEMORY. Workers are
+    replaced after a few tasks, rendering with Matplotlib keeps growing the
+    memory of a process even when its figures are released.
+    """
+
+    tasks_per_worker = 8
+
+    def __init__(self):
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def get(self) -> Pool:
+        with self.lock:
+            if self.pool is None:
+                self.pool = MEMORY.pool(maxtasksperchild=self.tasks_per_worker)
+            return self.pool
+
+    def close(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+                self.pool = None
+
+
+WORKERS = WorkerPool()
+
+
+class TaskGraph:
+    """
+    Runs named tasks on threads of the main process as soon as their
+    dependencies are done. Tasks hand their heavy work to WORKERS, so the
+    stages overlap on one bounded pool. A failed task skips all tasks that
+    depend on it, independent tasks still run.
+    """
+
+    class Status(StrEnum):
+        DONE = "done"
+        FAILED = "failed"
+        SKIPPED = "skipped"
+
+    @dataclass
+    class Task:
+        name: str
+        function: Callable
+        dependencies: tuple[str, ...]
+        status: str = None
+        start: float = None
+        end: float = None
+
+    def __init__(self, max_threads: int = None):
+        self.max_threads = max_threads or os.cpu_count()
+        self.tasks = {}
+
+    def add(self, name: str, function: Callable, *dependencies: str):
+        if name in self.tasks:
+            raise ValueError(f"Task '{name}' is already defined")
+        self.tasks[name] = TaskGraph.Task(name, function, dependencies)
+
+    def run(self) -> bool:
+        self.__validate()
+        pending = dict(self.tasks)
+        running = {}
+
+        with ThreadPoolExecutor(self.max_threads) as executor:
+            while len(pending) > 0 or len(running) > 0:
+                for task in list(pending.values()):
+                    statuses = [self.tasks[name].status for name in task.dependencies]
+                    if any(
+                        status not in (None, self.Status.DONE) for status in statuses
+                    ):
+                        logger.error(f"Skipping task {task.name}, a dependency failed")
+                        task.status = self.Status.SKIPPED
+                        del pending[task.name]
+                    elif all(status == self.Status.DONE for status in statuses):
+                        running[executor.submit(self.__execute, task)] = task
+                        del pending[task.name]
+
+                if len(running) > 0:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del running[future]
+
+        self.__report()
+        return all(task.status == self.Status.DONE for task in self.tasks.values())
+
+    def __execute(self, task: Task):
+        logger.info(f"Starting task {task.name}")
+        task.start = time.perf_counter()
+        try:
+            with PROFILER.task(task.name):
+                task.function()
+            task.status = self.Status.DONE
+        except Exception:
+            logger.exception(f"Task {task.name} failed")
+            task.status = self.Status.FAILED
+        finally:
+            task.end = time.perf_counter()
+
+        logger.info(f"Task {task.name} {task.status} in {task.end - task.start:.2f} s")
+
+    def __validate(self):
+        for task in self.tasks.values():
+            for name in task.dependencies:
+                if name not in self.tasks:
+                    raise ValueError(f"Task '{task.name}' depends on unknown '{name}'")
+
+        # Kahn's algorithm, tasks left with dependencies are part of a cycle
+        remaining = {name: set(task.dependencies) for name, task in self.tasks.items()}
+        ready = [name for name, dependencies in remaining.items() if not dependencies]
+        while len(ready) > 0:
+            done = ready.pop()
+            del remaining[done]
+            for name, dependencies in remaining.items():
+                if done in dependencies:
+                    dependencies.remove(done)
+                    if not dependencies:
+                        ready.append(name)
+
+        if len(remaining) > 0:
+            raise ValueError(f"Cyclic task dependencies: {', '.join(remaining)}")
+
+    def stages(self) -> dict[str, dict]:
+        """Number of executed tasks and wall time of every stage"""
+        # a stage is the prefix of the task name, ex. fio in fio:latency
+        stages = {}
+        for task in self.tasks.values():
+            if task.start is not None:
+                stages.setdefault(task.name.split(":")[0], []).append(task)
+
+        return {
+            stage: {
+                "tasks": len(tasks),
+                "wall_time": max(t.end for t in tasks) - min(t.start for t in tasks),
+            }
+            for stage, tasks in stages.items()
+        }
+
+    def __report(self):
+        for stage, timing in self.stages().items():
+            logger.info(
+                f"Stage {stage}: {timing['tasks']} tasks in {timing['wall_time']:.2f} s"
+            )
+
 
-    def __load_csv(self, filename):
-        # CSV format taken from manual page bon_csv2html(1)
-        #    FORMAT
-        #    This is a list of the fields used in the CSV files  format  version  2.
-        #    Format  version  1  was  the type used in Bonnie++ < 1.90.  Before each
-        #    field I list the field number as well as the name given in the heading
+def list_files(directory: str, pattern: str = "") -> list[str]:
+    """Result files under directory, including compressed and bundled ones"""
+    return SOURCES.files(directory, pattern)
 
-        #    0 format_version
-        #           Version of the output format in use (1.98)
 
-        #    1 bonnie_version
-        #           (1.98)
+def parse_size(size: str) -> int:
+    """Size with fio suffix (ex. 1GiB, 4k) in bytes, suffixes are powers of 1024"""
+    match = re.fullmatch(r"\s*(\d+)\s*([kmgtp]?)(i?b)?\s*", size.lower())
+    if match is None:
+        raise ValueError(f"Invalid size: '{size}'")
 
-        #    2 name Machine Name
+    number, unit, _ = match.groups()
+    return int(number) * 1024 ** " kmgtp".index(unit or " ")
 
-        #    3 concurrency
-        #           The number of copies of each operation to be  run  at  the  same
-        #           time
 
-        #    4 seed Random number seed
+class FigureExport:
+    """
+    Formats and resolution of the exported figures, chosen with --formats and
+    --draft. A figure is drawn once on the Agg canvas for all raster formats,
+    a writer thread encodes and writes them while the vector formats are drawn.
+    """
 
-        #    5 file_size
-        #           Size in megs for the IO tests
+    raster_formats = [FileExportType.PNG, FileExportType.JPG, FileExportType.WEBP]
+    vector_formats = [FileExportType.SVG]
+    dpi = 300
+    draft_dpi = 72
+    pad_inches = 0.1  # default padding of savefig with a tight bounding box
+    # a crop one pixel off differs by more than 1 on average
+    crop_tolerance = 0.5
 
-        #    6 chunk_size
-        #           Size of chunks in bytes
+    def __init__(self):
+        self.formats = [FileExportType.JPG, FileExportType.SVG]
+        self.draft = False
+
+    def resolution(self) -> int:
+        return self.draft_dpi if self.draft else self.dpi
+
+    def profile(self) -> str:
+        formats = ",".join(str(f) for f in self.formats)
+        return f"{formats}@{self.resolution()}dpi"
+
+    def paths(self, out: str) -> dict[FileExportType, str]:
+        """Output of every format, out is the name relative to the format directory"""
+        return {f: f"{GRAPHS_OUTPUT_DIR}/{f}/{out}.{f}" for f in self.formats}
+
+    def write(self, figure: Figure, out: str, bbox_inches: str = None) -> list[str]:
+        paths = self.paths(out)
+        raster = [f for f in self.formats if f in self.raster_formats]
+        vector = [f for f in self.formats if f in self.vector_formats]
+        dpi = self.resolution()
+
+        with ThreadPoolExecutor(1) as writer:
+            writes = []
+            image = None
+            if len(raster) > 0:
+                figure_dpi = figure.get_dpi()
+                with PROFILER.span("rasterize"):
+                    image = self.__rasterize(figure, dpi, bbox_inches == "tight")
+                figure.set_dpi(figure_dpi)
+            for file_format in raster:
+                if image is None:
+                    with PROFILER.span(f"savefig {file_format}"):
+                        figure.savefig(
+                            paths[file_format], dpi=dpi, bbox_inches=bbox_inches
+                        )
+                else:
+                    writes.append(
+                        writer.submit(
+                            FigureExport.encode, image, paths[file_format], dpi
+                        )
+                    )
+            for file_format in vector:
+                with PROFILER.span(f"savefig {file_format}"):
+                    figure.savefig(paths[file_format], bbox_inches=bbox_inches)
+
+            for write in writes:
+                write.result()
+
+        return list(paths.values())
+
+    def __rasterize(self, figure: Figure, dpi: int, tight: bool) -> np.ndarray | None:
+        """RGBA pixels of the figure, None when savefig has to lay it out again"""
+        figure.set_dpi(dpi)
+        canvas = figure.canvas
+        canvas.draw()
+        pixels = np.asarray(canvas.buffer_rgba())
+        if not tight:
+            return pixels.copy()
+
+        # savefig shifts the figure to the tight box, here the box is cropped
+        tight_bbox = figure.get_tightbbox(canvas.get_renderer())
+        width, height = figure.get_size_inches()
+        if (
+            tight_bbox.x0 < 0
+            or tight_bbox.y0 < 0
+            or tight_bbox.x1 > width
+            or tight_bbox.y1 > height
+        ):
+            return None
+
+        # only the padding may be outside of the figure, it has the background
+        bbox = tight_bbox.padded(self.pad_inches)
+        # savefig draws the figure shifted by the lower left corner of the box
+        # in pixels and truncates the size of its canvas (within 1e-8 pixels)
+        device = Affine2D().scale(dpi)
+        x0, y0 = device.transform(bbox.p0)
+        crop_width, crop_height = (
+            int(size + 1e-8) for size in device.transform(bbox.size)
+        )
+        left = round(x0)
+        top = pixels.shape[0] - crop_height - round(y0)
+        cropped = np.empty((crop_height, crop_width, 4), np.uint8)
+        cropped[:] = np.round(np.array(to_rgba(figure.get_facecolor())) * 255)
+
+        rows = slice(max(0, top), min(pixels.shape[0], top + cropped.shape[0]))
+        columns = slice(max(0, left), min(pixels.shape[1], left + cropped.shape[1]))
+        cropped[
+            rows.start - top : rows.stop - top,
+            columns.start - left : columns.stop - left,
+        ] = pixels[rows, columns]
+        return cropped
+
+    def check_tight_crop(self) -> float:
+        """Mean pixel difference of the tight crop to savefig, at the export dpi"""
+        # the box of this figure is not a whole number of pixels at 300 dpi
+        figure = Figure(figsize=(6, 4))
+        FigureCanvasAgg(figure)
+        ax = figure.add_subplot()
+        ax.plot([0, 1, 2], [2, 0, 1], label="line")
+        ax.set_title("Title")
+        ax.set_xlabel("Label")
+        ax.legend()
+
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format="png", dpi=self.dpi, bbox_inches="tight")
+        expected = np.asarray(Image.open(buffer).convert("RGBA"), dtype=np.int16)
+        cropped = self.__rasterize(figure, self.dpi, tight=True)
+        if cropped is None or cropped.shape != expected.shape:
+            return np.inf
+        return float(np.abs(cropped.astype(np.int16) - expected).mean())
 
-        #    7 seeks
-        #           Number of seeks for random seek test
+    @staticmethod
+    @profiled
+    def encode(pixels: np.ndarray, path: str, dpi: int):
+        image = Image.fromarray(pixels)
+        if path.endswith(f".{FileExportType.JPG}"):
+            image = image.convert("RGB")
+        image.save(path, dpi=(dpi, dpi))
 
-        #    8 seek_proc_count
-        #           Number of seeker processes for the random seek test
 
-        #    9 putc,putc_cpu
-        #           Results for writing a character at a time K/s,%CPU
+EXPORT = FigureExport()
 
-        #    11 put_block,put_block_cpu
-        #           Results for writing a block at a time K/s,%CPU
 
-        #    13 rewrite,rewrite_cpu
-        #           Results for reading and re-writing a block at a time K/s,%CPU
+class FigureRenderer:
+    """
+    Renders plot specs on the shared process pool as soon as they are
+    submitted. Every spec draws on its own Figure with an Agg canvas, so no
+    global pyplot state is shared between plots.
+    """
 
-        #    15 getc,getc_cpu
-        #           Results for reading a character at a time K/s,%CPU
+    def __init__(self):
+        self.results = []
+        self.lock = threading.Lock()
+        self.figures = 0
+        self.render_time = 0.0
+
+    def submit(self, spec):
+        paths = EXPORT.paths(spec.out).values()
+        for path in paths:
+            create_dir(os.path.dirname(path))
+        BuildCache.register_output(*paths)
+        # the export profile goes with the spec, workers may be started earlier
+        result = WORKERS.get().apply_async(
+            PROFILER.remote(FigureRenderer.render), (spec, EXPORT)
+        )
+        with self.lock:
+            self.results.append(result)
 
-        #    17 get_block,get_block_cpu
-        #           Results for reading a block at a time K/s,%CPU
+    def flush(self):
+        with self.lock:
+            results, self.results = self.results, []
+        if len(results) == 0:
+            return
 
-        #    19 seeks,seeks_cpu
-        #           Results for the seek test seeks/s,%CPU
+        logger.info(f"Waiting for {len(results)} figures")
+        for result in results:
+            path, render_time = PROFILER.collect(result.get())
+            logger.debug(f"Rendered figure {path} in {render_time:.2f} s")
+            self.figures += 1
+            self.render_time += render_time
 
-        #    21 num_files
-        #           Number of files for file-creation tests (units of 1024 files)
+    @staticmethod
+    @profiled
+    def render(spec, export: FigureExport) -> tuple[str, float]:
+        start = time.perf_counter()
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        with PROFILER.span("draw"):
+            spec.draw(figure.add_subplot())
+        paths = export.write(figure, spec.out, **spec.savefig_kwargs)
+        figure.clear()
+        return paths[0], time.perf_counter() - start
 
-        #    22 max_size
-        #           The  maximum size of files for file-creation tests.  Or the type
-        #           of files for links.
 
-        #    23 min_size
-        #           The minimum size of files for file-creation tests.
+RENDERER = FigureRenderer()
 
-        #    24 num_dirs
-        #           The number of directories for creation of files in multiple  di‐
-        #           rectories.
 
-        #    25 file_chunk_size
-        #           The size of blocks for writing multiple files.
+class PlotUnit(StrEnum):
+    PERCENT = auto()
+    SCALAR = auto()
 
-        #    26 seq_create,seq_create_cpu
-        #           Rate of creating files sequentially files/s,%CPU
 
-        #    28 seq_stat,seq_stat_cpu
-        #           Rate of reading/stating files sequentially files/s,%CPU
+class BarPlot:
+    savefig_kwargs = {}
 
-        #    30 seq_del,seq_del_cpu
-        #           Rate of deleting files sequentially files/s,%CPU
+    def __init__(
+        self,
+        x: list[str],
+        y: list[Number],
+        xlabel: str,
+        ylabel: str,
+        title: str,
+        filename: str,
+        tool_name: ToolName,
+        plot_unit: PlotUnit,
+    ):
+        self.x = x
+        self.y = y
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.title = title
+        self.filename = filename
+        self.plot_unit = plot_unit
 
-        #    32 ran_create,ran_create_cpu
-        #           Rate of creating files in random order files/s,%CPU
+        self.out = f"{tool_name}/{self.filename}"
+
+        target = BUILD_CACHE.target(
+            f"BarPlot:{self.out}",
+            [],
+            self.x,
+            self.y,
+            self.xlabel,
+            self.ylabel,
+            self.title,
+            self.plot_unit,
+        )
+        if target.is_fresh():
+            logger.info(f"BarPlot {self.out} is up to date, skipping")
+            BuildCache.register_output(*EXPORT.paths(self.out).values())
+            return
 
-        #    34 ran_stat,ran_stat_cpu
-        #           Rate of deleting files in random order files/s,%CPU
+        with target:
+            logger.info(f"Generating {self.plot_unit} BarPlot: {self.out}")
+            RENDERER.submit(self)
 
-        #    36 ran_del,ran_del_cpu
-        #           Rate of deleting files in random order files/s,%CPU
+    def draw(self, ax: Axes):
+        if self.plot_unit == PlotUnit.SCALAR:
+            self.__plot_scalar(ax)
+        elif self.plot_unit == PlotUnit.PERCENT:
+            self.__plot_percent(ax)
+        else:
+            raise RuntimeError(f"Unrecognized plot unit: {self.plot_unit}")
 
-        #    38 putc_latency,put_block_latency,rewrite_latency
-        #           Latency  (maximum  amount  of  time  for a single operation) for
-        #           putc, put_block, and reqrite
+    def __plot_scalar(self, ax: Axes):
+        ax.bar(np.arange(len(self.y)), self.y, color="blue", edgecolor="black")
+        ax.set_xticks(np.arange(len(self.y)), self.x)
+        ax.set_xlabel(self.xlabel, fontsize=16)
+        ax.set_ylabel(self.ylabel, fontsize=16)
+        ax.set_title(self.title, fontsize=16)
 
-        #    41 getc_latency,get_block_latency,seeks_latency
-        #           Latency for getc, get_block, and seeks
+    def __plot_percent(self, ax: Axes):
+        self.__plot_scalar(ax)
+        ax.yaxis.set_major_formatter(mtick.PercentFormatter(xmax=1, decimals=0))
 
-        #    44 seq_create_latency,seq_stat_latency,seq_del_latency
-        #           Latency for seq_create, seq_stat, and seq_del
 
-        #    47 ran_create_latency,ran_stat_latency,ran_del_latency
-        #           Latency for ran_create, ran_stat, and ran_del
+class DataFramePlot:
+    savefig_kwargs = {"bbox_inches": "tight"}
 
-        df = pd.read_csv(filename, header=None, dtype=object)
-        bonnie_version_range = list(range(0, 2))
-        bonnie_configuration_range = list(range(3, 9))
-        bonnie_files_configuration_range = list(range(21, 26))
-        bonnie_latency_range = list(range(38, 50))
-        bonnie_exclude = (
-            bonnie_version_range
-            + bonnie_configuration_range
-            + bonnie_files_configuration_range
-            + bonnie_latency_range
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        out: str,
+        title: str,
+        xlabel: str,
+        ylabel: str,
+        legend: bool = False,
+        stacked: bool = False,
+        percent: bool = False,
+        max_line: bool = False,
+        logy: bool = False,
+        kind: str = "bar",
+    ):
+        self.df = df
+        self.out = out
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.legend = legend
+        self.stacked = stacked
+        self.percent = percent
+        self.max_line = max_line
+        self.logy = logy
+        self.kind = kind
+
+        RENDERER.submit(self)
+
+    def draw(self, ax: Axes):
+        kwargs = {"marker": "o"} if self.kind == "line" else {}
+        self.df.plot(
+            kind=self.kind,
+            ax=ax,
+            title=self.title,
+            xlabel=self.xlabel,
+            ylabel=self.ylabel,
+            legend=self.legend,
+            stacked=self.stacked,
+            logy=self.logy,
+            **kwargs,
         )
+        if self.percent:
+            ax.yaxis.set_major_formatter(mtick.PercentFormatter())
+        # logarithmic axis keeps its own tick locator
+        ax.locator_params(axis="x" if self.logy else "both", nbins=10)
+        ax.tick_params(axis="x", rotation=0)
 
-        df = df.drop(
-            df.columns[bonnie_exclude],
-            axis=1,
+        if self.max_line:
+            self.__draw_max_line(ax)
+
+    def __draw_max_line(self, ax: Axes):
+        max = self.df.iloc[:, 0].max()
+        xmin, xmax = ax.get_xlim()
+
+        ax.hlines(y=max, xmin=xmin, xmax=xmax, color="red", linewidth=1)
+        _, ymax = ax.get_ylim()
+        label_position = max / ymax + 0.02
+        ax.text(
+            0.88,
+            label_position,
+            f"Maximum = {max:.1f}M",
+            ha="right",
+            va="center",
+            transform=ax.transAxes,
+            size=8,
+            zorder=3,
         )
-        df.columns = [
-            "Filesystem",
-            "Character write K/s",
-            "Character write %CPU",
-            "Block write K/s",
-            "Block write %CPU",
-            "Block read, rewrite K/s",
-            "Block read, rewrite %CPU",
-            "Character read K/s",
-            "Character read %CPU",
-            "Block read K/s",
-            "Block read %CPU",
-            "Random seeks seeks/s",
-            "Random seeks %CPU",
-            "Sequential create files/s",
-            "Sequential create %CPU",
-            "Sequential read files/s",
-            "Sequential read %CPU",
-            "Sequential delete files/s",
-            "Sequential delete %CPU",
-            "Random create files/s",
-            "Random create %CPU",
-            "Random read files/s",
-            "Random read %CPU",
-            "Random delete files/s",
-            "Random delete %CPU",
-        ]
-        return df
 
-    def __convert_df_to_multidimentional(self, df):
-        df = df[
-            [
-                "Filesystem",
-                "Character write K/s",
-                "Character write %CPU",
-                "Block write K/s",
-                "Block write %CPU",
-                "Block read, rewrite K/s",
-                "Block read, rewrite %CPU",
-                "Character read K/s",
-                "Character read %CPU",
-                "Block read K/s",
-                "Block read %CPU",
-                "Random seeks seeks/s",
-                "Random seeks %CPU",
-                "Sequential create files/s",
-                "Sequential create %CPU",
-                "Sequential read files/s",
-                "Sequential read %CPU",
-                "Sequential delete files/s",
-                "Sequential delete %CPU",
-                "Random create files/s",
-                "Random create %CPU",
-                "Random read files/s",
-                "Random read %CPU",
-                "Random delete files/s",
-                "Random delete %CPU",
-            ]
-        ]
-        column_names = pd.DataFrame(
-            [
+
+class TimelinePlot:
+    """Values over time, one line without markers per series, ex. file system"""
+
+    savefig_kwargs = {"bbox_inches": "tight"}
+
+    def __init__(
+        self,
+        series: dict[str, pd.Series],
+        out: str,
+        title: str,
+        xlabel: str,
+        ylabel: str,
+    ):
+        self.series = series
+        self.out = out
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+
+        RENDERER.submit(self)
+
+    def draw(self, ax: Axes):
+        for name, values in self.series.items():
+            ax.plot(values.index, values.to_numpy(), label=name, linewidth=0.8)
+        ax.set_title(self.title)
+        ax.set_xlabel(self.xlabel)
+        ax.set_ylabel(self.ylabel)
+        ax.set_ylim(bottom=0)
+        ax.grid(alpha=0.3)
+        ax.legend()
+
+
+class HeatmapPlot:
+    """Values over a grid of two parameters, every cell annotated"""
+
+    savefig_kwargs = {"bbox_inches": "tight"}
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        out: str,
+        title: str,
+        xlabel: str,
+        ylabel: str,
+        colorbar_label: str,
+        lower_is_better: bool = False,
+    ):
+        self.df = df
+        self.out = out
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.colorbar_label = colorbar_label
+        self.lower_is_better = lower_is_better
+
+        RENDERER.submit(self)
+
+    def draw(self, ax: Axes):
+        # cells of the grid without a result stay blank
+        values = np.ma.masked_invalid(self.df.to_numpy(dtype=float))
+        # the better end of the scale is bright for both kinds of metric
+        cmap = "viridis_r" if self.lower_is_better else "viridis"
+        image = ax.imshow(values, cmap=cmap, aspect="auto")
+        ax.figure.colorbar(image, ax=ax, label=self.colorbar_label)
+
+        for (row, column), value in np.ndenumerate(values.filled(np.nan)):
+            if np.isnan(value):
+                continue
+            bright = image.cmap(image.norm(value))[:3]
+            ax.text(
+                column,
+                row,
+                f"{value:.4g}",
+                ha="center",
+                va="center",
+                size=7,
+                color="black" if np.mean(bright) > 0.5 else "white",
+            )
+
+        ax.set_xticks(np.arange(len(self.df.columns)), self.df.columns)
+        ax.set_yticks(np.arange(len(self.df.index)), self.df.index)
+        ax.set_title(self.title)
+        ax.set_xlabel(self.xlabel)
+        ax.set_ylabel(self.ylabel)
+
+
+class ScalingPlot:
+    """
+    Measured values against data size with fitted curves extrapolated to the
+    target sizes, the prediction interval of the best fit is shaded
+    """
+
+    savefig_kwargs = {"bbox_inches": "tight"}
+
+    def __init__(
+        self,
+        measured: pd.Series,
+        curves: dict[str, pd.Series],
+        best: str,
+        interval: tuple[pd.Series, pd.Series],
+        targets: list[float],
+        out: str,
+        title: str,
+        xlabel: str,
+        ylabel: str,
+    ):
+        self.measured = measured
+        self.curves = curves
+        self.best = best
+        self.interval = interval
+        self.targets = targets
+        self.out = out
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+
+        RENDERER.submit(self)
+
+    def draw(self, ax: Axes):
+        low, high = self.interval
+        ax.fill_between(
+            low.index,
+            low.to_numpy(),
+            high.to_numpy(),
+            alpha=0.2,
+            label=f"{self.best} prediction interval",
+        )
+        for name, curve in self.curves.items():
+            best = name == self.best
+            ax.plot(
+                curve.index,
+                curve.to_numpy(),
+                label=name,
+                linewidth=1.5 if best else 0.8,
+                linestyle="-" if best else "--",
+            )
+        ax.scatter(
+            self.measured.index,
+            self.measured.to_numpy(),
+            s=12,
+            color="black",
+            zorder=3,
+            label="measured",
+        )
+        for target in self.targets:
+            ax.axvline(target, color="gray", linewidth=0.5, linestyle=":")
+
+        # linear fits may cross zero below the measured sizes
+        ax.set_xscale("log")
+        ax.set_yscale("log", nonpositive="mask")
+        ax.set_title(self.title)
+        ax.set_xlabel(self.xlabel)
+        ax.set_ylabel(self.ylabel)
+        ax.grid(alpha=0.3)
+        ax.legend(fontsize=8)
+
+
+class TexTable:
+    def __init__(
+        self, df: pd.DataFrame, name: str, tool_name: ToolName, with_index: bool = True
+    ):
+        self.df = df
+        self.name = name
+        self.with_index = with_index
+        self.output_dir = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.TEX}/{tool_name}"
+        create_dir(self.output_dir)
+
+    @profiled
+    def export(self):
+        filename = f"{self.output_dir}/{self.name}.{FileExportType.TEX}"
+        target = BUILD_CACHE.target(
+            f"TexTable:{filename}", [], self.df.to_csv(), self.with_index
+        )
+        if target.is_fresh():
+            logger.info(f"Latex table {filename} is up to date, skipping")
+            BuildCache.register_output(filename)
+            return
+
+        with target:
+            logger.info(f"Exporting latex table to {filename}")
+            with PROFILER.span("to_latex"):
+                self.df.to_latex(filename, index=self.with_index, float_format="%.2f")
+            BuildCache.register_output(filename)
+
+
+class DfSnapshot:
+    """Lines of a df dump, the tool and test come from the name of the dump"""
+
+    table = "df_snapshot"
+    deduplication_test = "deduplication"
+
+    class Schema(StrEnum):
+        FILESYSTEM = "filesystem"
+        BLOCKS = "blocks"
+        USED = "used"
+        AVAILABLE = "available"
+        MOUNTED_ON = "mounted_on"
+        WHEN = "when"
+        FILE_SIZE_MEGABYTES = "file_size_megabytes"
+
+    @staticmethod
+    def is_snapshot(filename: str) -> bool:
+        return filename.startswith("df_") and filename.endswith(".txt")
+
+    @staticmethod
+    def parse_filename(filename: str) -> tuple[str, str, str, int | None]:
+        # df_before_bonnie.txt
+        # df_after_fio_random_read_test.txt
+        # df_after_deduplication_dedup_16M.txt
+        _, when, name = filename.removesuffix(".txt").split("_", 2)
+        if when not in (WhenType.BEFORE, WhenType.AFTER):
+            raise Exception(f"Invalid df file type: '{when}', in file: '{filename}'")
+
+        if name.startswith(f"{ToolName.FIO}_"):
+            return when, ToolName.FIO, name.removeprefix(f"{ToolName.FIO}_"), None
+        if name.startswith(f"{DfSnapshot.deduplication_test}_"):
+            tool, file_size = name.split("_")[1:3]
+            file_size = int(file_size.removesuffix("M"))
+            return when, tool, DfSnapshot.deduplication_test, file_size
+
+        return when, name, name, None
+
+    @staticmethod
+    @profiled
+    def read(path: str) -> dict[str, pd.DataFrame]:
+        rows = []
+        with SOURCES.open(path) as f:
+            for line in f:
+                fields = line.split(maxsplit=5)
+                # skips the headers, repeated for every df call
+                if len(fields) < 6 or not fields[1].isdigit():
+                    continue
+
+                filesystem, blocks, used, available, _, mounted_on = fields
+                rows.append(
+                    (filesystem, int(blocks), int(used), int(available), mounted_on)
+                )
+
+        when, _, _, file_size = DfSnapshot.parse_filename(os.path.basename(path))
+        df = pd.DataFrame(rows, columns=list(DfSnapshot.Schema)[:5])
+        df[DfSnapshot.Schema.MOUNTED_ON] = df[DfSnapshot.Schema.MOUNTED_ON].str.strip()
+        df[DfSnapshot.Schema.WHEN] = when
+        df[DfSnapshot.Schema.FILE_SIZE_MEGABYTES] = file_size
+        return {DfSnapshot.table: df}
+
+
+class SpaceUsageDf:
+    class __DfResult:
+        def __init__(self, before, after, name):
+            self.before = before
+            self.after = after
+            self.name = name
+
+        def x(self):
+            return self.name
+
+        def y(self):
+            return (self.after - self.before) / 1000_000  # in gigabytes
+
+    def __init__(
+        self,
+        input_file_before,
+        input_file_after,
+        output_image,
+        title,
+        tool_name: ToolName,
+        exclude_fs: list[FilesystemType] = [],
+    ):
+        self.input_file_before = input_file_before
+        self.input_file_after = input_file_after
+        self.output_image = output_image
+        self.title = title
+        self.exclude_fs = exclude_fs
+
+        result = self.__parse()
+        self.__plot(result, self.title, tool_name)
+
+    def __parse(self):
+        result = []
+        for path in FilesystemType:
+            if path in self.exclude_fs:
+                continue
+
+            mount_point = FS_MOUNT_POINTS[path]
+            before = self.read_used_space(
+                f"fs/{path}/{self.input_file_before}", mount_point
+            )
+            after = self.read_used_space(
+                f"fs/{path}/{self.input_file_after}", mount_point
+            )
+            if np.isnan(before) or np.isnan(after):
+                logger.warning(f"Cannot read df file for '{path}'. Skipping")
+                continue
+
+            result.append(self.__DfResult(before, after, str(path)))
+
+        return result
+
+    @staticmethod
+    def read_used_space(path: str, mount_point: str) -> float:
+        df = WAREHOUSE.query(
+            DfSnapshot.table, source=path, filesystem=mount_point
+        )  # one line for every df call of the test
+        return df[DfSnapshot.Schema.USED].mean() if not df.empty else np.nan
+
+    def __plot(self, results, title: str, tool_name: ToolName):
+        x = [result.x() for result in results]
+        y = [result.y() for result in results]
+        xlabel = "File system"
+        ylabel = "Space used (GB)"
+        filename = self.output_image
+
+        BarPlot(x, y, xlabel, ylabel, title, filename, tool_name, PlotUnit.SCALAR)
+
+
+def confidence_interval(mean, std, count):
+    """Two-sided 95% Student's t confidence interval of the mean"""
+    count = np.asarray(count)
+    dof = np.clip(count - 1, 0, len(T_CRITICAL_95))
+    t = np.append([np.nan], T_CRITICAL_95)[dof]
+    t = np.where(count - 1 > len(T_CRITICAL_95), 1.96, t)
+    half_width = t * std / np.sqrt(count)
+    return mean - half_width, mean + half_width
+
+
+# two-sided 95% critical values of Student's t distribution for 1..30 dof
+T_CRITICAL_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]  # fmt: skip
+
+
+class BonnieResult:
+    """Bonnie++ results of every run read into typed columns, one row per run"""
+
+    # CSV format taken from manual page bon_csv2html(1)
+    #    FORMAT
+    #    This is a list of the fields used in the CSV files  format  version  2.
+    #    Format  version  1  was  the type used in Bonnie++ < 1.90.  Before each
+    #    field I list the field number as well as the name given in the heading
+
+    #    0 format_version
+    #           Version of the output format in use (1.98)
+
+    #    1 bonnie_version
+    #           (1.98)
+
+    #    2 name Machine Name
+
+    #    3 concurrency
+    #           The number of copies of each operation to be  run  at  the  same
+    #           time
+
+    #    4 seed Random number seed
+
+    #    5 file_size
+    #           Size in megs for the IO tests
+
+    #    6 chunk_size
+    #           Size of chunks in bytes
+
+    #    7 seeks
+    #           Number of seeks for random seek test
+
+    #    8 seek_proc_count
+    #           Number of seeker processes for the random seek test
+
+    #    9 putc,putc_cpu
+    #           Results for writing a character at a time K/s,%CPU
+
+    #    11 put_block,put_block_cpu
+    #           Results for writing a block at a time K/s,%CPU
+
+    #    13 rewrite,rewrite_cpu
+    #           Results for reading and re-writing a block at a time K/s,%CPU
+
+    #    15 getc,getc_cpu
+    #           Results for reading a character at a time K/s,%CPU
+
+    #    17 get_block,get_block_cpu
+    #           Results for reading a block at a time K/s,%CPU
+
+    #    19 seeks,seeks_cpu
+    #           Results for the seek test seeks/s,%CPU
+
+    #    21 num_files
+    #           Number of files for file-creation tests (units of 1024 files)
+
+    #    22 max_size
+    #           The  maximum size of files for file-creation tests.  Or the type
+    #           of files for links.
+
+    #    23 min_size
+    #           The minimum size of files for file-creation tests.
+
+    #    24 num_dirs
+    #           The number of directories for creation of files in multiple  di‐
+    #           rectories.
+
+    #    25 file_chunk_size
+    #           The size of blocks for writing multiple files.
+
+    #    26 seq_create,seq_create_cpu
+    #           Rate of creating files sequentially files/s,%CPU
+
+    #    28 seq_stat,seq_stat_cpu
+    #           Rate of reading/stating files sequentially files/s,%CPU
+
+    #    30 seq_del,seq_del_cpu
+    #           Rate of deleting files sequentially files/s,%CPU
+
+    #    32 ran_create,ran_create_cpu
+    #           Rate of creating files in random order files/s,%CPU
+
+    #    34 ran_stat,ran_stat_cpu
+    #           Rate of deleting files in random order files/s,%CPU
+
+    #    36 ran_del,ran_del_cpu
+    #           Rate of deleting files in random order files/s,%CPU
+
+    #    38 putc_latency,put_block_latency,rewrite_latency
+    #           Latency  (maximum  amount  of  time  for a single operation) for
+    #           putc, put_block, and reqrite
+
+    #    41 getc_latency,get_block_latency,seeks_latency
+    #           Latency for getc, get_block, and seeks
+
+    #    44 seq_create_latency,seq_stat_latency,seq_del_latency
+    #           Latency for seq_create, seq_stat, and seq_del
+
+    #    47 ran_create_latency,ran_stat_latency,ran_del_latency
+    #           Latency for ran_create, ran_stat, and ran_del
+    fields = [
+        "format_version",
+        "bonnie_version",
+        "name",
+        "concurrency",
+        "seed",
+        "file_size",
+        "chunk_size",
+        "num_seeks",
+        "seek_proc_count",
+        "putc",
+        "putc_cpu",
+        "put_block",
+        "put_block_cpu",
+        "rewrite",
+        "rewrite_cpu",
+        "getc",
+        "getc_cpu",
+        "get_block",
+        "get_block_cpu",
+        "seeks",
+        "seeks_cpu",
+        "num_files",
+        "max_size",
+        "min_size",
+        "num_dirs",
+        "file_chunk_size",
+        "seq_create",
+        "seq_create_cpu",
+        "seq_stat",
+        "seq_stat_cpu",
+        "seq_del",
+        "seq_del_cpu",
+        "ran_create",
+        "ran_create_cpu",
+        "ran_stat",
+        "ran_stat_cpu",
+        "ran_del",
+        "ran_del_cpu",
+        "putc_latency",
+        "put_block_latency",
+        "rewrite_latency",
+        "getc_latency",
+        "get_block_latency",
+        "seeks_latency",
+        "seq_create_latency",
+        "seq_stat_latency",
+        "seq_del_latency",
+        "ran_create_latency",
+        "ran_stat_latency",
+        "ran_del_latency",
+    ]
+    configuration_fields = fields[:9] + fields[21:26]
+    result_fields = fields[9:21] + fields[26:38]
+    latency_fields = fields[38:50]
+
+    # bonnie prints +++++ or +++ when a test finished too quickly to be measured
+    not_measured = ["+++++", "+++"]
+    latency_units = {"us": 0.001, "ms": 1, "s": 1000}  # to milliseconds
+
+    table = "bonnie"
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        NAME = "name"
+
+    def __init__(self, input_file: str, df: pd.DataFrame | None = None):
+        self.input_file = input_file
+        self.df = self.__parse() if df is None else df
+
+    @profiled
+    def __parse(self) -> pd.DataFrame:
+        frames = []
+        for path in FilesystemType:
+            df = WAREHOUSE.query(self.table, source=f"fs/{path}/{self.input_file}")
+            if df.empty:
+                logger.warning(f"Cannot read bonnie results for '{path}'. Skipping")
+                continue
+
+            df.insert(0, BonnieResult.Schema.FS_TYPE, str(path))
+            frames.append(df)
+
+        df = pd.concat(frames, ignore_index=True)
+        # sqlite returns None for missing values and untyped columns when empty
+        df[self.configuration_fields] = df[self.configuration_fields].fillna(np.nan)
+        numeric_fields = self.result_fields + self.latency_fields
+        df[numeric_fields] = df[numeric_fields].astype(float)
+        return df
+
+    @staticmethod
+    @profiled
+    def read(path: str) -> dict[str, pd.DataFrame]:
+        with SOURCES.open(path) as f:
+            df = pd.read_csv(
+                f,
+                header=None,
+                names=BonnieResult.fields,
+                dtype={
+                    field: str
+                    for field in BonnieResult.configuration_fields
+                    + BonnieResult.latency_fields
+                },
+                na_values=BonnieResult.not_measured,
+                skip_blank_lines=True,
+            )
+        # repeated csv headers printed by bonnie
+        df = df[df["format_version"] != "format_version"]
+        df[BonnieResult.result_fields] = df[BonnieResult.result_fields].astype(float)
+
+        for field in BonnieResult.latency_fields:
+            parts = df[field].str.extract(r"^(?P<value>[\d.]+)(?P<unit>us|ms|s)$")
+            df[field] = parts["value"].astype(float) * parts["unit"].map(
+                BonnieResult.latency_units
+            )
+
+        return {BonnieResult.table: df}
+
+    def exclude(self, exclude: list[FilesystemType]) -> "BonnieResult":
+        excluded = [str(path) for path in exclude]
+        df = self.df[~self.df[BonnieResult.Schema.FS_TYPE].isin(excluded)]
+        return BonnieResult(self.input_file, df)
+
+    @profiled
+    def average(self) -> pd.DataFrame:
+        """Average of all runs per filesystem in the bonnie csv format"""
+        grouped = self.df.groupby(BonnieResult.Schema.FS_TYPE, sort=False)
+        df = grouped[self.configuration_fields].first()
+        df[self.result_fields] = grouped[self.result_fields].mean().round(1)
+        df[self.latency_fields] = (
+            grouped[self.latency_fields].mean().round(1).astype(str) + "ms"
+        )
+        df[self.latency_fields] = df[self.latency_fields].replace("nanms", "")
+        return df[self.fields].reset_index(drop=True)
+
+    @profiled
+    def statistics(self) -> pd.DataFrame:
+        """Mean, median, standard deviation and 95% confidence interval of all runs"""
+        fields = self.result_fields + self.latency_fields
+        df = self.df.groupby(BonnieResult.Schema.FS_TYPE, sort=False)[fields].agg(
+            ["mean", "median", "std", "count"]
+        )
+        mean = df.xs("mean", axis=1, level=1)
+        std = df.xs("std", axis=1, level=1)
+        count = df.xs("count", axis=1, level=1)
+        ci_low, ci_high = confidence_interval(mean, std, count)
+
+        ci = pd.concat(
+            {
+                "ci_low": pd.DataFrame(ci_low, index=df.index, columns=fields),
+                "ci_high": pd.DataFrame(ci_high, index=df.index, columns=fields),
+            },
+            axis=1,
+        ).swaplevel(axis=1)
+        df = pd.concat([df, ci], axis=1)
+        df = df[fields]
+        df.index.name = None
+        return df
+
+
+class BonnieBenchmark:
+    output_html_path = GRAPHS_OUTPUT_DIR + "/html"
+    output_tex = GRAPHS_OUTPUT_DIR + "/tex"
+    output_csv = BONNIE_OUTPUT_DIR + "/bonnie++.csv"
+    output_csv_all = BONNIE_OUTPUT_DIR + "/bonnie++_all.csv"
+    output_html = output_html_path + "/bonnie-graphs.html"
+    output_html_all = output_html_path + "/bonnie-graphs_all.html"
+    output_csv_statistics = BONNIE_OUTPUT_DIR + "/bonnie++_statistics.csv"
+    output_html_statistics = output_html_path + "/bonnie-statistics.html"
+    tool_name = ToolName.BONNIE
+
+    input_file = "out/bonnie/out.csv"
+    input_file_df_before = "out/bonnie/df_before_bonnie.txt"
+    input_file_df_after = "out/bonnie/df_after_bonnie.txt"
+
+    def __init__(self):
+        logger.info(
+            f"Initializing bonnie graphing with input {self.input_file} and output {self.output_csv}, {self.output_html_path}"
+        )
+
+    def schedule(self, graph: TaskGraph):
+        INGEST.schedule(graph, ResultsIngest.BONNIE, ResultsIngest.DF)
+        graph.add("bonnie", self.__run, "ingest:bonnie", "ingest:df")
+
+    def __run(self):
+        create_dir(self.output_tex)
+        create_dir(self.output_html_path)
+
+        target = BUILD_CACHE.target("BonnieBenchmark", self.__input_files())
+        if target.is_fresh():
+            logger.info("Bonnie inputs are unchanged, skipping")
+            return
+
+        with target:
+            self.__generate()
+
+    def __input_files(self):
+        files = [BONNIE_CONFIG]
+        for path in FilesystemType:
+            files.append(f"fs/{path}/{self.input_file}")
+            files.append(f"fs/{path}/{self.input_file_df_before}")
+            files.append(f"fs/{path}/{self.input_file_df_after}")
+
+        return files
+
+    def __generate(self):
+        try:
+            result = BonnieResult(self.input_file)
+        except (pd.errors.ParserError, ValueError):
+            logger.warning(f"Failed to generate bonnie table: {self.input_file}")
+            return
+
+        self.__export(
+            result, self.output_csv_all, self.output_html_all, ToolName.BONNIE_ALL
+        )
+        self.__export_statistics(result)
+
+        result = result.exclude([FilesystemType.NILFS_DEDUP])
+        self.__export(result, self.output_csv, self.output_html, ToolName.BONNIE)
+        self.__df()
+        self.__test_configuration()
+
+    def __export(
+        self, result: "BonnieResult", output_csv, output_html, tool_name: ToolName
+    ):
+        average = result.average()
+        logger.info(f"Saving averaged bonnie results to {output_csv}")
+        average.to_csv(output_csv, header=False, index=False)
+        BuildCache.register_output(output_csv)
+        self.__generate_table(average, output_html, tool_name)
+
+    def __export_statistics(self, result: "BonnieResult"):
+        statistics = result.statistics()
+        logger.info(f"Saving bonnie statistics to {self.output_csv_statistics}")
+        statistics.to_csv(self.output_csv_statistics)
+        statistics.to_html(self.output_html_statistics, float_format="%.2f")
+        BuildCache.register_output(
+            self.output_csv_statistics, self.output_html_statistics
+        )
+
+    def __generate_table(self, average: pd.DataFrame, output_html, tool_name: ToolName):
+        df = average.set_index(BonnieResult.Schema.NAME)[BonnieResult.result_fields]
+        # tests which finished too quickly to be measured are reported as 0
+        df = df.astype(float).fillna(0)
+        df = self.__convert_df_to_multidimentional(df)
+
+        df.to_html(output_html)
+        BuildCache.register_output(output_html)
+
+        total_tables = 12
+        columns_count = 2
+        for i in range(0, total_tables * columns_count, columns_count):
+            df_part = df.iloc[:, i : (i + columns_count)]
+            name = f"bonnie{int(i / columns_count + 1)}"
+            TexTable(df_part, name, tool_name).export()
+
+    def __convert_df_to_multidimentional(self, df):
+        column_names = pd.DataFrame(
+            [
                 ["Character write", "KiB/s"],
                 ["Character write", "\%CPU"],
                 ["Block write", "KiB/s"],
@@ -592,94 +2191,806 @@ class BonnieBenchmark:
             columns=["Filesystem", ""],
         )
 
-        columns = pd.MultiIndex.from_frame(column_names)
+        columns = pd.MultiIndex.from_frame(column_names)
+
+        df.columns = columns
+        df.index.name = None
+        return df
+
+    def __df(self):
+        logger.info("Generating df graphs for bonnie")
+        input_file_before = self.input_file_df_before
+        input_file_after = self.input_file_df_after
+        output_image_name = "bonnie_metadata_size"
+        title = "Space occupied after Bonnie++ test"
+
+        SpaceUsageDf(
+            input_file_before,
+            input_file_after,
+            output_image_name,
+            title,
+            self.tool_name,
+            [FilesystemType.NILFS_DEDUP],
+        )
+
+        output_image_name = "bonnie_metadata_size_all"
+
+        SpaceUsageDf(
+            input_file_before,
+            input_file_after,
+            output_image_name,
+            title,
+            self.tool_name,
+        )
+
+    class __BonnieConfigType(Enum):
+        SEED = "SEED"
+        BLOCK_SIZE = "BLOCK_SIZE"
+        BONNIE_NUMBER_OF_FILES = "BONNIE_NUMBER_OF_FILES"
+        FILE_SIZE = "FILE_SIZE"
+        RUNS = "BONNIE_RUNS"
+
+    def __test_configuration(self):
+        config = self.__test_configuration_read()
+        df = self.__test_configuration_parse(config)
+        self.__test_configuration_export(df)
+
+    def __test_configuration_read(self):
+        params = {}
+        with open(BONNIE_CONFIG, "r") as f:
+            for line in f.readlines():
+                splitted = line.split("=")
+                key = splitted[0].strip()
+                if any(type.value in key for type in self.__BonnieConfigType):
+                    # split to get two sides of expression
+                    # ex. SEED=29047 -> params["SEED"] = 29047
+                    value = splitted[1].strip()
+                    params[key] = value
+
+        return params
+
+    def __test_configuration_parse(self, params):
+        df = pd.DataFrame(
+            {
+                "Parameter": [
+                    "seed",
+                    "block size",
+                    "file size",
+                    "test runs",
+                ],
+                "Value": [
+                    int(params[self.__BonnieConfigType.SEED.value]),
+                    int(params[self.__BonnieConfigType.BLOCK_SIZE.value]),
+                    params[self.__BonnieConfigType.FILE_SIZE.value],
+                    params[self.__BonnieConfigType.RUNS.value],
+                ],
+            }
+        )
+        return df
+
+    def __test_configuration_export(self, df):
+        name = "bonnie_configuration"
+        TexTable(df, name, ToolName.BONNIE, with_index=False).export()
+
+
+class FioLogType(StrEnum):
+    BANDWIDTH = "bw"
+    IOPS = "iops"
+    LATENCY = "lat"
+    COMPLETION_LATENCY = "clat"
+    SUBMISSION_LATENCY = "slat"
+
+
+class FioLog:
+    class Schema(StrEnum):
+        TIME = "time"
+        VALUE = "value"
+        DIRECTION = "direction"
+        BLOCK_SIZE = "block_size"
+        OFFSET = "offset"
+
+    # fio log line format: time (msec), value, data direction, block size, offset
+    columns = list(Schema)
+
+    @staticmethod
+    @profiled
+    def read_csv(file, columns: list[Schema] = None, **kwargs):
+        # Only the requested columns are parsed, in bulk by the C engine
+        if columns is None:
+            columns = [FioLog.Schema.TIME, FioLog.Schema.VALUE]
+        columns = sorted(columns, key=FioLog.columns.index)
+
+        return pd.read_csv(
+            file,
+            header=None,
+            usecols=[FioLog.columns.index(column) for column in columns],
+            names=columns,
+            dtype=np.int64,
+            skipinitialspace=True,
+            engine="c",
+            **kwargs,
+        )
+
+    @staticmethod
+    def read_chunks(path: str, columns: list[Schema] = None, chunk_size: int = None):
+        if chunk_size is None:
+            chunk_size = MEMORY.chunk_size()
+
+        with (
+            SOURCES.open(path, "rb") as file,
+            FioLog.read_csv(file, columns, chunksize=chunk_size) as reader,
+        ):
+            yield from reader
+
+    @staticmethod
+    def parse_filename(filename: str) -> tuple[str, str]:
+        # match v______________v__v
+        # random_read_test_bw.1.log
+        test_name, log_type = filename.split(".")[0].rsplit("_", 1)
+        return test_name, log_type
+
+
+class RunningStatistics:
+    """
+    Count, mean, extremes and standard deviation of integer samples seen in
+    chunks. Chunk variances are combined with the parallel algorithm of Chan et
+    al., the mean comes from an exact integer sum.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+
+        count = len(values)
+        chunk_sum = int(values.sum())
+        chunk_mean = chunk_sum / count
+        chunk_m2 = float(np.square(values - chunk_mean).sum())
+
+        if self.count > 0:
+            delta = chunk_mean - self.mean()
+            total = self.count + count
+            self.m2 += chunk_m2 + delta**2 * self.count * count / total
+            self.min = min(self.min, int(values.min()))
+            self.max = max(self.max, int(values.max()))
+        else:
+            self.m2 = chunk_m2
+            self.min = int(values.min())
+            self.max = int(values.max())
+
+        self.count += count
+        self.sum += chunk_sum
+
+    def mean(self) -> float:
+        return self.sum / self.count
+
+    def std(self) -> float:
+        return np.sqrt(self.m2 / self.count)
+
+
+class FioLogResult:
+    """Statistics of every fio log, aggregated once per log at ingestion"""
+
+    table = "fio_summary"
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        TEST = "test"
+        LOG_TYPE = "log_type"
+        SAMPLES = "samples"
+        AVERAGE = "average"
+        MIN = "min"
+        MAX = "max"
+        STD = "std"
+
+    def __init__(self, log_type: FioLogType):
+        df = WAREHOUSE.query(FioLogResult.table, partition=True, log_type=log_type)
+        if df.empty:
+            self.df = pd.DataFrame(columns=list(FioLogResult.Schema))
+            return
+
+        df = FioLogResult.in_filesystem_order(df)
+        for source in df.loc[df["samples"] == 0, "source"]:
+            logger.warning(f"Empty fio log: {source}")
+
+        samples = df["samples"].where(df["samples"] > 0)
+        self.df = pd.DataFrame(
+            {
+                FioLogResult.Schema.FS_TYPE: df["fs_type"],
+                FioLogResult.Schema.TEST: df["test"],
+                FioLogResult.Schema.LOG_TYPE: df["log_type"],
+                FioLogResult.Schema.SAMPLES: df["samples"],
+                FioLogResult.Schema.AVERAGE: (df["sum"] / samples).fillna(0),
+                FioLogResult.Schema.MIN: df["min"].fillna(0),
+                FioLogResult.Schema.MAX: df["max"].fillna(0),
+                FioLogResult.Schema.STD: np.sqrt(df["m2"] / samples).fillna(0),
+            }
+        ).reset_index(drop=True)
+
+    @staticmethod
+    @profiled
+    def aggregate(
+        path: str, log_type: FioLogType, file_size: int, loops: int
+    ) -> dict[str, pd.DataFrame]:
+        """Reads the log once, in chunks, into the tables of the fio results"""
+        logger.debug(f"Aggregating fio log: {path}")
+        log_type = str(log_type)
+        statistics = RunningStatistics()
+        histogram = (
+            LatencyHistogram() if log_type in FioLatencyResult.log_types else None
+        )
+        per_loop = (
+            LoopAverages(file_size, loops)
+            if log_type in FioLoopResult.log_types
+            else None
+        )
+        timeline = (
+            TimeBuckets()
+            if log_type in FioTimelineResult.log_types + FioSteadyStateResult.log_types
+            else None
+        )
+
+        columns = [FioLog.Schema.TIME, FioLog.Schema.VALUE, FioLog.Schema.BLOCK_SIZE]
+        for df in FioLog.read_chunks(path, columns):
+            values = df[FioLog.Schema.VALUE].to_numpy()
+            statistics.update(values)
+            if histogram is not None:
+                histogram.record(values)
+            if per_loop is not None:
+                per_loop.update(df[FioLog.Schema.BLOCK_SIZE].to_numpy(), values)
+            if timeline is not None:
+                timeline.update(df[FioLog.Schema.TIME].to_numpy(), values)
+
+        tables = {
+            FioLogResult.table: pd.DataFrame(
+                {
+                    "log_type": [log_type],
+                    "samples": [statistics.count],
+                    "sum": [statistics.sum],
+                    "m2": [statistics.m2],
+                    "min": [statistics.min],
+                    "max": [statistics.max],
+                }
+            )
+        }
+        if histogram is not None:
+            buckets = np.flatnonzero(histogram.counts)
+            tables[FioLatencyResult.table] = pd.DataFrame(
+                {
+                    "log_type": log_type,
+                    "bucket": buckets,
+                    "count": histogram.counts[buckets],
+                }
+            )
+        if per_loop is not None:
+            loops = np.flatnonzero(per_loop.counts)
+            tables[FioLoopResult.table] = pd.DataFrame(
+                {
+                    "log_type": log_type,
+                    "loop": loops + 1,
+                    "samples": per_loop.counts[loops],
+                    "sum": per_loop.sums[loops],
+                }
+            )
+        if log_type in FioTimelineResult.log_types:
+            time, value = FioTimelineResult.downsample(timeline)
+            tables[FioTimelineResult.table] = pd.DataFrame(
+                {"log_type": log_type, "time": time, "value": value}
+            )
+        if log_type in FioSteadyStateResult.log_types:
+            window = FioSteadyStateResult.detect(timeline)
+            tables[FioSteadyStateResult.table] = pd.DataFrame(
+                {"log_type": [log_type], **{k: [v] for k, v in window.items()}}
+            )
+
+        return tables
+
+    @staticmethod
+    def in_filesystem_order(df: pd.DataFrame) -> pd.DataFrame:
+        order = {str(filesystem): i for i, filesystem in enumerate(FilesystemType)}
+        return df.sort_values(
+            ["fs_type", "test", "source"],
+            key=lambda column: (
+                column.map(order) if column.name == "fs_type" else column
+            ),
+            kind="stable",
+        )
+
+
+class LatencyHistogram:
+    """
+    Latency histogram in the spirit of HDR histogram. Buckets grow by a
+    constant ratio, so percentiles are reported with a bounded relative error
+    and memory does not depend on the number of recorded samples.
+    """
+
+    relative_error = 0.01
+    max_value = 10**13  # in nanoseconds, values above share the last bucket
+    growth = (1 + relative_error) / (1 - relative_error)
+    buckets = int(np.ceil(np.log(max_value) / np.log(growth))) + 2
+
+    def __init__(self):
+        self.counts = np.zeros(self.buckets, dtype=np.int64)
+        self.total = 0
+        self.max = 0
+
+    def record(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+
+        # bucket 0 holds values below 1, bucket i covers [growth^(i-1), growth^i)
+        index = np.log(np.maximum(values, 1)) / np.log(self.growth)
+        index = np.where(values >= 1, np.floor(index).astype(np.int64) + 1, 0)
+        index = np.clip(index, 0, self.buckets - 1)
+        self.counts += np.bincount(index, minlength=self.buckets)
+        self.total += len(values)
+        self.max = max(self.max, int(values.max()))
+
+    @staticmethod
+    def from_counts(counts: np.ndarray, max: int) -> "LatencyHistogram":
+        histogram = LatencyHistogram()
+        histogram.counts = counts
+        histogram.total = int(counts.sum())
+        histogram.max = max
+        return histogram
+
+    def percentile(self, percentile: float) -> float:
+        if self.total == 0:
+            return np.nan
+
+        rank = max(int(np.ceil(percentile / 100 * self.total)), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        if index == 0:
+            return 0.0
+
+        # midpoint of the bucket is within relative_error of every value in it
+        value = self.growth ** (index - 1) * (1 + self.growth) / 2
+        return min(value, self.max)
+
+
+class FioLatencyResult:
+    table = "fio_histogram"
+    log_types = [
+        FioLogType.LATENCY,
+        FioLogType.COMPLETION_LATENCY,
+        FioLogType.SUBMISSION_LATENCY,
+    ]
+    percentiles = [50, 90, 99, 99.9]
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        TEST = "test"
+        LOG_TYPE = "log_type"
+        SAMPLES = "samples"
+        P50 = "p50"
+        P90 = "p90"
+        P99 = "p99"
+        P99_9 = "p99.9"
+        MAX = "max"
+
+    def __init__(self, log_types: list[FioLogType]):
+        histograms = pd.concat(
+            [
+                WAREHOUSE.query(FioLatencyResult.table, partition=True, log_type=t)
+                for t in log_types
+            ]
+        )
+        summaries = pd.concat(
+            [
+                WAREHOUSE.query(FioLogResult.table, partition=True, log_type=t)
+                for t in log_types
+            ]
+        )
+        if histograms.empty:
+            self.df = pd.DataFrame(columns=list(FioLatencyResult.Schema))
+            return
+
+        # logs of the same filesystem and test (ex. one per fio job) are merged
+        key = ["fs_type", "test", "log_type"]
+        maxima = summaries.groupby(key)["max"].max()
+        histograms = FioLogResult.in_filesystem_order(histograms)
+
+        rows = []
+        for group, df in histograms.groupby(key, sort=False):
+            counts = np.bincount(
+                df["bucket"], weights=df["count"], minlength=LatencyHistogram.buckets
+            ).astype(np.int64)
+            h = LatencyHistogram.from_counts(counts, int(maxima[group]))
+            rows.append(
+                (*group, h.total, *[h.percentile(p) for p in self.percentiles], h.max)
+            )
+
+        self.df = pd.DataFrame(rows, columns=list(FioLatencyResult.Schema))
+
+
+class LoopAverages:
+    """
+    Running per-loop sums of a fio log. Every loop of a job transfers the
+    whole file once, so an I/O belongs to the loop given by the number of bytes
+    transferred before it. The logs are expected to hold one entry per I/O
+    (no log_avg_msec), as in tests/fio-job.cfg.
+    """
+
+    def __init__(self, file_size: int, loops: int):
+        self.file_size = file_size
+        self.loops = loops
+        self.sums = np.zeros(loops)
+        self.counts = np.zeros(loops, dtype=np.int64)
+        self.transferred = 0
+
+    def update(self, block_size: np.ndarray, values: np.ndarray):
+        if len(values) == 0:
+            return
+
+        end = self.transferred + np.cumsum(block_size)
+        loop = np.clip((end - block_size) // self.file_size, 0, self.loops - 1)
+        self.sums += np.bincount(loop, weights=values, minlength=self.loops)
+        self.counts += np.bincount(loop, minlength=self.loops)
+        self.transferred = end[-1]
+
+
+class FioLoopResult:
+    """Per-loop averages of the bandwidth and IOPS logs, see LoopAverages"""
+
+    table = "fio_loop"
+    log_types = [FioLogType.BANDWIDTH, FioLogType.IOPS]
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        TEST = "test"
+        LOG_TYPE = "log_type"
+        LOOP = "loop"
+        SAMPLES = "samples"
+        AVERAGE = "average"
+
+    def __init__(self, log_types: list[FioLogType]):
+        df = pd.concat(
+            [
+                WAREHOUSE.query(FioLoopResult.table, partition=True, log_type=t)
+                for t in log_types
+            ]
+        )
+        if df.empty:
+            self.df = pd.DataFrame(columns=list(FioLoopResult.Schema))
+            return
+
+        df = FioLogResult.in_filesystem_order(df)
+        key = ["fs_type", "test", "log_type", "loop"]
+        df = df.groupby(key, sort=False)[["samples", "sum"]].sum().reset_index()
+        df[FioLoopResult.Schema.AVERAGE] = df["sum"] / df["samples"]
+        self.df = df[list(FioLoopResult.Schema)]
+
+    @staticmethod
+    @profiled
+    def degradation(df: pd.DataFrame) -> pd.DataFrame:
+        """Least squares slope of the average over the loop number, per column"""
+        x = df.index.to_numpy(dtype=float)[:, np.newaxis]
+        y = df.to_numpy(dtype=float)
+        valid = ~np.isnan(y)
+        x = np.where(valid, x, np.nan)
+
+        x_mean = np.nanmean(x, axis=0)
+        y_mean = np.nanmean(y, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = np.nansum((x - x_mean) * (y - y_mean), axis=0) / np.nansum(
+                (x - x_mean) ** 2, axis=0
+            )
+            first = y_mean + slope * (df.index.min() - x_mean)
+            change = slope / first * 100
+
+        return pd.DataFrame({"slope": slope, "change": change}, index=df.columns)
+
+
+class TimeBuckets:
+    """
+    Running per-bucket sums of a fio log over its time column, in milliseconds.
+    Buckets start one millisecond wide and double in width, by adding pairs of
+    neighbours, whenever the log outgrows max_buckets. The resampling stays
+    exact and the memory bounded for logs of any duration.
+    """
+
+    max_buckets = 2**16
+
+    def __init__(self):
+        self.width = 1
+        self.sums = np.zeros(0)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, time: np.ndarray, values: np.ndarray):
+        if len(values) == 0:
+            return
+
+        while int(time.max()) // self.width >= self.max_buckets:
+            self.__merge()
+
+        buckets = time // self.width
+        size = max(len(self.sums), int(buckets.max()) + 1)
+        self.sums = np.pad(self.sums, (0, size - len(self.sums)))
+        self.counts = np.pad(self.counts, (0, size - len(self.counts)))
+        self.sums += np.bincount(buckets, weights=values, minlength=size)
+        self.counts += np.bincount(buckets, minlength=size)
+
+    def __merge(self):
+        if len(self.sums) % 2 == 1:
+            self.sums = np.append(self.sums, 0)
+            self.counts = np.append(self.counts, 0)
+        self.sums = self.sums.reshape(-1, 2).sum(axis=1)
+        self.counts = self.counts.reshape(-1, 2).sum(axis=1)
+        self.width *= 2
+
+    def series(self) -> tuple[np.ndarray, np.ndarray]:
+        """Centers of the non-empty buckets in seconds and their mean values"""
+        buckets = np.flatnonzero(self.counts)
+        time = (buckets + 0.5) * self.width / 1000
+        return time, self.sums[buckets] / self.counts[buckets]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling
+    (Steinarsson, 2013). The first and last points are always kept, of every
+    bucket in between the point forming the largest triangle with the point
+    kept before it and the average of the next bucket.
+    """
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    average_x = np.add.reduceat(x[: count - 1], edges[:-1]) / sizes
+    average_y = np.add.reduceat(y[: count - 1], edges[:-1]) / sizes
+    # the third point of the last bucket is the last point
+    average_x = np.append(average_x[1:], x[-1])
+    average_y = np.append(average_y[1:], y[-1])
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = count - 1
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        previous = kept[bucket]
+        area = np.abs(
+            (x[previous] - average_x[bucket]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y[bucket] - y[previous])
+        )
+        kept[bucket + 1] = start + np.argmax(area)
+
+    return kept
 
-        df = df.set_index("Filesystem")
-        df.columns = columns
-        df.index.name = None
-        return df
 
-    def __df(self):
-        logger.info("Generating df graphs for bonnie")
-        input_file_before = "out/bonnie/df_before_bonnie.txt"
-        input_file_after = "out/bonnie/df_after_bonnie.txt"
-        output_image_name = "bonnie_metadata_size"
-        title = "Space occupied after Bonnie++ test"
+class FioTimelineResult:
+    """
+    Bandwidth and IOPS over time, resampled into TimeBuckets and downsampled
+    with lttb to a fixed number of points per log at ingestion
+    """
 
-        SpaceUsageDf(
-            input_file_before,
-            input_file_after,
-            output_image_name,
-            title,
-            self.tool_name,
-            [FilesystemType.NILFS_DEDUP],
+    table = "fio_timeline"
+    log_types = [FioLogType.BANDWIDTH, FioLogType.IOPS]
+    points = 1000
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        TEST = "test"
+        LOG_TYPE = "log_type"
+        TIME = "time"
+        VALUE = "value"
+
+    def __init__(self, log_types: list[FioLogType]):
+        df = pd.concat(
+            [
+                WAREHOUSE.query(FioTimelineResult.table, partition=True, log_type=t)
+                for t in log_types
+            ]
         )
+        if df.empty:
+            self.df = pd.DataFrame(columns=list(FioTimelineResult.Schema))
+            return
 
-        output_image_name = "bonnie_metadata_size_all"
+        df = FioLogResult.in_filesystem_order(df)
+        self.df = df[list(FioTimelineResult.Schema)].reset_index(drop=True)
 
-        SpaceUsageDf(
-            input_file_before,
-            input_file_after,
-            output_image_name,
-            title,
-            self.tool_name,
+    @staticmethod
+    @profiled
+    def downsample(buckets: TimeBuckets) -> tuple[np.ndarray, np.ndarray]:
+        time, value = buckets.series()
+        kept = lttb(time, value, FioTimelineResult.points)
+        return time[kept], value[kept]
+
+
+class FioSteadyStateResult:
+    """
+    Steady-state window of the bandwidth logs, without the page cache warm-up
+    at the start and the end_fsync tail at the end. The TimeBuckets of a log
+    are grouped into batches and both ends are truncated with the MSER rule
+    (White, 1997): the cut minimizes the squared standard error of the mean of
+    the batches left, so batches are dropped only when they deviate from the
+    rest more than the noise. A cut of half of the log means that it does not
+    settle, ex. on every loop getting slower, and there is no steady state.
+    """
+
+    table = "fio_steady_state"
+    log_types = [FioLogType.BANDWIDTH]
+    batches = 200
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        TEST = "test"
+        LOG_TYPE = "log_type"
+        START = "start"
+        END = "end"
+        SAMPLES = "samples"
+        AVERAGE = "average"
+
+    def __init__(self, log_types: list[FioLogType]):
+        df = pd.concat(
+            [
+                WAREHOUSE.query(FioSteadyStateResult.table, partition=True, log_type=t)
+                for t in log_types
+            ]
         )
+        if df.empty:
+            self.df = pd.DataFrame(columns=list(FioSteadyStateResult.Schema))
+            return
 
-    class __BonnieConfigType(Enum):
-        SEED = "SEED"
-        BLOCK_SIZE = "BLOCK_SIZE"
-        BONNIE_NUMBER_OF_FILES = "BONNIE_NUMBER_OF_FILES"
-        FILE_SIZE = "FILE_SIZE"
-        RUNS = "BONNIE_RUNS"
+        df = FioLogResult.in_filesystem_order(df)
+        for source in df.loc[df["samples"] == 0, "source"]:
+            logger.warning(f"Fio log does not reach a steady state: {source}")
 
-    def __test_configuration(self):
-        config = self.__test_configuration_read()
-        df = self.__test_configuration_parse(config)
-        self.__test_configuration_export(df)
+        samples = df["samples"].where(df["samples"] > 0)
+        df[FioSteadyStateResult.Schema.AVERAGE] = df["sum"] / samples
+        self.df = df[list(FioSteadyStateResult.Schema)].reset_index(drop=True)
 
-    def __test_configuration_read(self):
-        params = {}
-        with open(BONNIE_CONFIG, "r") as f:
-            for line in f.readlines():
-                splitted = line.split("=")
-                key = splitted[0].strip()
-                if any(type.value in key for type in self.__BonnieConfigType):
-                    # split to get two sides of expression
-                    # ex. SEED=29047 -> params["SEED"] = 29047
-                    value = splitted[1].strip()
-                    params[key] = value
+    @staticmethod
+    @profiled
+    def detect(buckets: TimeBuckets) -> dict:
+        """Window in seconds with the sum and count of its samples"""
+        nonempty = np.flatnonzero(buckets.counts)
+        batches = min(FioSteadyStateResult.batches, len(nonempty))
+        if batches == 0:
+            return {"start": np.nan, "end": np.nan, "samples": 0, "sum": 0.0}
+
+        edges = np.linspace(0, len(nonempty), batches + 1).astype(np.int64)
+        sums = np.add.reduceat(buckets.sums[nonempty], edges[:-1])
+        counts = np.add.reduceat(buckets.counts[nonempty], edges[:-1])
+        means = sums / counts
+
+        start = FioSteadyStateResult.mser(means)
+        end = batches - FioSteadyStateResult.mser(means[start:][::-1])
+        if batches >= 4 and (start == batches // 2 or end == start + batches // 2):
+            return {"start": np.nan, "end": np.nan, "samples": 0, "sum": 0.0}
+
+        seconds = buckets.width / 1000
+        return {
+            "start": nonempty[edges[start]] * seconds,
+            "end": (nonempty[edges[end] - 1] + 1) * seconds,
+            "samples": counts[start:end].sum(),
+            "sum": sums[start:end].sum(),
+        }
 
-        return params
+    @staticmethod
+    def mser(means: np.ndarray) -> int:
+        """Batches to drop from the start, at most half of them"""
+        count = len(means)
+        if count < 4:
+            return 0
 
-    def __test_configuration_parse(self, params):
-        df = pd.DataFrame(
+        kept = count - np.arange(count)
+        suffix_sum = np.cumsum(means[::-1])[::-1]
+        suffix_squares = np.cumsum(means[::-1] ** 2)[::-1]
+        variance = suffix_squares / kept - (suffix_sum / kept) ** 2
+        return int(np.argmin((variance / kept)[: count // 2 + 1]))
+
+
+class FioSweepResult:
+    """
+    Summaries of the fio parameter sweep, the json output of fio for every test
+    of every variant of the job file generated by tests/fio_sweep.py, in
+    fio-sweep/VARIANT of the output directory
+    """
+
+    table = "fio_sweep"
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        TEST = "test"
+        IOENGINE = "ioengine"
+        BLOCK_SIZE = "blocksize"
+        IODEPTH = "iodepth"
+        DIRECT = "direct"
+        BANDWIDTH = "bandwidth"  # in megabytes / s
+        IOPS = "iops"
+        LATENCY = "latency"  # in microseconds
+        LATENCY_P99 = "latency_p99"
+
+    def __init__(self):
+        df = WAREHOUSE.query(FioSweepResult.table, partition=True)
+        if df.empty:
+            self.df = pd.DataFrame(columns=list(FioSweepResult.Schema))
+            return
+
+        schema = FioSweepResult.Schema
+        order = {str(filesystem): i for i, filesystem in enumerate(FilesystemType)}
+        df = df.sort_values(
+            ["fs_type", "test"],
+            key=lambda column: (
+                column.map(order) if column.name == "fs_type" else column
+            ),
+            kind="stable",
+        )
+        # fio reports bandwidth in KiB/s and latency in nanoseconds
+        self.df = pd.DataFrame(
             {
-                "Parameter": [
-                    "seed",
-                    "block size",
-                    "file size",
-                    "test runs",
-                ],
-                "Value": [
-                    int(params[self.__BonnieConfigType.SEED.value]),
-                    int(params[self.__BonnieConfigType.BLOCK_SIZE.value]),
-                    params[self.__BonnieConfigType.FILE_SIZE.value],
-                    params[self.__BonnieConfigType.RUNS.value],
-                ],
+                schema.FS_TYPE: df["fs_type"],
+                schema.TEST: df["test"],
+                schema.IOENGINE: df["ioengine"],
+                schema.BLOCK_SIZE: df["blocksize"],
+                schema.IODEPTH: df["iodepth"],
+                schema.DIRECT: df["direct"],
+                schema.BANDWIDTH: df["bw"] / 1000,
+                schema.IOPS: df["iops"],
+                schema.LATENCY: df["lat_mean"] / 1000,
+                schema.LATENCY_P99: df["clat_p99"] / 1000,
             }
-        )
-        return df
+        ).reset_index(drop=True)
 
-    def __test_configuration_export(self, df):
-        name = "bonnie_configuration"
-        TexTable(df, name, ToolName.BONNIE, with_index=False).export()
+    @staticmethod
+    def variant(row) -> str:
+        return f"{FioSweepResult.tex(row.ioengine)}, bs {row.blocksize}, iodepth {row.iodepth}"
+
+    @staticmethod
+    def tex(ioengine: str) -> str:
+        # cells of the tables are not escaped, ex. io_uring
+        return ioengine.replace("_", r"\_")
+
+    @staticmethod
+    @profiled
+    def read(path: str) -> dict[str, pd.DataFrame]:
+        with SOURCES.open(path) as f:
+            text = f.read()
+        # fio may print warnings before the json
+        output = json.loads(text[text.index("{") :])
+
+        options = output["global options"]
+        job = output["jobs"][0]
+        direction = "read" if job["read"]["io_bytes"] > 0 else "write"
+        result = job[direction]
+        percentiles = result["clat_ns"].get("percentile", {})
+        return {
+            FioSweepResult.table: pd.DataFrame(
+                {
+                    "ioengine": [options["ioengine"]],
+                    "blocksize": [options["blocksize"]],
+                    "iodepth": [int(options["iodepth"])],
+                    "direct": [int(options.get("direct", 0))],
+                    "direction": [direction],
+                    "bw": [result["bw"]],
+                    "iops": [result["iops"]],
+                    "lat_mean": [result["lat_ns"]["mean"]],
+                    "clat_p99": [percentiles.get("99.000000", np.nan)],
+                }
+            )
+        }
 
 
 class FioBenchmark:
-    fio_log_dir = f"{OUTPUT_DIR}/fio/logs"
-    data_dir = OUTPUT_DIR + "/fio/gnuplot"
     tool_name = ToolName.FIO
-    log_dir = f"{LOG_DIR}/fio"
+    latency_log_types = {
+        FioLogType.LATENCY: "Total",
+        FioLogType.COMPLETION_LATENCY: "Completion",
+        FioLogType.SUBMISSION_LATENCY: "Submission",
+    }
+    # display name, unit and divisor of the logged value
+    loop_log_types = {
+        FioLogType.BANDWIDTH: ("Bandwidth", "MB/s", 1000),
+        FioLogType.IOPS: ("IOPS", "IOPS", 1),
+    }
     tests = [
         "random_read_test",
         "random_write_test",
@@ -688,170 +2999,420 @@ class FioBenchmark:
     ]
 
     def __init__(self):
-        logger.info(f"Generating fio graphs from data dir {self.data_dir}")
-        self.__generate_fio_data_from_logs()
-        self.__fio()
-        self.__df()
-        self.__test_configuration()
+        logger.info("Generating fio graphs")
 
-    def __generate_fio_data_from_logs(self):
-        self.__copy_fio_logs()
-        self.__generate_gnuplot()
+    def schedule(self, graph: TaskGraph):
+        INGEST.schedule(
+            graph, ResultsIngest.FIO, ResultsIngest.FIO_SWEEP, ResultsIngest.DF
+        )
+        graph.add("fio:bandwidth", self.__bandwidth, "ingest:fio")
+        graph.add("fio:latency", self.__latency, "ingest:fio")
+        graph.add("fio:loops", self.__loops, "ingest:fio")
+        graph.add("fio:timelines", self.__timelines, "ingest:fio")
+        graph.add("fio:df", self.__df, "ingest:df")
+        graph.add("fio:configuration", self.__test_configuration)
+        graph.add("fio:sweep", self.__sweep, "ingest:fio_sweep")
+
+    def __bandwidth(self):
+        target = BUILD_CACHE.target("FioBenchmark:bandwidth", self.__input_files())
+        if target.is_fresh():
+            logger.info("Fio logs are unchanged, skipping bandwidth graphs")
+            return
 
-    def __copy_fio_logs(self):
-        create_dir(self.fio_log_dir)
-        logger.info(f"Copying fio logs to {self.fio_log_dir}")
+        with target:
+            self.__fio()
 
+    def __input_files(self):
+        inputs = [FIO_CONFIG]
         for filesystem in FilesystemType:
-            fio_out_dir = f"fs/{filesystem}/out/fio"
-            for subdir, _, files in os.walk(fio_out_dir):
-                log_files = list(filter(lambda f: ".log" in f, files))
-                with Pool() as pool:
-                    pool.starmap(
-                        FioBenchmark.copy_fio_log,
-                        zip(
-                            repeat(self.fio_log_dir),
-                            repeat(subdir),
-                            repeat(filesystem),
-                            log_files,
-                        ),
+            inputs += list_files(f"fs/{filesystem}/out/fio", ".log")
+
+        return inputs
+
+    def __latency(self):
+        target = BUILD_CACHE.target("FioBenchmark:latency", self.__input_files())
+        if target.is_fresh():
+            logger.info("Fio logs are unchanged, skipping latency graphs")
+            return
+
+        with target:
+            logger.info("Generating fio latency percentile graphs")
+            result = FioLatencyResult(list(self.latency_log_types)).df
+
+            for test_name in self.tests:
+                for log_type, display_name in self.latency_log_types.items():
+                    df = result[
+                        (result[FioLatencyResult.Schema.TEST] == test_name)
+                        & (result[FioLatencyResult.Schema.LOG_TYPE] == log_type)
+                    ]
+                    if df.empty:
+                        logger.warning(f"No fio {log_type} logs for {test_name}")
+                        continue
+
+                    self.__export_latency(df, test_name, log_type, display_name)
+
+    def __export_latency(
+        self, df: pd.DataFrame, test_name: str, log_type: FioLogType, display_name
+    ):
+        df = df.set_index(FioLatencyResult.Schema.FS_TYPE)
+        df = df[
+            [
+                FioLatencyResult.Schema.P50,
+                FioLatencyResult.Schema.P90,
+                FioLatencyResult.Schema.P99,
+                FioLatencyResult.Schema.P99_9,
+                FioLatencyResult.Schema.MAX,
+            ]
+        ]
+        df = df / 1000  # fio logs latency in nanoseconds, to microseconds
+        df.index.name = None
+
+        name = f"{test_name}_{log_type}_percentiles"
+        TexTable(
+            df.rename(columns=lambda column: f"{column} (us)"), name, self.tool_name
+        ).export()
+
+        out = f"{self.tool_name}/{name}"
+        logger.info(f"Exporting fio latency graphs: {out}")
+        DataFramePlot(
+            df,
+            out,
+            title=f"{display_name} latency for {' '.join(test_name.split('_'))}",
+            xlabel="File system",
+            ylabel="Latency (microseconds)",
+            legend=True,
+            logy=True,
+        )
+
+    def __loops(self):
+        target = BUILD_CACHE.target("FioBenchmark:loops", self.__input_files())
+        if target.is_fresh():
+            logger.info("Fio logs are unchanged, skipping per-loop graphs")
+            return
+
+        with target:
+            logger.info("Generating fio per-loop throughput graphs")
+            loops = int(self.__test_configuration_read()["global"]["loops"])
+            result = FioLoopResult(list(self.loop_log_types)).df
+
+            for test_name in self.tests:
+                for log_type, (
+                    display_name,
+                    unit,
+                    scale,
+                ) in self.loop_log_types.items():
+                    df = result[
+                        (result[FioLoopResult.Schema.TEST] == test_name)
+                        & (result[FioLoopResult.Schema.LOG_TYPE] == log_type)
+                    ]
+                    if df.empty:
+                        logger.warning(f"No fio {log_type} logs for {test_name}")
+                        continue
+
+                    df = df.pivot(
+                        index=FioLoopResult.Schema.LOOP,
+                        columns=FioLoopResult.Schema.FS_TYPE,
+                        values=FioLoopResult.Schema.AVERAGE,
                     )
+                    df = df.reindex(range(1, loops + 1)) / scale
+                    df.index.name = None
+                    df.columns.name = None
+                    self.__export_loops(df, test_name, log_type, display_name, unit)
 
-    @staticmethod
-    def copy_fio_log(
-        fio_log_dir: str, subdir: str, filesystem: FilesystemType, file: str
+    def __export_loops(
+        self,
+        df: pd.DataFrame,
+        test_name: str,
+        log_type: FioLogType,
+        display_name: str,
+        unit: str,
     ):
-        src = os.path.join(subdir, file)
-        dst = f"{fio_log_dir}/{filesystem}_{file}"
-        logger.debug(f"Copying fio log: {src} -> {dst}")
-        shutil.copy(src, dst)
-
-    def __generate_gnuplot(self):
-        logger.info(f"Generating gnuplot from fio logs for {self.tests}")
-        with Pool() as pool:
-            pool.starmap(
-                FioBenchmark.generate_gnuplot_for_test,
-                zip(
-                    repeat(self.data_dir),
-                    repeat(self.log_dir),
-                    repeat(self.fio_log_dir),
-                    self.tests,
-                ),
-            )
+        name = f"{test_name}_{log_type}_per_loop"
+        degradation = FioLoopResult.degradation(df)
+        table = pd.DataFrame(
+            {
+                f"First loop ({unit})": df.iloc[0],
+                f"Last loop ({unit})": df.iloc[-1],
+                f"Slope ({unit} per loop)": degradation["slope"],
+                "Change (\\% per loop)": degradation["change"],
+            }
+        )
+        TexTable(table, name, self.tool_name).export()
 
-    @staticmethod
-    def generate_gnuplot_for_test(
-        data_dir: str, log_dir: str, fio_log_dir: str, test_name: str
+        out = f"{self.tool_name}/{name}"
+        logger.info(f"Exporting fio per-loop graphs: {out}")
+        DataFramePlot(
+            df,
+            out,
+            title=f"{display_name} per loop for {' '.join(test_name.split('_'))}",
+            xlabel="Loop number",
+            ylabel=f"{display_name} ({unit})",
+            legend=True,
+            kind="line",
+        )
+
+    def __timelines(self):
+        target = BUILD_CACHE.target("FioBenchmark:timelines", self.__input_files())
+        if target.is_fresh():
+            logger.info("Fio logs are unchanged, skipping timeline graphs")
+            return
+
+        with target:
+            logger.info("Generating fio throughput timeline graphs")
+            result = FioTimelineResult(list(self.loop_log_types)).df
+
+            for test_name in self.tests:
+                for log_type, (
+                    display_name,
+                    unit,
+                    scale,
+                ) in self.loop_log_types.items():
+                    df = result[
+                        (result[FioTimelineResult.Schema.TEST] == test_name)
+                        & (result[FioTimelineResult.Schema.LOG_TYPE] == log_type)
+                    ]
+                    if df.empty:
+                        logger.warning(f"No fio {log_type} logs for {test_name}")
+                        continue
+
+                    series = {
+                        fs_type: fs_df.set_index(FioTimelineResult.Schema.TIME)[
+                            FioTimelineResult.Schema.VALUE
+                        ]
+                        / scale
+                        for fs_type, fs_df in df.groupby(
+                            FioTimelineResult.Schema.FS_TYPE, sort=False
+                        )
+                    }
+                    name = f"{test_name}_{log_type}_timeline"
+                    out = f"{self.tool_name}/{name}"
+                    logger.info(f"Exporting fio timeline graphs: {out}")
+                    TimelinePlot(
+                        series,
+                        out,
+                        title=f"{display_name} over time for {' '.join(test_name.split('_'))}",
+                        xlabel="Time (seconds)",
+                        ylabel=f"{display_name} ({unit})",
+                    )
+
+    def __sweep(self):
+        inputs = [FIO_CONFIG]
+        for filesystem in FilesystemType:
+            inputs += list_files(f"fs/{filesystem}/out/fio-sweep", ".json")
+        target = BUILD_CACHE.target("FioBenchmark:sweep", inputs)
+        if target.is_fresh():
+            logger.info("Fio sweep results are unchanged, skipping heatmaps")
+            return
+
+        with target:
+            df = FioSweepResult().df
+            if df.empty:
+                logger.info("No fio sweep results, skipping heatmaps")
+                return
+
+            logger.info("Generating fio parameter sweep heatmaps")
+            schema = FioSweepResult.Schema
+            for (fs_type, test_name), test_df in df.groupby(
+                [schema.FS_TYPE, schema.TEST], sort=False
+            ):
+                for metric, display_name, unit, lower_is_better in [
+                    (schema.BANDWIDTH, "Bandwidth", "MB/s", False),
+                    (
+                        schema.LATENCY_P99,
+                        "P99 completion latency",
+                        "microseconds",
+                        True,
+                    ),
+                ]:
+                    self.__plot_sweep(
+                        test_df,
+                        fs_type,
+                        test_name,
+                        metric,
+                        display_name,
+                        unit,
+                        lower_is_better,
+                    )
+            self.__export_sweep(df)
+
+    def __plot_sweep(
+        self,
+        df: pd.DataFrame,
+        fs_type: str,
+        test_name: str,
+        metric: str,
+        display_name: str,
+        unit: str,
+        lower_is_better: bool,
     ):
-        test_out_dir = f"{data_dir}/{test_name}"
-        remove_dir(test_out_dir)
-        create_dir(test_out_dir)
-        create_dir(log_dir)
-        log_file = f"{log_dir}/generate_fio_gnuplot_{test_name}.log"
-        logger.debug(f"Generating gnuplot for test {test_name}, log file: {log_file}")
-        f = open(log_file, "w+")
-
-        subprocess.run(
-            [
-                "fio2gnuplot",
-                "-t",
-                test_name,
-                "-d",
-                test_out_dir,
-                "-p",
-                f"*{test_name}_bw*.log",
-                "-v",
-            ],
-            stdout=f,
-            stderr=f,
-            cwd=fio_log_dir,
+        schema = FioSweepResult.Schema
+        grid = df.pivot_table(
+            index=[schema.IOENGINE, schema.IODEPTH],
+            columns=schema.BLOCK_SIZE,
+            values=metric,
+        )
+        # engines in the order of the sweep, block sizes by size
+        engines = list(dict.fromkeys(df[schema.IOENGINE]))
+        grid = grid.reindex(
+            sorted(grid.index, key=lambda row: (engines.index(row[0]), row[1]))
+        )
+        grid = grid[sorted(grid.columns, key=parse_size)]
+        grid.index = [f"{engine}, iodepth {depth}" for engine, depth in grid.index]
+
+        direct = " (direct I/O)" if df[schema.DIRECT].any() else ""
+        name = f"{fs_type}_{test_name}_sweep_{metric}"
+        out = f"{self.tool_name}/sweep/{name}"
+        logger.info(f"Exporting fio sweep heatmap: {out}")
+        HeatmapPlot(
+            grid,
+            out,
+            title=f"{display_name} of {fs_type} for {' '.join(test_name.split('_'))}{direct}",
+            xlabel="Block size",
+            ylabel="I/O engine and depth",
+            colorbar_label=f"{display_name} ({unit})",
+            lower_is_better=lower_is_better,
+        )
+
+    def __export_sweep(self, df: pd.DataFrame):
+        schema = FioSweepResult.Schema
+        config = self.__test_configuration_read()["global"]
+        # the variant with the parameters of fio-job.cfg, it runs with the
+        # direct I/O and runtime of the sweep, so it is not the fio test itself
+        baseline_name = (
+            f"{FioSweepResult.tex(config['ioengine'])}, bs {config['blocksize']}, "
+            f"iodepth {config['iodepth']}"
+        )
+        baseline = df[
+            (df[schema.IOENGINE] == config["ioengine"])
+            & (df[schema.BLOCK_SIZE] == config["blocksize"])
+            & (df[schema.IODEPTH] == int(config["iodepth"]))
+        ].set_index([schema.FS_TYPE, schema.TEST])[schema.BANDWIDTH]
+
+        best = df.loc[
+            df.groupby([schema.FS_TYPE, schema.TEST])[schema.BANDWIDTH].idxmax()
+        ]
+        best = best.set_index([schema.FS_TYPE, schema.TEST])
+        table = pd.DataFrame(
+            {
+                "Fastest variant": [
+                    FioSweepResult.variant(row) for row in best.itertuples()
+                ],
+                "Bandwidth (MB/s)": best[schema.BANDWIDTH],
+                "P99 latency (us)": best[schema.LATENCY_P99],
+                f"Speedup over {baseline_name} (sweep)": best[schema.BANDWIDTH]
+                / baseline,
+            },
+            index=best.index,
         )
-        logger.debug(
-            f"Finished generating gnuplot for test {test_name}, log file: {log_file}"
+        table.index.names = ["File system", "Test"]
+        table = table.rename(index=lambda test: " ".join(test.split("_")), level=1)
+        TexTable(table, "fio_sweep_fastest", self.tool_name).export()
+
+        parameters = pd.DataFrame(
+            {
+                "Parameter": ["ioengine", "block size", "iodepth"],
+                "Values": [
+                    ", ".join(
+                        map(FioSweepResult.tex, dict.fromkeys(df[schema.IOENGINE]))
+                    ),
+                    ", ".join(sorted(set(df[schema.BLOCK_SIZE]), key=parse_size)),
+                    ", ".join(str(d) for d in sorted(set(df[schema.IODEPTH]))),
+                ],
+            }
         )
+        TexTable(
+            parameters, "fio_sweep_configuration", self.tool_name, with_index=False
+        ).export()
 
     def __fio(self):
         logger.info("Generating fio bandwidth graphs")
-        for subdir, _, files in os.walk(self.data_dir):
-            for file in files:
-                if "average" in file:
-                    logger.info(f"Processing fio result file: {file}")
-                    try:
-                        self.__process(os.path.join(subdir, file))
-                        self.__process_without_dedup(os.path.join(subdir, file))
-                    except Exception:
-                        logger.warning(f"Failed to process {file}")
-
-    def __process(self, file_path: str):
-        xx = []
-        yy = []
-        with open(file_path) as f:
-            for line in f.readlines():
-                splitted_line = line.strip().split(" ")
-                if (
-                    self.__does_list_contain_digit(splitted_line)
-                    and len(splitted_line) == 2
-                ):
-                    throughput = int(splitted_line[1]) / 1000  # in megabytes / s
-                    yy.append(throughput)
-                elif len(splitted_line) == 6:
-                    filesystem_name = splitted_line[5].split("_")[0]
-                    xx.append(filesystem_name)
-
-        self.__plot(xx, yy, file_path)
-
-    def __plot(self, xx, yy, file_path):
-        # ./output/fio/gnuplot/random_read_test_bw.average
-        # Match this part     ^--------------^
-        test_name = " ".join(file_path.split("/")[-1].split(".")[0].split("_")[:3])
-        title = f"I/O Bandwidth for {test_name}"
-        xlabel = "File system"
-        ylabel = "Bandwidth (MB/s)"
-        filename = f"{'_'.join(test_name.split(' '))}_average_bandwidth_all"
-        BarPlot(
-            xx, yy, xlabel, ylabel, title, filename, self.tool_name, PlotUnit.SCALAR
+        result = FioLogResult(FioLogType.BANDWIDTH).df
+        steady_state = FioSteadyStateResult([FioLogType.BANDWIDTH]).df
+        result = result.merge(
+            steady_state.drop(columns=FioSteadyStateResult.Schema.SAMPLES),
+            how="left",
+            on=["fs_type", "test", "log_type"],
+            suffixes=("", "_steady_state"),
         )
 
-    def __process_without_dedup(self, file_path: str):
-        xx = []
-        yy = []
-        with open(file_path) as f:
-            is_dedup = False
-            for line in f.readlines():
-                splitted_line = line.strip().split(" ")
-                if (
-                    self.__does_list_contain_digit(splitted_line)
-                    and len(splitted_line) == 2
-                ):
-                    if is_dedup:
-                        is_dedup = False
-                        continue
+        for test_name in self.tests:
+            df = result[result[FioLogResult.Schema.TEST] == test_name]
+            if df.empty:
+                logger.warning(f"No fio bandwidth logs for {test_name}")
+                continue
 
-                    throughput = int(splitted_line[1]) / 1000  # in megabytes / s
-                    yy.append(throughput)
-                elif len(splitted_line) == 6:
-                    filesystem_name = splitted_line[5].split("_")[0]
-                    if filesystem_name == FilesystemType.NILFS_DEDUP.value:
-                        is_dedup = True
-                        continue
-                    xx.append(filesystem_name)
+            logger.info(f"Processing fio bandwidth logs for {test_name}")
+            # fio logs bandwidth in KiB/s, the average is truncated to integer
+            # the same way fio2gnuplot did in its *.average output
+            df = df.assign(
+                bandwidth=np.trunc(df[FioLogResult.Schema.AVERAGE]) / 1000,
+                steady_state=np.trunc(df["average_steady_state"]) / 1000,
+            )  # in megabytes / s
+            self.__process(df, test_name)
+            self.__process_without_dedup(df, test_name)
+            self.__export_statistics(df, test_name)
+
+    def __process(self, df: pd.DataFrame, test_name: str):
+        xx = df[FioLogResult.Schema.FS_TYPE].to_list()
+        self.__plot(xx, df["bandwidth"].to_list(), test_name, "_average_bandwidth_all")
+        self.__plot(
+            xx,
+            df["steady_state"].to_list(),
+            test_name,
+            "_steady_state_bandwidth_all",
+            "Steady-state I/O Bandwidth",
+        )
 
-        self.__plot_without_dedup(xx, yy, file_path)
+    def __process_without_dedup(self, df: pd.DataFrame, test_name: str):
+        df = df[df[FioLogResult.Schema.FS_TYPE] != FilesystemType.NILFS_DEDUP.value]
+        xx = df[FioLogResult.Schema.FS_TYPE].to_list()
+        self.__plot(xx, df["bandwidth"].to_list(), test_name, "_average_bandwidth")
+        self.__plot(
+            xx,
+            df["steady_state"].to_list(),
+            test_name,
+            "_steady_state_bandwidth",
+            "Steady-state I/O Bandwidth",
+        )
 
-    def __plot_without_dedup(self, xx, yy, file_path):
-        # ./output/fio/gnuplot/random_read_test_bw.average
-        # Match this part     ^--------------^
-        test_name = " ".join(file_path.split("/")[-1].split(".")[0].split("_")[:3])
-        title = f"I/O Bandwidth for {test_name}"
+    def __plot(self, xx, yy, test_name: str, suffix: str, title: str = "I/O Bandwidth"):
+        title = f"{title} for {' '.join(test_name.split('_'))}"
         xlabel = "File system"
         ylabel = "Bandwidth (MB/s)"
-        filename = f"{'_'.join(test_name.split(' '))}_average_bandwidth"
+        filename = f"{test_name}{suffix}"
         BarPlot(
             xx, yy, xlabel, ylabel, title, filename, self.tool_name, PlotUnit.SCALAR
         )
 
-    def __does_list_contain_digit(self, list):
-        return len([s for s in list if s.isdigit()]) != 0
+    def __export_statistics(self, df: pd.DataFrame, test_name: str):
+        df = df.set_index(FioLogResult.Schema.FS_TYPE)
+        bandwidth = (
+            df[
+                [
+                    FioLogResult.Schema.AVERAGE,
+                    FioLogResult.Schema.MIN,
+                    FioLogResult.Schema.MAX,
+                    FioLogResult.Schema.STD,
+                    "average_steady_state",
+                ]
+            ]
+            / 1000
+        )  # in megabytes / s
+        window = df[
+            [FioSteadyStateResult.Schema.START, FioSteadyStateResult.Schema.END]
+        ]
+        df = pd.concat([bandwidth, window], axis=1)
+        df.index.name = None
+        df.columns = [
+            "Average (MB/s)",
+            "Min (MB/s)",
+            "Max (MB/s)",
+            "Std (MB/s)",
+            "Steady-state average (MB/s)",
+            "Steady from (s)",
+            "Steady to (s)",
+        ]
+        TexTable(df, f"{test_name}_bandwidth", self.tool_name).export()
 
     def __df(self):
         logger.info("Generating df graphs for fio tests")
@@ -1007,8 +3568,7 @@ class WhenType(StrEnum):
 
 
 class DedupDf:
-    out_dir_jpg = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.JPG}/dedup"
-    out_dir_svg = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.SVG}/dedup"
+    figure_dir = str(ToolName.DEDUP)
 
     def __init__(
         self,
@@ -1021,16 +3581,22 @@ class DedupDf:
         self.tool_name = tool_name
         self.display_tool_name = display_tool_name
         out_dir = f"fs/{fs_type}/out/{out_dir}"
+        self.potential_file = f"{out_dir}/{DedupPotentialFile.filename}"
         file_pattern = f"_deduplication_{tool_name}"
-        self.files_df = DfResult(out_dir, file_pattern, fs_type).df
 
-        create_dir(self.out_dir_jpg)
-        create_dir(self.out_dir_svg)
+        inputs = [BONNIE_CONFIG, self.potential_file]
+        inputs += list_files(out_dir, file_pattern)
+        target = BUILD_CACHE.target(f"DedupDf:{out_dir}", inputs, display_tool_name)
+        if target.is_fresh():
+            logger.info(f"DedupDf inputs in {out_dir} are unchanged, skipping")
+            return
 
-        self.__plot_dedup_ratio()
-        self.__plot_space_reduction()
-        self.__plot_reclaim()
-        self.__plot_expected_reclaim()
+        with target:
+            self.files_df = DfResult(fs_type, tool_name).df
+            self.__plot_dedup_ratio()
+            self.__plot_space_reduction()
+            self.__plot_reclaim()
+            self.__plot_expected_reclaim()
 
     def __plot_dedup_ratio(self):
         title = f"{self.display_tool_name} space reduction ratio"
@@ -1057,18 +3623,9 @@ class DedupDf:
         df["value"] = self.__calculate_space_reduction(
             df[WhenType.BEFORE], df[WhenType.AFTER]
         )
-        ax = df[["value"]].plot(
-            kind="bar", title=title, xlabel=xlabel, ylabel=ylabel, legend=None
-        )
-        ax.yaxis.set_major_formatter(mtick.PercentFormatter())
-        ax.locator_params(nbins=10)
-        ax.tick_params(axis="x", rotation=0)
-        figure = ax.get_figure()
-        out_jpg = f"{self.out_dir_jpg}/{filename}.{FileExportType.JPG}"
-        out_svg = f"{self.out_dir_svg}/{filename}.{FileExportType.SVG}"
-        logger.info(f"Exporting DedupDf graphs: {out_jpg}, {out_svg}")
-        figure.savefig(out_jpg, dpi=300, bbox_inches="tight")
-        figure.savefig(out_svg, bbox_inches="tight")
+        out = f"{self.figure_dir}/{filename}"
+        logger.info(f"Exporting DedupDf graphs: {out}")
+        DataFramePlot(df[["value"]], out, title, xlabel, ylabel, percent=True)
 
     def __plot_reclaim(self):
         logger.debug("Generating DedupDdf reclaim graph")
@@ -1095,23 +3652,31 @@ class DedupDf:
         df["actual"] = self.__calculate_storage_reclaim(
             df[WhenType.BEFORE], df[WhenType.AFTER]
         )
-        df["expected"] = df.index
-
-        ax = df[["actual", "expected"]].plot(
-            kind="bar", title=title, xlabel=xlabel, ylabel=ylabel
-        )
-        lines, labels = ax.get_legend_handles_labels()
-        ax.legend(lines, labels)
-        ax.locator_params(nbins=10)
-        ax.tick_params(axis="x", rotation=0)
+        expected = DedupPotentialFile(self.potential_file).expected_reclaim()
+        if expected.empty:
+            # only right for the identical generated files, one of them is reclaimable
+            df["expected"] = df.index
+            expected = df[["expected"]]
+        else:
+            df = df.join(expected)
+        columns = ["actual", *expected.columns]
 
-        out_jpg = f"{self.out_dir_jpg}/{filename}.{FileExportType.JPG}"
-        out_svg = f"{self.out_dir_svg}/{filename}.{FileExportType.SVG}"
-        logger.info(f"Exporting DedupDf graphs: {out_jpg}, {out_svg}")
+        TexTable(
+            df[columns].rename_axis("File size (megabytes)"),
+            filename,
+            ToolName.DEDUP,
+        ).export()
 
-        figure = ax.get_figure()
-        figure.savefig(out_jpg, dpi=300, bbox_inches="tight")
-        figure.savefig(out_svg, bbox_inches="tight")
+        out = f"{self.figure_dir}/{filename}"
+        logger.info(f"Exporting DedupDf graphs: {out}")
+        DataFramePlot(
+            df[columns],
+            out,
+            title,
+            xlabel,
+            ylabel,
+            legend=True,
+        )
 
     def __plot(self, title, filename, xlabel, ylabel, y_func):
         logger.debug("Processing files for dedup tests")
@@ -1123,17 +3688,9 @@ class DedupDf:
             values=DfResult.Schema.SIZE,
         )
         df["value"] = y_func(df[WhenType.BEFORE], df[WhenType.AFTER])
-        ax = df[["value"]].plot(
-            kind="bar", title=title, xlabel=xlabel, ylabel=ylabel, legend=None
-        )
-        ax.locator_params(nbins=10)
-        ax.tick_params(axis="x", rotation=0)
-        figure = ax.get_figure()
-        out_jpg = f"{self.out_dir_jpg}/{filename}.{FileExportType.JPG}"
-        out_svg = f"{self.out_dir_svg}/{filename}.{FileExportType.SVG}"
-        logger.info(f"Exporting DedupDf graphs: {out_jpg}, {out_svg}")
-        figure.savefig(out_jpg, dpi=300, bbox_inches="tight")
-        figure.savefig(out_svg, bbox_inches="tight")
+        out = f"{self.figure_dir}/{filename}"
+        logger.info(f"Exporting DedupDf graphs: {out}")
+        DataFramePlot(df[["value"]], out, title, xlabel, ylabel)
 
     @staticmethod
     def __calculate_deduplication_ratio(before, after):
@@ -1156,111 +3713,333 @@ class DfResult:
         TYPE = "type"
         FILE_SIZE_MEGABYTES = "file_size_megabytes"
 
-    def __init__(self, out_dir: str, file_pattern: str, fs_type: FilesystemType):
-        self.df = pd.DataFrame()
+    def __init__(self, fs_type: FilesystemType, tool_name: str):
+        df = WAREHOUSE.query(
+            DfSnapshot.table,
+            partition=True,
+            fs_type=fs_type,
+            tool=tool_name,
+            test=DfSnapshot.deduplication_test,
+            filesystem=FS_MOUNT_POINTS[fs_type],
+        )
+        if df.empty:
+            logger.warning(f"No {tool_name} deduplication df files for '{fs_type}'")
+            self.df = pd.DataFrame(columns=list(DfResult.Schema))
+            return
 
-        for _, _, files in os.walk(out_dir):
-            for file in files:
-                if file_pattern in file:
-                    self.df = pd.concat(
-                        [self.df, DfResult.__DfFile(out_dir, file, fs_type).df]
-                    )
+        # the first line of the mount point in every dump
+        df = df.groupby("source", sort=False).first()
+        self.df = pd.DataFrame(
+            {
+                DfResult.Schema.FS_TYPE: fs_type,
+                DfResult.Schema.SIZE: df[DfSnapshot.Schema.USED],
+                DfResult.Schema.PROG_NAME: df["tool"],
+                DfResult.Schema.TYPE: df[DfSnapshot.Schema.WHEN],
+                DfResult.Schema.FILE_SIZE_MEGABYTES: df[
+                    DfSnapshot.Schema.FILE_SIZE_MEGABYTES
+                ].astype(np.int64),
+            }
+        ).reset_index(drop=True)
 
-    class __DfFile:
-        def __init__(self, out_dir: str, filename: str, fs_type: FilesystemType):
-            self.__filename = filename
-            self.__filepath = f"{out_dir}/{self.__filename}"
-            self.__fs_type = fs_type
-            self.__size = self.__extract_size()
-
-            raw_type = filename.strip().split("_")[1]
-            if raw_type == WhenType.BEFORE.value:
-                self.__type = WhenType.BEFORE
-            elif raw_type == WhenType.AFTER.value:
-                self.__type = WhenType.AFTER
-            else:
-                raise Exception(
-                    f"Invalid df file type: '{raw_type}', in file: '{filename}'"
-                )
-            # match -----------------v___v
-            # df_after_deduplication_dedup_16M.txt
 
-            self.__prog_name = filename.strip().split("_")[3]
+class GnuTimeFile:
+    class Fields(Enum):
+        def __str__(self):
+            return str(self.value)
 
-            # match -----------------------v_v
-            # df_after_deduplication_dedup_16M.txt
-            self.__file_size = filename.strip().split("_")[4].split(".")[0]
+        REAL_TIME = "real-time"
+        SYSTEM_TIME = "system-time"
+        USER_TIME = "user-time"
+        MAX_MEMORY = "max-memory"
+        FILE_SIZE = "file-size"
+        FILE_NAME = "file-name"
+        WHEN = "when"
 
-            self.df = pd.DataFrame(
-                {
-                    DfResult.Schema.FS_TYPE: [self.__fs_type],
-                    DfResult.Schema.SIZE: [self.__size],
-                    DfResult.Schema.PROG_NAME: [self.__prog_name],
-                    DfResult.Schema.TYPE: [self.__type],
-                    DfResult.Schema.FILE_SIZE_MEGABYTES: [self.__file_size],
-                }
-            )
-            self.df[DfResult.Schema.FILE_SIZE_MEGABYTES] = (
-                self.df[DfResult.Schema.FILE_SIZE_MEGABYTES]
-                .str.removesuffix("M")
-                .astype("int")
-            )
+    table = "gnu_time"
+
+    def __init__(self, path: str):
+        df = WAREHOUSE.query(GnuTimeFile.table, source=path)
+        if df.empty:
+            raise FileNotFoundError(f"No GNU time results ingested from '{path}'")
+
+        # columns missing from this csv, ex. when of time-whole.csv
+        df = df.dropna(axis=1, how="all")
+        self.df = df.set_index(GnuTimeFile.Fields.FILE_SIZE.value)
+
+    @staticmethod
+    def is_time_file(filename: str) -> bool:
+        return filename.startswith("time-") and filename.endswith(".csv")
+
+    @staticmethod
+    @profiled
+    def read(path: str) -> dict[str, pd.DataFrame]:
+        with SOURCES.open(path) as f:
+            df = pd.read_csv(f)
+        df = GnuTimeFile.__format_file_size(df)
+        df = GnuTimeFile.__format_max_memory(df)
+        # every table row has the columns of all variants of the csv
+        for field in GnuTimeFile.Fields:
+            if field.value not in df:
+                df[field.value] = pd.Series(dtype=object)
+        return {GnuTimeFile.table: df}
+
+    @staticmethod
+    def __format_file_size(df: pd.DataFrame) -> pd.DataFrame:
+        df[GnuTimeFile.Fields.FILE_SIZE.value] = (
+            df[GnuTimeFile.Fields.FILE_SIZE.value].str.removesuffix("M").astype("int")
+        )
+        return df
+
+    @staticmethod
+    def __format_max_memory(df: pd.DataFrame) -> pd.DataFrame:
+        df[GnuTimeFile.Fields.MAX_MEMORY.value] = (
+            df[GnuTimeFile.Fields.MAX_MEMORY.value] / 1000
+        )
+        return df
 
-        def __extract_size(self):
-            line = self.__extract_mountpoint_line()
-            return int(line[2])
 
-        def __extract_mountpoint_line(self):
-            with open(self.__filepath) as f:
-                for line in f.readlines():
-                    line = line.strip().split()
-                    mount_point = line[0]
-                    fs_mount_point = FS_MOUNT_POINTS[self.__fs_type]
-                    if fs_mount_point == mount_point:
-                        return line
+class DedupPotentialFile:
+    """
+    Bytes that deduplication could reclaim from the generated files, estimated
+    by tests/dedup_potential.py with fixed blocks and content-defined chunks
+    """
+
+    class Fields(Enum):
+        def __str__(self):
+            return str(self.value)
+
+        METHOD = "method"
+        BLOCK_SIZE = "block-size"
+        TOTAL_BYTES = "total-bytes"
+        UNIQUE_BYTES = "unique-bytes"
+        RECLAIMABLE_BYTES = "reclaimable-bytes"
+        TOTAL_CHUNKS = "total-chunks"
+        UNIQUE_CHUNKS = "unique-chunks"
+        FILE_SIZE = "file-size"
+
+    table = "dedup_potential"
+    filename = "dedup-potential.csv"
+    method_names = {"fixed": "fixed", "cdc": "CDC"}
+
+    def __init__(self, path: str):
+        self.df = WAREHOUSE.query(DedupPotentialFile.table, source=path)
+
+    def expected_reclaim(self) -> pd.DataFrame:
+        """Reclaimable megabytes (as of df) per file size, a column per chunking"""
+        if self.df.empty:
+            return pd.DataFrame()
+
+        fields = DedupPotentialFile.Fields
+        df = self.df.drop_duplicates(
+            [str(fields.FILE_SIZE), str(fields.METHOD), str(fields.BLOCK_SIZE)],
+            keep="last",
+        ).sort_values(
+            [str(fields.METHOD), str(fields.BLOCK_SIZE)], ascending=[False, True]
+        )
+        df["chunking"] = [
+            f"expected, {self.method_names.get(method, method)} {size // 1024} KiB"
+            for method, size in zip(df[str(fields.METHOD)], df[str(fields.BLOCK_SIZE)])
+        ]
+        df = df.pivot(
+            index=str(fields.FILE_SIZE),
+            columns="chunking",
+            values=str(fields.RECLAIMABLE_BYTES),
+        )[df["chunking"].unique()]
+        # df reports 1K blocks, the measured reclaim is their count / 1000
+        return df / 1024 / 1_000
+
+    @staticmethod
+    def is_potential_file(filename: str) -> bool:
+        return filename == DedupPotentialFile.filename
+
+    @staticmethod
+    @profiled
+    def read(path: str) -> dict[str, pd.DataFrame]:
+        with SOURCES.open(path) as f:
+            df = pd.read_csv(f)
+        file_size = str(DedupPotentialFile.Fields.FILE_SIZE)
+        df[file_size] = df[file_size].astype(str).str.removesuffix("M").astype(int)
+        return {DedupPotentialFile.table: df}
 
-        def __repr__(self):
-            return f"""DfFile: {{filename = {self.__filename}, prog_name = {self.__prog_name}, file_size = {self.__file_size}}}"""
 
+class BlockVerifyFile:
+    """
+    Block checksums of the generated files verified by tests/block_verify.py
+    before and after deduplication, with the byte ranges of damaged blocks
+    """
 
-class GnuTimeFile:
     class Fields(Enum):
         def __str__(self):
             return str(self.value)
 
-        REAL_TIME = "real-time"
-        SYSTEM_TIME = "system-time"
-        USER_TIME = "user-time"
-        MAX_MEMORY = "max-memory"
-        FILE_SIZE = "file-size"
         FILE_NAME = "file-name"
+        FILE_SIZE = "file-size"
         WHEN = "when"
+        BYTES = "bytes"
+        BLOCKS = "blocks"
+        DAMAGED_BLOCKS = "damaged-blocks"
+        DAMAGED_BYTES = "damaged-bytes"
+        DAMAGED_RANGES = "damaged-ranges"
+        SECONDS = "seconds"
+        THROUGHPUT = "throughput"
+
+    table = "block_verify"
+    filename = "block-verify.csv"
 
     def __init__(self, path: str):
-        self.df = pd.read_csv(path)
-        self.__format()
+        df = WAREHOUSE.query(BlockVerifyFile.table, source=path)
+        self.df = df.set_index(str(BlockVerifyFile.Fields.FILE_SIZE)) if len(df) else df
 
-    def __format(self):
-        self.__format_file_size()
-        self.__format_max_memory()
+    @staticmethod
+    def is_verify_file(filename: str) -> bool:
+        return filename == BlockVerifyFile.filename
 
-    def __format_file_size(self):
-        self.df[GnuTimeFile.Fields.FILE_SIZE.value] = (
-            self.df[GnuTimeFile.Fields.FILE_SIZE.value]
-            .str.removesuffix("M")
-            .astype("int")
-        )
-        self.df = self.df.set_index(GnuTimeFile.Fields.FILE_SIZE.value)
+    @staticmethod
+    @profiled
+    def read(path: str) -> dict[str, pd.DataFrame]:
+        fields = BlockVerifyFile.Fields
+        with SOURCES.open(path) as f:
+            df = pd.read_csv(f, dtype={str(fields.DAMAGED_RANGES): str})
+        file_size = str(fields.FILE_SIZE)
+        df[file_size] = df[file_size].astype(str).str.removesuffix("M").astype(int)
+        df[str(fields.DAMAGED_RANGES)] = df[str(fields.DAMAGED_RANGES)].fillna("")
+        return {BlockVerifyFile.table: df}
+
+
+class FragmentationResult:
+    """
+    Reads of the files of the dedup tests by tests/fio-fragmentation.cfg before
+    and after deduplication, joined with the extents of the files reported by
+    filefrag. Results of a file are in fragmentation/GEN_SIZE/WHEN/FILE of the
+    output directory of the tool.
+    """
+
+    fio_table = "fragmentation_fio"
+    extents_table = "fragmentation_extents"
+    directory = "fragmentation"
+    extents_filename = "extents.filefrag"
+    log_types = [FioLogType.BANDWIDTH, FioLogType.LATENCY]
+    # extent line of filefrag -v, the expected physical offset is printed only
+    # when the extent does not follow the previous one
+    # ext: logical_offset: physical_offset: length: expected: flags:
+    extent_pattern = re.compile(
+        r"^\s*\d+:\s*\d+\.\.\s*\d+:\s*\d+\.\.\s*\d+:\s*\d+:\s*(\d*):?\s*(\S*)\s*$",
+        re.MULTILINE,
+    )
 
-    def __format_max_memory(self):
-        self.df[GnuTimeFile.Fields.MAX_MEMORY.value] = (
-            self.df[GnuTimeFile.Fields.MAX_MEMORY.value] / 1000
+    class Schema(StrEnum):
+        TOOL = "tool"
+        TEST = "test"
+        FILE_SIZE = "file_size"
+        WHEN = "when"
+        FILE_NAME = "file_name"
+        BANDWIDTH = "bandwidth"  # in megabytes / s
+        LATENCY = "latency"  # in microseconds
+        LATENCY_P99 = "latency_p99"
+        EXTENTS = "extents"
+        SHARED_EXTENTS = "shared_extents"
+        DISCONTIGUOUS_EXTENTS = "discontiguous_extents"
+
+    def __init__(self, tool: DedupTool):
+        schema = FragmentationResult.Schema
+        # the test of a read is a partition column
+        reads = WAREHOUSE.query(
+            FragmentationResult.fio_table,
+            partition=True,
+            fs_type=tool.fs_type,
+            tool=tool.name,
         )
+        extents = WAREHOUSE.query(
+            FragmentationResult.extents_table, fs_type=tool.fs_type, tool=tool.name
+        )
+        if reads.empty or extents.empty:
+            self.df = pd.DataFrame(columns=list(schema))
+            return
+
+        key = [schema.TEST, schema.FILE_SIZE, schema.WHEN, schema.FILE_NAME]
+        reads = reads.pivot_table(index=key, columns="log_type", values=["mean", "p99"])
+        # fio logs bandwidth in KiB/s and latency in nanoseconds
+        df = pd.DataFrame(
+            {
+                schema.BANDWIDTH: reads[("mean", FioLogType.BANDWIDTH)] / 1000,
+                schema.LATENCY: reads[("mean", FioLogType.LATENCY)] / 1000,
+                schema.LATENCY_P99: reads[("p99", FioLogType.LATENCY)] / 1000,
+            }
+        ).reset_index()
+        df = df.merge(extents, on=key[1:], how="left")
+        df[schema.TOOL] = tool.name
+        self.df = df[list(schema)].sort_values(key, kind="stable")
+
+    @staticmethod
+    def is_result(path: str) -> bool:
+        return f"/{FragmentationResult.directory}/" in path
+
+    @staticmethod
+    def tool_name(path: str) -> str:
+        # fs/btrfs/out/dedup/duperemove/fragmentation/16M/after/f1/extents.filefrag
+        tool_dir = path.split(f"/{FragmentationResult.directory}/")[0]
+        return os.path.basename(tool_dir)
+
+    @staticmethod
+    def parse_path(path: str) -> dict[str, object]:
+        file_dir = os.path.dirname(path)
+        when_dir = os.path.dirname(file_dir)
+        size_dir = os.path.dirname(when_dir)
+        schema = FragmentationResult.Schema
+        return {
+            schema.FILE_SIZE: [int(os.path.basename(size_dir).removesuffix("M"))],
+            schema.WHEN: [os.path.basename(when_dir)],
+            schema.FILE_NAME: [os.path.basename(file_dir)],
+        }
+
+    @staticmethod
+    @profiled
+    def read_log(path: str, log_type: FioLogType) -> dict[str, pd.DataFrame]:
+        """Mean and tail of a read log, aggregated in chunks on the workers"""
+        statistics = RunningStatistics()
+        histogram = LatencyHistogram()
+        for df in FioLog.read_chunks(path):
+            values = df[FioLog.Schema.VALUE].to_numpy()
+            statistics.update(values)
+            histogram.record(values)
+
+        return {
+            FragmentationResult.fio_table: pd.DataFrame(
+                {
+                    **FragmentationResult.parse_path(path),
+                    "log_type": [str(log_type)],
+                    "samples": [statistics.count],
+                    "mean": [statistics.mean() if statistics.count else np.nan],
+                    "p99": [histogram.percentile(99)],
+                }
+            )
+        }
+
+    @staticmethod
+    @profiled
+    def read_extents(path: str) -> dict[str, pd.DataFrame]:
+        with SOURCES.open(path) as f:
+            extents = FragmentationResult.extent_pattern.findall(f.read())
+
+        schema = FragmentationResult.Schema
+        return {
+            FragmentationResult.extents_table: pd.DataFrame(
+                {
+                    **FragmentationResult.parse_path(path),
+                    schema.EXTENTS: [len(extents)],
+                    schema.SHARED_EXTENTS: [
+                        sum("shared" in flags.split(",") for _, flags in extents)
+                    ],
+                    schema.DISCONTIGUOUS_EXTENTS: [
+                        sum(expected != "" for expected, _ in extents)
+                    ],
+                }
+            )
+        }
 
 
 class DedupGnuTime:
-    out_dir_jpg = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.JPG}/dedup"
-    out_dir_svg = f"{GRAPHS_OUTPUT_DIR}/{FileExportType.SVG}/dedup"
+    figure_dir = str(ToolName.DEDUP)
 
     def __init__(
         self,
@@ -1270,106 +4049,112 @@ class DedupGnuTime:
         out_dir: str,
     ):
         self.tool_name = tool_name
-        create_dir(self.out_dir_jpg)
-        create_dir(self.out_dir_svg)
 
         self.display_tool_name = display_tool_name
         self.out_dir = f"fs/{fs_type}/out/{out_dir}"
 
-        self.__plot_memory_usage()
-        self.__plot_time_elapsed()
+        inputs = [BONNIE_CONFIG, f"{self.out_dir}/time-whole.csv"]
+        target = BUILD_CACHE.target(
+            f"DedupGnuTime:{self.out_dir}", inputs, display_tool_name
+        )
+        if target.is_fresh():
+            logger.info(
+                f"DedupGnuTime inputs in {self.out_dir} are unchanged, skipping"
+            )
+            return
+
+        with target:
+            self.__plot_memory_usage()
+            self.__plot_time_elapsed()
 
     def __plot_memory_usage(self):
         df = GnuTimeFile(path=f"{self.out_dir}/time-whole.csv").df
         df = df[df.index >= 16]
-        ax = df[[GnuTimeFile.Fields.MAX_MEMORY.value]].plot(
-            kind="bar",
+
+        out = f"{self.figure_dir}/{self.tool_name}_occupied_memory"
+        logger.info(f"Exporting DedupGnuTime usage detailed graphs: {out}")
+        DataFramePlot(
+            df[[GnuTimeFile.Fields.MAX_MEMORY.value]],
+            out,
             title=f"{self.display_tool_name} deduplication maximal memory usage",
             xlabel="File size (megabytes)",
             ylabel="Occupied memory (megabytes)",
-            legend=None,
-        )
-        ax.locator_params(nbins=10)
-        ax.tick_params(axis="x", rotation=0)
-
-        self.__plot_memory_usage_max(ax, df)
-
-        out = f"{self.tool_name}_occupied_memory"
-        out_jpg = f"{self.out_dir_jpg}/{out}.{FileExportType.JPG}"
-        out_svg = f"{self.out_dir_svg}/{out}.{FileExportType.SVG}"
-        figure = ax.get_figure()
-        logger.info(
-            f"Exporting DedupGnuTime usage detailed graphs: {out_jpg}, {out_svg}"
-        )
-        figure.savefig(out_jpg, dpi=300, bbox_inches="tight")
-        figure.savefig(out_svg, bbox_inches="tight")
-
-    def __plot_memory_usage_max(self, ax, df: pd.DataFrame):
-        max = df[GnuTimeFile.Fields.MAX_MEMORY.value].max()
-        xmin, xmax = ax.get_xlim()
-
-        ax.hlines(y=max, xmin=xmin, xmax=xmax, color="red", linewidth=1)
-        _, ymax = ax.get_ylim()
-        label_position = max / ymax + 0.02
-        ax.text(
-            0.88,
-            label_position,
-            f"Maximum = {max:.1f}M",
-            ha="right",
-            va="center",
-            transform=ax.transAxes,
-            size=8,
-            zorder=3,
+            max_line=True,
         )
 
     def __plot_time_elapsed(self):
         df = GnuTimeFile(path=f"{self.out_dir}/time-whole.csv").df
         df = df[df.index >= 16]
-        ax = df[
+        df = df[
             [
                 GnuTimeFile.Fields.SYSTEM_TIME.value,
                 GnuTimeFile.Fields.USER_TIME.value,
             ]
-        ].plot(
-            kind="bar",
-            stacked=True,
+        ].rename(
+            columns={
+                GnuTimeFile.Fields.SYSTEM_TIME.value: "system time",
+                GnuTimeFile.Fields.USER_TIME.value: "user time",
+            }
+        )
+
+        out = f"{self.figure_dir}/{self.tool_name}_time_elapsed"
+        logger.info(f"Exporting DedupGnuTime time_elapsed graphs: {out}")
+        DataFramePlot(
+            df,
+            out,
             title=f"{self.display_tool_name} deduplication time elapsed",
             xlabel="File size (megabytes)",
             ylabel="Elapsed time (seconds)",
+            legend=True,
+            stacked=True,
         )
-        ax.locator_params(nbins=10)
-        ax.tick_params(axis="x", rotation=0)
-        legend = ax.get_legend()
-        legend.get_texts()[0].set_text("system time")
-        legend.get_texts()[1].set_text("user time")
-        figure = ax.get_figure()
-        out = f"{self.tool_name}_time_elapsed"
-        out_jpg = f"{self.out_dir_jpg}/{out}.{FileExportType.JPG}"
-        out_svg = f"{self.out_dir_svg}/{out}.{FileExportType.SVG}"
-        logger.info(f"Exporting DedupGnuTime time_elapsed graphs: {out_jpg}, {out_svg}")
-        figure.savefig(out_jpg, dpi=300, bbox_inches="tight")
-        figure.savefig(out_svg, bbox_inches="tight")
 
 
 class DedupBenchmark:
-    def __init__(self):
-        func = [
-            self.__df,
-            self.__gnu_time,
+    def schedule(self, graph: TaskGraph):
+        INGEST.schedule(
+            graph,
+            ResultsIngest.DF,
+            ResultsIngest.GNU_TIME,
+            ResultsIngest.DEDUP_POTENTIAL,
+            ResultsIngest.BLOCK_VERIFY,
+            ResultsIngest.FRAGMENTATION,
+        )
+        df = "ingest:df"
+        gnu_time = "ingest:gnu_time"
+        graph.add("dedup:df", self.__df, df, "ingest:dedup_potential")
+        graph.add("dedup:gnu_time", self.__gnu_time, gnu_time)
+        graph.add(
+            "dedup:csum_validate_if_pass",
             self.__plot_csum_validate_if_pass,
+            gnu_time,
+            "ingest:block_verify",
+        )
+        graph.add(
+            "dedup:csum_validate_performance",
             self.__plot_csum_validate_performance,
+            gnu_time,
+        )
+        graph.add(
+            "dedup:fragmentation",
+            self.__plot_fragmentation,
+            "ingest:fragmentation",
+        )
+        graph.add(
+            "dedup:space_reduction_comparison",
             self.__plot_space_reduction_comparison,
+            df,
+        )
+        graph.add(
+            "dedup:memory_usage_comparison",
             self.__plot_memory_usage_comparison,
+            gnu_time,
+        )
+        graph.add(
+            "dedup:time_elapsed_comparison",
             self.__plot_time_elapsed_comparison,
-        ]
-        processes = []
-        for f in func:
-            p = Process(target=f)
-            p.start()
-            processes.append(p)
-
-        for p in processes:
-            p.join()
+            gnu_time,
+        )
 
     def __df(self):
         DedupDf(
@@ -1431,8 +4216,71 @@ class DedupBenchmark:
             lambda row: "OK" if row["Tests passed"] == row["Total tests"] else "NOK",
             axis=1,
         )
+
+        blocks = self.__block_verify()
+        if not blocks.empty:
+            fields = BlockVerifyFile.Fields
+            after = blocks[
+                (blocks.index >= 16) & (blocks[str(fields.WHEN)] == WhenType.AFTER)
+            ]
+            by_tool = after.groupby("Tool")
+            damaged = by_tool[str(fields.DAMAGED_BLOCKS)].sum()
+            # tools without block checksums are left out with "-"
+            by_tool_df["Damaged blocks"] = damaged.map(str)
+            by_tool_df["Block validation"] = damaged.map(
+                lambda n: "OK" if n == 0 else "NOK"
+            )
+            by_tool_df["Block validation (MB/s)"] = (
+                by_tool[str(fields.THROUGHPUT)].mean().map(lambda v: f"{v:.2f}")
+            )
+            by_tool_df = by_tool_df.fillna("-")
+            self.__export_damaged_ranges(after)
+
         TexTable(by_tool_df, "checksum_validation_comparison", ToolName.DEDUP).export()
 
+    def __block_verify(self) -> pd.DataFrame:
+        df = pd.DataFrame()
+        for tool in DEDUPLICATION_TOOLS:
+            tool_df = BlockVerifyFile(f"{tool.path()}/{BlockVerifyFile.filename}").df
+            if tool_df.empty:
+                continue
+            tool_df["Tool"] = tool.name
+            df = pd.concat([df, tool_df])
+
+        return df
+
+    def __export_damaged_ranges(self, df: pd.DataFrame):
+        fields = BlockVerifyFile.Fields
+        df = df[df[str(fields.DAMAGED_BLOCKS)] > 0].reset_index()
+        max_ranges = 4
+        ranges = df[str(fields.DAMAGED_RANGES)].str.split(";")
+        df["Damaged byte ranges"] = [
+            ", ".join(r[:max_ranges])
+            + (f" and {len(r) - max_ranges} more" if len(r) > max_ranges else "")
+            for r in ranges
+        ]
+        df = df.rename(
+            columns={
+                str(fields.FILE_SIZE): "File size (megabytes)",
+                str(fields.FILE_NAME): "File",
+                str(fields.DAMAGED_BYTES): "Damaged bytes",
+            }
+        )
+        TexTable(
+            df[
+                [
+                    "Tool",
+                    "File size (megabytes)",
+                    "File",
+                    "Damaged bytes",
+                    "Damaged byte ranges",
+                ]
+            ],
+            "checksum_damaged_ranges",
+            ToolName.DEDUP,
+            with_index=False,
+        ).export()
+
     def __plot_csum_validate_performance(self):
         df = pd.DataFrame()
         for tool in DEDUPLICATION_TOOLS:
@@ -1474,11 +4322,113 @@ class DedupBenchmark:
             with_index=False,
         ).export()
 
+    def __plot_fragmentation(self):
+        schema = FragmentationResult.Schema
+        results = [FragmentationResult(tool).df for tool in DEDUPLICATION_TOOLS]
+        results = [result for result in results if not result.empty]
+        if len(results) == 0:
+            logger.info("No fragmentation results of deduplication tools, skipping")
+            return
+
+        df = pd.concat(results)
+        df = df[df[schema.FILE_SIZE] >= 16]
+        key = [schema.TOOL, schema.TEST, schema.FILE_SIZE, schema.FILE_NAME]
+        df = df.pivot_table(
+            index=key,
+            columns=schema.WHEN,
+            values=[
+                schema.BANDWIDTH,
+                schema.LATENCY,
+                schema.LATENCY_P99,
+                schema.EXTENTS,
+                schema.SHARED_EXTENTS,
+                schema.DISCONTIGUOUS_EXTENTS,
+            ],
+        )
+        df.columns = [f"{value}_{when}" for value, when in df.columns]
+        df = df.reset_index()
+        df["bandwidth_change"] = (
+            df[f"{schema.BANDWIDTH}_{WhenType.AFTER}"]
+            / df[f"{schema.BANDWIDTH}_{WhenType.BEFORE}"]
+            - 1
+        ) * 100
+
+        for (tool, test), test_df in df.groupby([schema.TOOL, schema.TEST]):
+            self.__plot_fragmentation_bandwidth(tool, test, test_df)
+        for tool, tool_df in df.groupby(schema.TOOL):
+            self.__plot_fragmentation_extents(tool, tool_df)
+        self.__export_fragmentation(df)
+
+    def __plot_fragmentation_bandwidth(self, tool: str, test: str, df: pd.DataFrame):
+        schema = FragmentationResult.Schema
+        # both files of a size, the source and the deduplicated one
+        df = df.groupby(schema.FILE_SIZE)[
+            [f"{schema.BANDWIDTH}_{when}" for when in WhenType]
+        ].mean()
+        df.columns = [f"{when} deduplication" for when in WhenType]
+
+        out = f"{DedupGnuTime.figure_dir}/{tool}_fragmentation_{test}_bandwidth"
+        logger.info(f"Exporting fragmentation bandwidth graphs: {out}")
+        DataFramePlot(
+            df,
+            out,
+            title=f"{tool} {' '.join(test.split('_'))} bandwidth",
+            xlabel="File size (megabytes)",
+            ylabel="Bandwidth (MB/s)",
+            legend=True,
+            kind="line",
+        )
+
+    def __plot_fragmentation_extents(self, tool: str, df: pd.DataFrame):
+        schema = FragmentationResult.Schema
+        # extents do not depend on the test, both read the same files
+        df = df.drop_duplicates([schema.FILE_SIZE, schema.FILE_NAME])
+        df = df.groupby(schema.FILE_SIZE)[
+            [f"{schema.EXTENTS}_{when}" for when in WhenType]
+        ].sum()
+        df.columns = [f"{when} deduplication" for when in WhenType]
+
+        out = f"{DedupGnuTime.figure_dir}/{tool}_fragmentation_extents"
+        logger.info(f"Exporting fragmentation extents graphs: {out}")
+        DataFramePlot(
+            df,
+            out,
+            title=f"{tool} extents of the deduplicated files",
+            xlabel="File size (megabytes)",
+            ylabel="Extents",
+            legend=True,
+            kind="line",
+        )
+
+    def __export_fragmentation(self, df: pd.DataFrame):
+        schema = FragmentationResult.Schema
+        extents_after = f"{schema.EXTENTS}_{WhenType.AFTER}"
+        columns = {
+            f"{schema.BANDWIDTH}_{WhenType.BEFORE}": "Bandwidth before (MB/s)",
+            f"{schema.BANDWIDTH}_{WhenType.AFTER}": "Bandwidth after (MB/s)",
+            "bandwidth_change": "Bandwidth change (percent)",
+            f"{schema.LATENCY}_{WhenType.BEFORE}": "Latency before (microseconds)",
+            f"{schema.LATENCY}_{WhenType.AFTER}": "Latency after (microseconds)",
+            f"{schema.LATENCY_P99}_{WhenType.AFTER}": "P99 latency after (microseconds)",
+            f"{schema.EXTENTS}_{WhenType.BEFORE}": "Extents before",
+            extents_after: "Extents after",
+            f"{schema.SHARED_EXTENTS}_{WhenType.AFTER}": "Shared extents after",
+            f"{schema.DISCONTIGUOUS_EXTENTS}_{WhenType.AFTER}": "Discontiguous extents after",
+        }
+        by_test = df.groupby([schema.TOOL, schema.TEST])
+        table = by_test[list(columns)].mean().rename(columns=columns)
+        # how much of the bandwidth change the extents explain across sizes
+        table["Extents and bandwidth change correlation"] = by_test.apply(
+            lambda x: x[extents_after].corr(x["bandwidth_change"])
+        )
+        table.index.names = ["Tool", "Test"]
+        table = table.rename(index=lambda test: " ".join(test.split("_")), level=1)
+        TexTable(table, "fragmentation_read_performance", ToolName.DEDUP).export()
+
     def __plot_space_reduction_comparison(self):
         df = pd.DataFrame()
         for tool in DEDUPLICATION_TOOLS:
-            out_dir = tool.path()
-            tool_df = DfResult(out_dir, f"_deduplication_{tool.name}", tool.fs_type).df
+            tool_df = DfResult(tool.fs_type, tool.name).df
             df = pd.concat([df, tool_df])
 
         df = df.sort_values(DfResult.Schema.FILE_SIZE_MEGABYTES)
@@ -1583,6 +4533,724 @@ class DedupBenchmark:
         ).export()
 
 
+class ResultsIngest:
+    """
+    Normalizes the raw results under fs/*/out into the WAREHOUSE tables. Every
+    kind of source is ingested by its own task, so stages only wait for the
+    data they read.
+    """
+
+    BONNIE = "bonnie"
+    DF = "df"
+    GNU_TIME = "gnu_time"
+    DEDUP_POTENTIAL = "dedup_potential"
+    BLOCK_VERIFY = "block_verify"
+    FRAGMENTATION = "fragmentation"
+    FIO = "fio"
+    FIO_SWEEP = "fio_sweep"
+
+    def schedule(self, graph: TaskGraph, *kinds: str):
+        functions = {
+            self.BONNIE: self.__bonnie,
+            self.DF: self.__df,
+            self.GNU_TIME: self.__gnu_time,
+            self.DEDUP_POTENTIAL: self.__dedup_potential,
+            self.BLOCK_VERIFY: self.__block_verify,
+            self.FRAGMENTATION: self.__fragmentation,
+            self.FIO_SWEEP: self.__fio_sweep,
+            self.FIO: self.__fio,
+        }
+        for kind in kinds:
+            if f"ingest:{kind}" not in graph.tasks:
+                graph.add(f"ingest:{kind}", functions[kind])
+
+    def __bonnie(self):
+        for filesystem in FilesystemType:
+            path = f"fs/{filesystem}/{BonnieBenchmark.input_file}"
+            if SOURCES.exists(path):
+                WAREHOUSE.ingest(
+                    path,
+                    BonnieResult.read,
+                    fs_type=str(filesystem),
+                    tool=ToolName.BONNIE,
+                    test=ToolName.BONNIE,
+                )
+
+    def __df(self):
+        for filesystem in FilesystemType:
+            for path in list_files(f"fs/{filesystem}/out"):
+                filename = os.path.basename(path)
+                if not DfSnapshot.is_snapshot(filename):
+                    continue
+
+                _, tool, test, _ = DfSnapshot.parse_filename(filename)
+                WAREHOUSE.ingest(
+                    path, DfSnapshot.read, fs_type=str(filesystem), tool=tool, test=test
+                )
+
+    def __gnu_time(self):
+        for filesystem in FilesystemType:
+            for path in list_files(f"fs/{filesystem}/out"):
+                filename = os.path.basename(path)
+                if not GnuTimeFile.is_time_file(filename):
+                    continue
+
+                # fs/btrfs/out/dedup/duperemove/time-whole.csv
+                WAREHOUSE.ingest(
+                    path,
+                    GnuTimeFile.read,
+                    fs_type=str(filesystem),
+                    tool=os.path.basename(os.path.dirname(path)),
+                    test=filename.removesuffix(".csv"),
+                )
+
+    def __dedup_potential(self):
+        for filesystem in FilesystemType:
+            for path in list_files(f"fs/{filesystem}/out", DedupPotentialFile.filename):
+                if not DedupPotentialFile.is_potential_file(os.path.basename(path)):
+                    continue
+
+                # fs/btrfs/out/dedup/duperemove/dedup-potential.csv
+                WAREHOUSE.ingest(
+                    path,
+                    DedupPotentialFile.read,
+                    fs_type=str(filesystem),
+                    tool=os.path.basename(os.path.dirname(path)),
+                    test=DedupPotentialFile.filename.removesuffix(".csv"),
+                )
+
+    def __block_verify(self):
+        for filesystem in FilesystemType:
+            for path in list_files(f"fs/{filesystem}/out", BlockVerifyFile.filename):
+                if not BlockVerifyFile.is_verify_file(os.path.basename(path)):
+                    continue
+
+                # fs/btrfs/out/dedup/duperemove/block-verify.csv
+                WAREHOUSE.ingest(
+                    path,
+                    BlockVerifyFile.read,
+                    fs_type=str(filesystem),
+                    tool=os.path.basename(os.path.dirname(path)),
+                    test=BlockVerifyFile.filename.removesuffix(".csv"),
+                )
+
+    def __fragmentation(self):
+        logs = []
+        for filesystem in FilesystemType:
+            for path in list_files(f"fs/{filesystem}/out/dedup"):
+                if not FragmentationResult.is_result(path):
+                    continue
+
+                partition = {
+                    "fs_type": str(filesystem),
+                    "tool": FragmentationResult.tool_name(path),
+                }
+                filename = os.path.basename(path)
+                if filename == FragmentationResult.extents_filename:
+                    WAREHOUSE.ingest(
+                        path,
+                        FragmentationResult.read_extents,
+                        test="filefrag",
+                        **partition,
+                    )
+                    continue
+
+                test_name, log_type = FioLog.parse_filename(filename)
+                if log_type not in FragmentationResult.log_types:
+                    continue
+                if WAREHOUSE.is_stale(path, log_type):
+                    logs.append((path, log_type, test_name, partition))
+
+        logger.info(f"Ingesting {len(logs)} fio logs of fragmentation tests")
+        tables = WORKERS.get().starmap(
+            PROFILER.remote(FragmentationResult.read_log),
+            [(path, log_type) for path, log_type, _, _ in logs],
+        )
+        for (path, log_type, test_name, partition), log_tables in zip(logs, tables):
+            WAREHOUSE.store(
+                path,
+                PROFILER.collect(log_tables),
+                log_type,
+                test=test_name,
+                **partition,
+            )
+
+    def __fio_sweep(self):
+        for filesystem in FilesystemType:
+            for path in list_files(f"fs/{filesystem}/out/fio-sweep", ".json"):
+                # fs/btrfs/out/fio-sweep/libaio-bs64k-qd16/random_read_test.json
+                WAREHOUSE.ingest(
+                    path,
+                    FioSweepResult.read,
+                    fs_type=str(filesystem),
+                    tool=ToolName.FIO,
+                    test=os.path.basename(path).removesuffix(".json"),
+                )
+
+    def __fio(self):
+        config = configparser.ConfigParser()
+        config.read(FIO_CONFIG)
+        file_size = parse_size(config["global"]["size"])
+        loops = int(config["global"]["loops"])
+
+        logs = []
+        for filesystem in FilesystemType:
+            for path in list_files(f"fs/{filesystem}/out/fio", ".log"):
+                test_name, log_type = FioLog.parse_filename(os.path.basename(path))
+                if log_type not in list(FioLogType):
+                    continue
+
+                args = (log_type, file_size, loops)
+                if WAREHOUSE.is_stale(path, *args):
+                    logs.append((path, filesystem, test_name, args))
+
+        logger.info(f"Ingesting {len(logs)} fio logs")
+        # logs are read on the workers, only the aggregates are sent back
+        tables = WORKERS.get().starmap(
+            PROFILER.remote(FioLogResult.aggregate),
+            [(path, *args) for path, _, _, args in logs],
+        )
+        for (path, filesystem, test_name, args), log_tables in zip(logs, tables):
+            log_tables = PROFILER.collect(log_tables)
+            WAREHOUSE.store(
+                path,
+                log_tables,
+                *args,
+                fs_type=str(filesystem),
+                tool=ToolName.FIO,
+                test=test_name,
+            )
+
+
+INGEST = ResultsIngest()
+
+
+class RegressionDetector:
+    """
+    Compares the current campaign in WAREHOUSE with a baseline one. The samples
+    of a metric are the per-loop averages of fio bandwidth and IOPS and the
+    Bonnie++ runs. The relative change of the mean gets a percentile bootstrap
+    confidence interval, and a slowdown is significant when the whole interval
+    is beyond the tolerance.
+    """
+
+    out_dir = f"{OUTPUT_DIR}/{ToolName.REGRESSION}"
+    resamples = 2000
+    confidence = 0.95
+    seed = 29047
+    max_draws = 2**22  # bootstrap draws held in memory at once
+
+    class Schema(StrEnum):
+        FS_TYPE = "fs_type"
+        TOOL = "tool"
+        METRIC = "metric"
+        HIGHER_IS_BETTER = "higher_is_better"
+        BASELINE = "baseline"
+        CURRENT = "current"
+        CHANGE = "change"
+        CI_LOW = "ci_low"
+        CI_HIGH = "ci_high"
+        SLOWDOWN = "slowdown"
+
+    def __init__(self, baseline: str, tolerance: float):
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.slowdowns = pd.DataFrame()
+
+    def schedule(self, graph: TaskGraph):
+        INGEST.schedule(graph, ResultsIngest.FIO, ResultsIngest.BONNIE)
+        graph.add("regression", self.__run, "ingest:fio", "ingest:bonnie")
+
+    def __run(self):
+        current = WAREHOUSE.run_id
+        logger.info(f"Comparing run '{current}' with baseline '{self.baseline}'")
+        samples = {
+            run_id: pd.concat(
+                [self.__fio_samples(run_id), self.__bonnie_samples(run_id)]
+            )
+            for run_id in (self.baseline, current)
+        }
+        if samples[self.baseline].empty:
+            raise ValueError(f"No results of baseline run '{self.baseline}'")
+
+        df = self.compare(samples[self.baseline], samples[current])
+        self.slowdowns = df[df[self.Schema.SLOWDOWN]]
+        self.__export(df, f"{current}_vs_{self.baseline}")
+
+        for row in self.slowdowns.itertuples():
+            logger.error(
+                f"Slowdown of {row.tool} {row.metric} on {row.fs_type}: {row.change:+.1%} (CI {row.ci_low:+.1%} .. {row.ci_high:+.1%})"
+            )
+        logger.info(
+            f"{len(self.slowdowns)} significant slowdowns in {len(df)} compared metrics"
+        )
+
+    @staticmethod
+    def __fio_samples(run_id: str) -> pd.DataFrame:
+        df = WAREHOUSE.query(FioLoopResult.table, partition=True, run_id=run_id)
+        if df.empty:
+            return df
+
+        key = ["fs_type", "test", "log_type", "loop"]
+        df = df.groupby(key)[["samples", "sum"]].sum().reset_index()
+        return pd.DataFrame(
+            {
+                "fs_type": df["fs_type"],
+                "tool": str(ToolName.FIO),
+                "metric": df["test"] + " " + df["log_type"],
+                "higher_is_better": True,
+                "value": df["sum"] / df["samples"],
+            }
+        )
+
+    @staticmethod
+    def __bonnie_samples(run_id: str) -> pd.DataFrame:
+        df = WAREHOUSE.query(BonnieResult.table, partition=True, run_id=run_id)
+        if df.empty:
+            return df
+
+        # %CPU columns describe the cost of a result, not the performance
+        results = [f for f in BonnieResult.result_fields if not f.endswith("_cpu")]
+        df = df.melt(
+            id_vars=["fs_type"],
+            value_vars=results + BonnieResult.latency_fields,
+            var_name="metric",
+        ).dropna()
+        df["tool"] = str(ToolName.BONNIE)
+        df["higher_is_better"] = ~df["metric"].isin(BonnieResult.latency_fields)
+        df["value"] = df["value"].astype(float)
+        return df
+
+    @profiled
+    def compare(self, baseline: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+        key = ["fs_type", "tool", "metric", "higher_is_better"]
+        baseline = baseline.groupby(key)["value"].apply(np.array).rename("baseline")
+        current = current.groupby(key)["value"].apply(np.array).rename("current")
+        df = pd.concat([baseline, current], axis=1, join="inner").reset_index()
+        # a single sample has no spread to resample
+        df = df[(df["baseline"].map(len) > 1) & (df["current"].map(len) > 1)]
+        if df.empty:
+            return pd.DataFrame(columns=list(self.Schema))
+
+        rng = np.random.default_rng(self.seed)
+        baseline_means = self.bootstrap_means(df["baseline"].to_list(), rng)
+        current_means = self.bootstrap_means(df["current"].to_list(), rng)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            changes = current_means / baseline_means - 1
+
+        alpha = (1 - self.confidence) / 2 * 100
+        ci_low, ci_high = np.nanpercentile(changes, [alpha, 100 - alpha], axis=1)
+        baseline_mean = df["baseline"].map(np.mean).to_numpy()
+        current_mean = df["current"].map(np.mean).to_numpy()
+        higher_is_better = df["higher_is_better"].to_numpy(dtype=bool)
+
+        return pd.DataFrame(
+            {
+                self.Schema.FS_TYPE: df["fs_type"].to_numpy(),
+                self.Schema.TOOL: df["tool"].to_numpy(),
+                self.Schema.METRIC: df["metric"].to_numpy(),
+                self.Schema.HIGHER_IS_BETTER: higher_is_better,
+                self.Schema.BASELINE: baseline_mean,
+                self.Schema.CURRENT: current_mean,
+                self.Schema.CHANGE: current_mean / baseline_mean - 1,
+                self.Schema.CI_LOW: ci_low,
+                self.Schema.CI_HIGH: ci_high,
+                self.Schema.SLOWDOWN: np.where(
+                    higher_is_better,
+                    ci_high < -self.tolerance,
+                    ci_low > self.tolerance,
+                ),
+            }
+        )
+
+    @profiled
+    def bootstrap_means(self, samples: list[np.ndarray], rng) -> np.ndarray:
+        """Means of resamples with replacement, one row of resamples per metric"""
+        counts = np.array([len(values) for values in samples])
+        size = counts.max()
+        padded = np.zeros((len(samples), size))
+        for i, values in enumerate(samples):
+            padded[i, : len(values)] = values
+
+        means = np.empty((len(samples), self.resamples))
+        chunk = max(1, self.max_draws // (self.resamples * size))
+        for start in range(0, len(samples), chunk):
+            n = counts[start : start + chunk, np.newaxis, np.newaxis]
+            index = (rng.random((len(n), self.resamples, size)) * n).astype(np.int64)
+            draws = np.take_along_axis(
+                padded[start : start + chunk, np.newaxis, :], index, axis=2
+            )
+            # draws beyond the sample size of a metric are masked out
+            mask = np.arange(size) < n
+            means[start : start + chunk] = (
+                np.where(mask, draws, 0).sum(axis=2) / n[:, :, 0]
+            )
+
+        return means
+
+    def __export(self, df: pd.DataFrame, name: str):
+        create_dir(self.out_dir)
+        out_csv = f"{self.out_dir}/{name}.csv"
+        logger.info(f"Exporting regression report to {out_csv}")
+        df.to_csv(out_csv, index=False)
+
+        table = self.slowdowns.set_index(
+            [self.Schema.FS_TYPE, self.Schema.TOOL, self.Schema.METRIC]
+        )[[self.Schema.CHANGE, self.Schema.CI_LOW, self.Schema.CI_HIGH]]
+        table = table * 100
+        table.index.names = ["File system", "Tool", "Metric"]
+        table.columns = ["Change (percent)", "CI low (percent)", "CI high (percent)"]
+        TexTable(table, "regression_slowdowns", ToolName.REGRESSION).export()
+
+
+class ScalingModel:
+    """
+    Fits complexity curves of the file size to the GNU time results of the
+    deduplication tools and extrapolates them to target sizes. Linear and
+    n log n models are least squares fits, a power law is a line fitted on
+    logarithmic axes, so its prediction interval is multiplicative. The
+    intervals assume independent normal residuals: far beyond the tested sizes
+    they tell how well a curve fits, not that the tool keeps to it.
+    """
+
+    out_dir = f"{OUTPUT_DIR}/{ToolName.SCALING}"
+    confidence = 0.95
+    min_file_size = 16
+    curve_points = 100
+    size_units = {"M": 1, "G": 2**10, "T": 2**20, "P": 2**30}
+
+    class Model(StrEnum):
+        LINEAR = "linear"
+        N_LOG_N = "n log n"
+        POWER_LAW = "power law"
+
+    class Schema(StrEnum):
+        TOOL = "tool"
+        METRIC = "metric"
+        MODEL = "model"
+        SAMPLES = "samples"
+        INTERCEPT = "intercept"
+        SLOPE = "slope"
+        FORMULA = "formula"
+        R2 = "r2"
+        RMSE = "rmse"
+        BEST = "best"
+        TARGET = "target"
+        EXTRAPOLATION = "extrapolation"
+        PREDICTION = "prediction"
+        PI_LOW = "pi_low"
+        PI_HIGH = "pi_high"
+
+    # metric of GnuTimeFile: name and unit in tables and plots
+    metrics = {
+        GnuTimeFile.Fields.REAL_TIME: ("Elapsed time", "seconds"),
+        GnuTimeFile.Fields.USER_TIME: ("User time", "seconds"),
+        GnuTimeFile.Fields.SYSTEM_TIME: ("System time", "seconds"),
+        GnuTimeFile.Fields.MAX_MEMORY: ("Maximal memory usage", "megabytes"),
+    }
+
+    @dataclass
+    class Fit:
+        """Coefficients of y = intercept + slope * x for the features of a model"""
+
+        model: "ScalingModel.Model"
+        coefficients: np.ndarray
+        covariance: np.ndarray
+        variance: float  # of the residuals
+        dof: int
+        r2: float = np.nan
+        rmse: float = np.nan
+
+        def predict(
+            self, sizes: np.ndarray, confidence: float
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+            x = ScalingModel.features(self.model, sizes)
+            center = x @ self.coefficients
+            # variance of a new observation: the residuals and the coefficients
+            error = np.sqrt(
+                self.variance + np.einsum("ij,jk,ik->i", x, self.covariance, x)
+            )
+            t = ScalingModel.t_quantile(0.5 + confidence / 2, self.dof)
+            low, high = center - t * error, center + t * error
+            if self.model == ScalingModel.Model.POWER_LAW:
+                return np.exp(center), np.exp(low), np.exp(high)
+            return center, low, high
+
+        def formula(self) -> str:
+            """The fitted curve of the file size n, in LaTeX math"""
+            a, b = self.coefficients
+            sign = "-" if b < 0 else "+"
+            match self.model:
+                case ScalingModel.Model.LINEAR:
+                    return f"${a:.3g} {sign} {abs(b):.3g} n$"
+                case ScalingModel.Model.N_LOG_N:
+                    return f"${a:.3g} {sign} {abs(b):.3g} n \\log_2 n$"
+                case ScalingModel.Model.POWER_LAW:
+                    return f"${np.exp(a):.3g} n^{{{b:.3g}}}$"
+
+    def __init__(self, targets: list[float]):
+        self.targets = sorted(targets)
+
+    @staticmethod
+    def parse_target(size: str) -> float:
+        """File size in megabytes of ex. 512G or 2T, without a unit in megabytes"""
+        return parse_size(size if size[-1:].isalpha() else f"{size}M") / 2**20
+
+    @staticmethod
+    def format_size(megabytes: float) -> str:
+        for unit, multiple in reversed(ScalingModel.size_units.items()):
+            if megabytes >= multiple:
+                return f"{megabytes / multiple:g}{unit}"
+        return f"{megabytes:g}M"
+
+    @staticmethod
+    def t_quantile(p: float, dof: int) -> float:
+        """
+        Quantile of Student's t distribution, exact for 1 and 2 degrees of
+        freedom, a Cornish-Fisher expansion of the normal quantile above
+        """
+        if dof == 1:
+            return np.tan(np.pi * (p - 0.5))
+        if dof == 2:
+            return (2 * p - 1) / np.sqrt(2 * p * (1 - p))
+
+        z = NormalDist().inv_cdf(p)
+        return (
+            z
+            + (z**3 + z) / (4 * dof)
+            + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * dof**2)
+            + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * dof**3)
+            + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z)
+            / (92160 * dof**4)
+        )
+
+    @staticmethod
+    def features(model: Model, sizes: np.ndarray) -> np.ndarray:
+        sizes = np.asarray(sizes, dtype=float)
+        match model:
+            case ScalingModel.Model.LINEAR:
+                x = sizes
+            case ScalingModel.Model.N_LOG_N:
+                x = sizes * np.log2(sizes)
+            case ScalingModel.Model.POWER_LAW:
+                x = np.log(sizes)
+        return np.column_stack([np.ones_like(x), x])
+
+    @staticmethod
+    def fit(model: Model, sizes: np.ndarray, values: np.ndarray) -> Fit | None:
+        sizes = np.asarray(sizes, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if model == ScalingModel.Model.POWER_LAW:
+            # the logarithm of zero time or memory is undefined
+            positive = values > 0
+            sizes, values = sizes[positive], values[positive]
+            y = np.log(values)
+        else:
+            y = values
+
+        x = ScalingModel.features(model, sizes)
+        dof = len(y) - x.shape[1]
+        # the spread of residuals needs at least a degree of freedom
+        if dof < 1 or np.unique(sizes).size < 2:
+            return None
+
+        coefficients, *_ = np.linalg.lstsq(x, y, rcond=None)
+        residuals = y - x @ coefficients
+        variance = residuals @ residuals / dof
+        covariance = variance * np.linalg.pinv(x.T @ x)
+        fit = ScalingModel.Fit(model, coefficients, covariance, variance, dof)
+
+        # goodness of fit in the measured unit, comparable between the models
+        predicted, _, _ = fit.predict(sizes, ScalingModel.confidence)
+        rss = ((values - predicted) ** 2).sum()
+        tss = ((values - values.mean()) ** 2).sum()
+        fit.r2 = 1 - rss / tss if tss > 0 else np.nan
+        fit.rmse = np.sqrt(rss / len(values))
+        return fit
+
+    def schedule(self, graph: TaskGraph):
+        INGEST.schedule(graph, ResultsIngest.GNU_TIME)
+        graph.add("scaling", self.__run, "ingest:gnu_time")
+
+    def __run(self):
+        inputs = [f"{tool.path()}/time-whole.csv" for tool in DEDUPLICATION_TOOLS]
+        target = BUILD_CACHE.target(
+            "ScalingModel", inputs, self.targets, self.confidence
+        )
+        if target.is_fresh():
+            logger.info("Scaling models inputs are unchanged, skipping")
+            return
+
+        with target:
+            fits, predictions = [], []
+            for tool in DEDUPLICATION_TOOLS:
+                try:
+                    df = GnuTimeFile(f"{tool.path()}/time-whole.csv").df
+                except FileNotFoundError:
+                    logger.info(f"No GNU time results of {tool.name}, skipping")
+                    continue
+
+                df = df[df.index >= self.min_file_size]
+                for metric in self.metrics:
+                    values = df[str(metric)].dropna().astype(float)
+                    fit_df, prediction_df = self.__model(tool.name, metric, values)
+                    fits.append(fit_df)
+                    predictions.append(prediction_df)
+
+            if len(fits) == 0:
+                return
+            self.__export(pd.concat(fits), pd.concat(predictions))
+
+    def __model(
+        self, tool: str, metric: GnuTimeFile.Fields, values: pd.Series
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        sizes = values.index.to_numpy(dtype=float)
+        fits = {
+            model: fit
+            for model in self.Model
+            if (fit := self.fit(model, sizes, values.to_numpy())) is not None
+        }
+        if len(fits) == 0:
+            logger.info(f"Too few {metric} results of {tool} to fit, skipping")
+            return pd.DataFrame(), pd.DataFrame()
+
+        best = max(fits, key=lambda model: np.nan_to_num(fits[model].r2, nan=-np.inf))
+        logger.info(
+            f"Scaling of {tool} {metric}: {best} fits best (R2 {fits[best].r2:.3f})"
+        )
+        fit_df = pd.DataFrame(
+            {
+                self.Schema.TOOL: tool,
+                self.Schema.METRIC: str(metric),
+                self.Schema.MODEL: [str(model) for model in fits],
+                self.Schema.SAMPLES: len(values),
+                self.Schema.INTERCEPT: [fit.coefficients[0] for fit in fits.values()],
+                self.Schema.SLOPE: [fit.coefficients[1] for fit in fits.values()],
+                self.Schema.FORMULA: [fit.formula() for fit in fits.values()],
+                self.Schema.R2: [fit.r2 for fit in fits.values()],
+                self.Schema.RMSE: [fit.rmse for fit in fits.values()],
+                self.Schema.BEST: [model == best for model in fits],
+            }
+        )
+
+        targets = np.array(self.targets, dtype=float)
+        rows = []
+        for model, fit in fits.items():
+            prediction, low, high = fit.predict(targets, self.confidence)
+            rows.append(
+                pd.DataFrame(
+                    {
+                        self.Schema.TOOL: tool,
+                        self.Schema.METRIC: str(metric),
+                        self.Schema.MODEL: str(model),
+                        self.Schema.BEST: model == best,
+                        self.Schema.TARGET: targets,
+                        self.Schema.EXTRAPOLATION: targets / sizes.max(),
+                        self.Schema.PREDICTION: prediction,
+                        self.Schema.PI_LOW: low,
+                        self.Schema.PI_HIGH: high,
+                    }
+                )
+            )
+
+        self.__plot(tool, metric, values, fits, best)
+        return fit_df, pd.concat(rows)
+
+    def __plot(
+        self,
+        tool: str,
+        metric: GnuTimeFile.Fields,
+        values: pd.Series,
+        fits: dict[Model, Fit],
+        best: Model,
+    ):
+        end = max([values.index.max()] + self.targets)
+        sizes = np.geomspace(values.index.min(), end, self.curve_points)
+        curves = {}
+        for model, fit in fits.items():
+            prediction, low, high = fit.predict(sizes, self.confidence)
+            curves[str(model)] = pd.Series(prediction, index=sizes)
+            if model == best:
+                interval = (pd.Series(low, index=sizes), pd.Series(high, index=sizes))
+
+        name, unit = self.metrics[metric]
+        out = f"{ToolName.SCALING}/{tool}_{str(metric).replace('-', '_')}"
+        logger.info(f"Exporting scaling model graph: {out}")
+        ScalingPlot(
+            values,
+            curves,
+            str(best),
+            interval,
+            self.targets,
+            out,
+            title=f"{tool} {name.lower()} extrapolated to "
+            + ", ".join(self.format_size(t) for t in self.targets),
+            xlabel="File size (megabytes)",
+            ylabel=f"{name} ({unit})",
+        )
+
+    def __export(self, fits: pd.DataFrame, predictions: pd.DataFrame):
+        create_dir(self.out_dir)
+        for name, df in (("fits", fits), ("extrapolation", predictions)):
+            out_csv = f"{self.out_dir}/scaling_{name}.csv"
+            logger.info(f"Exporting scaling models to {out_csv}")
+            df.to_csv(out_csv, index=False)
+            BuildCache.register_output(out_csv)
+
+        metric_names = {str(m): name for m, (name, _) in self.metrics.items()}
+        table = fits.assign(
+            **{self.Schema.METRIC: fits[self.Schema.METRIC].map(metric_names)}
+        )
+        table[self.Schema.BEST] = table[self.Schema.BEST].map({True: "*", False: ""})
+        table = table.set_index(
+            [self.Schema.TOOL, self.Schema.METRIC, self.Schema.MODEL]
+        )[[self.Schema.FORMULA, self.Schema.R2, self.Schema.RMSE, self.Schema.BEST]]
+        table.index.names = ["Tool", "Metric", "Model"]
+        table.columns = ["Fitted curve", "$R^2$", "RMSE", "Best"]
+        TexTable(table, "scaling_model_fit", ToolName.SCALING).export()
+
+        # the best model of each metric, in the unit of the metric
+        table = predictions[predictions[self.Schema.BEST]].copy()
+        table[self.Schema.METRIC] = table[self.Schema.METRIC].map(
+            {str(m): f"{name} ({unit})" for m, (name, unit) in self.metrics.items()}
+        )
+        table[self.Schema.TARGET] = table[self.Schema.TARGET].map(self.format_size)
+        table = table.set_index(
+            [self.Schema.TOOL, self.Schema.METRIC, self.Schema.TARGET]
+        )[
+            [
+                self.Schema.MODEL,
+                self.Schema.EXTRAPOLATION,
+                self.Schema.PREDICTION,
+                self.Schema.PI_LOW,
+                self.Schema.PI_HIGH,
+            ]
+        ]
+        table.index.names = ["Tool", "Metric", "File size"]
+        table.columns = [
+            "Model",
+            "Extrapolation factor",
+            "Prediction",
+            "Prediction interval low",
+            "Prediction interval high",
+        ]
+        TexTable(table, "scaling_extrapolation", ToolName.SCALING).export()
+
+
+def write_timings(path: str, graph: TaskGraph, total_time: float):
+    main_rss, worker_rss = MemoryBudget.peak_rss()
+    timings = {
+        "total_time": total_time,
+        "stages": graph.stages(),
+        # figures render on the workers, concurrently with the stages
+        "plot_export": {"figures": RENDERER.figures, "cpu_time": RENDERER.render_time},
+        "peak_rss": {"main": main_rss, "worker": worker_rss},
+    }
+    with open(path, "w") as file:
+        json.dump(timings, file, indent=2)
+    logger.info(f"Wrote timings to {path}")
+
+
 def create_dir(dir_name: str):
     logger.debug(f"Creating directory {dir_name}")
     Path(dir_name).mkdir(parents=True, exist_ok=True)
@@ -1610,7 +5278,7 @@ class ArgBenchmark(StrEnum):
     ALL = "all"
 
 
-def parse_args() -> ArgBenchmark:
+def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(prog="graphs")
     parser.add_argument(
         "-b",
@@ -1624,8 +5292,80 @@ def parse_args() -> ArgBenchmark:
         default=ArgBenchmark.ALL,
         required=False,
     )
-    args = parser.parse_args()
-    return args.benchmark
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="regenerate all outputs, ignoring the build cache",
+    )
+    parser.add_argument(
+        "-r",
+        "--run-id",
+        default="default",
+        help="campaign the results are ingested into and graphs are generated from",
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="RUN_ID",
+        help="compare the run with a baseline run, exit with status 2 on slowdowns",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=5,
+        metavar="PERCENT",
+        help="relative change of a metric tolerated by the regression check",
+    )
+    parser.add_argument(
+        "-m",
+        "--max-memory",
+        type=int,
+        metavar="MiB",
+        help="limit worker processes and fio log chunks to fit in memory",
+    )
+    parser.add_argument(
+        "--timings",
+        metavar="FILE",
+        help="write wall times of the stages and of plot export as JSON",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=[
+            str(f) for f in FigureExport.raster_formats + FigureExport.vector_formats
+        ],
+        default=[str(f) for f in EXPORT.formats],
+        metavar="FORMAT",
+        help="figure formats to export: %(choices)s (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--check-export",
+        action="store_true",
+        help="only compare the tight crop of raster figures with savefig",
+    )
+    parser.add_argument(
+        "--draft",
+        action="store_true",
+        help=f"export raster figures at {FigureExport.draft_dpi} dpi for quick iteration",
+    )
+    parser.add_argument(
+        "--scaling-targets",
+        nargs="+",
+        type=ScalingModel.parse_target,
+        default=[ScalingModel.parse_target(size) for size in ("1T", "10T")],
+        metavar="SIZE",
+        help="file sizes the scaling models of deduplication are extrapolated to, "
+        "ex. 500G 2T (default: 1T 10T)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="*",
+        choices=list(Profiler.Option),
+        metavar="OPTION",
+        help=f"time the steps of every stage into {PROFILE_OUTPUT_DIR}, optionally "
+        f"also with {', '.join(Profiler.Option)}",
+    )
+    return parser.parse_args()
 
 
 def main():
@@ -1633,19 +5373,68 @@ def main():
 
     create_output_dirs()
 
-    match parse_args():
+    args = parse_args()
+    if args.check_export:
+        difference = EXPORT.check_tight_crop()
+        logger.info(f"Tight crop differs from savefig by {difference:.2f} on average")
+        sys.exit(0 if difference <= FigureExport.crop_tolerance else 1)
+
+    BUILD_CACHE.enabled = not args.force
+    WAREHOUSE.run_id = args.run_id
+    WAREHOUSE.reingest = args.force
+    if args.max_memory is not None:
+        MEMORY.set_limit(args.max_memory * 2**20)
+        logger.info(
+            f"Memory limit {args.max_memory} MiB: {MEMORY.processes()} workers, fio log chunks of {MEMORY.chunk_size()} lines"
+        )
+
+    graph = TaskGraph()
+    match args.benchmark:
         case ArgBenchmark.BONNIE:
-            BonnieBenchmark()
+            BonnieBenchmark().schedule(graph)
         case ArgBenchmark.FIO:
-            FioBenchmark()
+            FioBenchmark().schedule(graph)
         case ArgBenchmark.DEDUP:
-            DedupBenchmark()
+            DedupBenchmark().schedule(graph)
+            ScalingModel(args.scaling_targets).schedule(graph)
         case ArgBenchmark.ALL:
-            BonnieBenchmark()
-            FioBenchmark()
-            DedupBenchmark()
-
+            BonnieBenchmark().schedule(graph)
+            FioBenchmark().schedule(graph)
+            DedupBenchmark().schedule(graph)
+            ScalingModel(args.scaling_targets).schedule(graph)
+
+    regression = None
+    if args.baseline is not None:
+        regression = RegressionDetector(args.baseline, args.tolerance / 100)
+        regression.schedule(graph)
+
+    EXPORT.formats = [FileExportType(f) for f in dict.fromkeys(args.formats)]
+    EXPORT.draft = args.draft
+    if args.profile is not None:
+        PROFILER.enable(args.profile)
+
+    WORKERS.get()
+    with PROFILER.span("prune"):
+        WAREHOUSE.prune()
+    start = time.perf_counter()
+    success = graph.run()
+    with PROFILER.span("flush"):
+        RENDERER.flush()
+    total_time = time.perf_counter() - start
+    logger.info(f"Generated all outputs in {total_time:.2f} s")
+    WORKERS.close()
+
+    if args.timings is not None:
+        write_timings(args.timings, graph, total_time)
+
+    WAREHOUSE.report()
+    MEMORY.report()
+    PROFILER.export(PROFILE_OUTPUT_DIR)
     logger.info("END")
+    if not success:
+        sys.exit(1)
+    if regression is not None and not regression.slowdowns.empty:
+        sys.exit(2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+import argparse
+import asyncio
+import contextlib
+import logging
+import json
+import os
+import re
+import signal
+import sys
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+FS_DIR = CURRENT_DIR + "/fs"
+LOG_DIR = os.environ.get("LOG_DIR", CURRENT_DIR + "/logs/test")
+GRAPHS_SCRIPT = CURRENT_DIR + "/graphs.py"
+
+MiB = 2**20
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler(sys.stdout))
+logger.handlers[0].setFormatter(
+    logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+)
+
+
+@dataclass
+class Benchmark:
+    """run.sh of a file system with the resources of its virtual machine"""
+
+    name: str
+    directory: str
+    cpus: int
+    memory: int  # bytes
+
+    # vb.cpus = "1" and vb.memory = "512" (MiB) of the VirtualBox provider
+    cpus_pattern = re.compile(r"vb\.cpus\s*=\s*\"?(\d+)")
+    memory_pattern = re.compile(r"vb\.memory\s*=\s*\"?(\d+)")
+    default_cpus = 1
+    default_memory = 1024 * MiB
+    vm_overhead = 256 * MiB  # VirtualBox and vagrant processes on the host
+
+    @staticmethod
+    def discover(fs_dir: str) -> list["Benchmark"]:
+        return [
+            Benchmark.read(str(run_script.parent))
+            for run_script in sorted(Path(fs_dir).glob("*/run.sh"))
+        ]
+
+    @staticmethod
+    def read(directory: str) -> "Benchmark":
+        cpus, memory = Benchmark.default_cpus, Benchmark.default_memory
+        vagrantfile = f"{directory}/Vagrantfile"
+        if os.path.exists(vagrantfile):
+            with open(vagrantfile) as file:
+                content = file.read()
+            if match := Benchmark.cpus_pattern.search(content):
+                cpus = int(match.group(1))
+            if match := Benchmark.memory_pattern.search(content):
+                memory = int(match.group(1)) * MiB
+
+        name = os.path.basename(directory)
+        return Benchmark(name, directory, cpus, memory + Benchmark.vm_overhead)
+
+
+class HostResources:
+    """
+    Cores and memory of the host shared by the running benchmarks. A benchmark
+    starts when the cores and memory of its virtual machine are free, one that
+    needs more than the whole host runs alone.
+    """
+
+    def __init__(self, cpus: int, memory: int, jobs: int = None):
+        self.total_cpus = cpus
+        self.total_memory = memory
+        self.cpus = cpus
+        self.memory = memory
+        self.jobs = jobs if jobs is not None else cpus
+        self.condition = asyncio.Condition()
+
+    @staticmethod
+    def available_memory() -> int:
+        try:
+            with open("/proc/meminfo") as file:
+                for line in file:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) * 1024
+        except FileNotFoundError:
+            pass
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+    def __request(self, benchmark: Benchmark) -> tuple[int, int]:
+        return (
+            min(benchmark.cpus, self.total_cpus),
+            min(benchmark.memory, self.total_memory),
+        )
+
+    async def acquire(self, benchmark: Benchmark):
+        cpus, memory = self.__request(benchmark)
+        async with self.condition:
+            await self.condition.wait_for(
+                lambda: self.jobs > 0 and self.cpus >= cpus and self.memory >= memory
+            )
+            self.jobs -= 1
+            self.cpus -= cpus
+            self.memory -= memory
+
+    async def release(self, benchmark: Benchmark):
+        cpus, memory = self.__request(benchmark)
+        async with self.condition:
+            self.jobs += 1
+            self.cpus += cpus
+            self.memory += memory
+            self.condition.notify_all()
+
+
+class OutputLog:
+    """
+    Timestamps and tags streamed lines in-process, also into a log per tag. The
+    stream is read in chunks and split here, progress bars of vagrant and apt
+    redraw a line with carriage returns and may never end it with a newline.
+    """
+
+    chunk_size = 64 * 1024
+    line_break = re.compile(rb"\r\n|\r|\n")
+
+    def __init__(self, log_dir: str):
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+
+    async def stream(self, tag: str, stream: asyncio.StreamReader):
+        with open(f"{self.log_dir}/{tag}.log", "a") as log:
+            pending = b""
+            while chunk := await stream.read(self.chunk_size):
+                data = pending + chunk
+                # a carriage return at the end may be the first half of \r\n
+                held = b"\r" if data.endswith(b"\r") else b""
+                *lines, pending = self.line_break.split(data.removesuffix(held))
+                # a line longer than a chunk is written in pieces
+                if len(pending) >= self.chunk_size and not held:
+                    lines.append(pending)
+                    pending = b""
+                pending += held
+                for line in lines:
+                    self.__write(log, tag, line)
+            if pending := pending.removesuffix(b"\r"):
+                self.__write(log, tag, pending)
+
+    @staticmethod
+    def __write(log, tag: str, line: bytes):
+        line = line.decode(errors="replace")
+        stamped = f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {tag}\t==> {line}"
+        print(stamped, flush=True)
+        log.write(stamped + "\n")
+
+
+class GraphGeneration:
+    """
+    Runs graphs.py after every finished file system, one run at a time. Results
+    that arrive during a run are picked up together by the next one, the last
+    run covers all results. Earlier runs may fail on the results still missing,
+    so only the status of the last one counts.
+    """
+
+    def __init__(self, output: OutputLog, args: list[str]):
+        self.output = output
+        self.args = args
+        self.wake = asyncio.Event()
+        self.pending = False
+        self.finished = False
+        self.runs = 0
+
+    def notify(self, name: str):
+        logger.info(f"Results of {name} arrived, scheduling graph generation")
+        self.pending = True
+        self.wake.set()
+
+    def finish(self):
+        self.finished = True
+        self.wake.set()
+
+    async def run(self) -> int:
+        status = 0
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            if self.pending:
+                self.pending = False
+                status = await self.__generate()
+                if status != 0 and not (self.finished and not self.pending):
+                    logger.warning(
+                        f"Graph generation exited with {status}, results are partial"
+                    )
+            if self.finished and not self.pending:
+                return status
+
+    async def __generate(self) -> int:
+        self.runs += 1
+        logger.info(f"Generate graphs (run {self.runs})")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            GRAPHS_SCRIPT,
+            *self.args,
+            cwd=CURRENT_DIR,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        try:
+            await self.output.stream("graphs", process.stdout)
+            return await process.wait()
+        except BaseException:
+            # cancelled or the output failed, graphs.py must not outlive it
+            if process.returncode is None:
+                process.terminate()
+                await process.wait()
+            raise
+
+
+class Orchestrator:
+    """
+    Runs the run.sh of every file system as a subprocess, as many at once as
+    HostResources allow, and generates graphs as the results arrive. The first
+    failed benchmark stops the others unless keep_going is set.
+    """
+
+    def __init__(
+        self,
+        benchmarks: list[Benchmark],
+        resources: HostResources,
+        output: OutputLog,
+        graphs: GraphGeneration | None,
+        keep_going: bool,
+    ):
+        self.benchmarks = benchmarks
+        self.resources = resources
+        self.output = output
+        self.graphs = graphs
+        self.keep_going = keep_going
+        self.job_log = []
+
+    async def run(self) -> int:
+        logger.info(
+            f"Benchmarking file systems: {' '.join(b.name for b in self.benchmarks)} "
+            f"on {self.resources.total_cpus} cores and "
+            f"{self.resources.total_memory // MiB} MiB of memory"
+        )
+        graphs = asyncio.create_task(self.graphs.run()) if self.graphs else None
+        tasks = [asyncio.create_task(self.__benchmark(b)) for b in self.benchmarks]
+
+        status = 0
+        for task in asyncio.as_completed(tasks):
+            if await task != 0 and status == 0:
+                status = 1
+                if not self.keep_going:
+                    logger.error("Benchmark failed, stopping the others")
+                    for other in tasks:
+                        other.cancel()
+                    break
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.__write_job_log()
+        if graphs is not None:
+            if status != 0 and not self.keep_going:
+                graphs.cancel()
+                await asyncio.gather(graphs, return_exceptions=True)
+            else:
+                self.graphs.finish()
+                status = max(status, await graphs)
+
+        return status
+
+    async def __benchmark(self, benchmark: Benchmark) -> int:
+        await self.resources.acquire(benchmark)
+        start = time.time()
+        status = None
+        try:
+            logger.info(
+                f"Running benchmark for {benchmark.name} "
+                f"({benchmark.cpus} cores, {benchmark.memory // MiB} MiB)"
+            )
+            process = await asyncio.create_subprocess_exec(
+                "bash",
+                "run.sh",
+                cwd=benchmark.directory,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,
+            )
+            try:
+                await self.output.stream(benchmark.name, process.stdout)
+                status = await process.wait()
+            except BaseException:
+                # cancelled or the output failed, stop run.sh and the vagrant
+                # commands it started
+                if process.returncode is None:
+                    with contextlib.suppress(ProcessLookupError):
+                        os.killpg(process.pid, signal.SIGTERM)
+                    await process.wait()
+                raise
+        finally:
+            await self.resources.release(benchmark)
+            self.job_log.append(
+                {
+                    "name": benchmark.name,
+                    "start": start,
+                    "runtime": time.time() - start,
+                    "status": status,
+                }
+            )
+
+        logger.info(f"Benchmark for {benchmark.name} exited with {status}")
+        if status == 0 and self.graphs is not None:
+            self.graphs.notify(benchmark.name)
+        return status
+
+    def __write_job_log(self):
+        with open(f"{self.output.log_dir}/benchmark.json", "w") as file:
+            json.dump(self.job_log, file, indent=2)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="run_benchmarks",
+        description="Run the benchmarks of the file systems and generate graphs",
+    )
+    parser.add_argument(
+        "filesystems",
+        nargs="*",
+        help="directories in fs/ to benchmark (default: all with a run.sh)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="limit of benchmarks running at once (default: number of cores)",
+    )
+    parser.add_argument(
+        "--memory",
+        type=int,
+        metavar="MiB",
+        help="memory for the virtual machines (default: available memory)",
+    )
+    parser.add_argument(
+        "-k",
+        "--keep-going",
+        action="store_true",
+        help="run the remaining benchmarks and graphs after a failed benchmark",
+    )
+    parser.add_argument("--no-graphs", action="store_true", help="do not run graphs.py")
+    parser.epilog = "arguments after -- are passed to graphs.py, ex. -- -b fio"
+
+    argv = sys.argv[1:]
+    split = argv.index("--") if "--" in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    args.graphs_args = argv[split + 1 :]
+    return args
+
+
+def main():
+    args = parse_args()
+    benchmarks = Benchmark.discover(FS_DIR)
+    if len(args.filesystems) > 0:
+        unknown = set(args.filesystems) - {b.name for b in benchmarks}
+        if unknown:
+            sys.exit(f"No run.sh for file systems: {', '.join(sorted(unknown))}")
+        benchmarks = [b for b in benchmarks if b.name in args.filesystems]
+
+    memory = args.memory * MiB if args.memory else HostResources.available_memory()
+    resources = HostResources(os.cpu_count(), memory, args.jobs)
+    output = OutputLog(LOG_DIR)
+    graphs = None if args.no_graphs else GraphGeneration(output, args.graphs_args)
+
+    orchestrator = Orchestrator(benchmarks, resources, output, graphs, args.keep_going)
+    status = asyncio.run(orchestrator.run())
+    if status == 0:
+        logger.info("Finished successfully")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
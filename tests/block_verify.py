@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# Runs in the test boxes too, needs only the python3 of Debian bullseye
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import Pool
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler(sys.stderr))
+logger.handlers[0].setFormatter(
+    logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+)
+
+
+@dataclass
+class BlockManifest:
+    """Digests of the blocks of a file, a JSON header line and the raw digests"""
+
+    path: str
+    size: int
+    block_size: int
+    digests: bytes
+
+    algorithm = "sha256"
+    digest_size = 16  # truncated, collisions are negligible next to damage
+    suffix = ".blocks"
+
+    def blocks(self) -> int:
+        return len(self.digests) // self.digest_size
+
+    def write(self, path: str):
+        header = {
+            "path": os.path.abspath(self.path),
+            "size": self.size,
+            "block_size": self.block_size,
+            "algorithm": self.algorithm,
+            "digest_size": self.digest_size,
+        }
+        with open(path, "wb") as file:
+            file.write(json.dumps(header).encode() + b"\n")
+            file.write(self.digests)
+
+    @staticmethod
+    def read(path: str) -> BlockManifest:
+        with open(path, "rb") as file:
+            header = json.loads(file.readline())
+            digests = file.read()
+
+        if (
+            header["algorithm"] != BlockManifest.algorithm
+            or header["digest_size"] != BlockManifest.digest_size
+        ):
+            raise ValueError(f"Unsupported digests in manifest '{path}'")
+        return BlockManifest(
+            header["path"], header["size"], header["block_size"], digests
+        )
+
+
+def hash_blocks(path: str, offset: int, length: int, block_size: int) -> bytes:
+    """Digests of the blocks in one segment of a file"""
+    digests = bytearray()
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL, offset - offset % mmap.PAGESIZE)
+
+        view = memoryview(mapped)
+        try:
+            for start in range(offset, offset + length, block_size):
+                end = min(start + block_size, offset + length)
+                digest = hashlib.new(BlockManifest.algorithm, view[start:end])
+                digests += digest.digest()[: BlockManifest.digest_size]
+        finally:
+            # the map can be closed only without exported buffers
+            view.release()
+
+    return bytes(digests)
+
+
+def hash_blocks_args(args: tuple) -> bytes:
+    return hash_blocks(*args)
+
+
+@dataclass
+class Verification:
+    path: str
+    bytes: int
+    blocks: int
+    damaged_blocks: int
+    ranges: list[tuple[int, int]]
+    seconds: float
+
+    def damaged_bytes(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    def throughput(self) -> float:
+        """Verified megabytes per second"""
+        return self.bytes / self.seconds / 1e6 if self.seconds > 0 else 0.0
+
+
+class BlockVerifier:
+    """
+    Hashes the blocks of files through mmap on a pool of processes, in segments
+    of whole blocks, and compares them with a manifest. Damaged blocks next to
+    each other are reported as one byte range, a changed size as the range
+    between the old and the new end.
+    """
+
+    segment_size = 64 * 2**20
+
+    def __init__(self, jobs: int = None):
+        self.jobs = jobs or os.cpu_count()
+        self.pool = None
+
+    def __enter__(self):
+        if self.jobs > 1:
+            self.pool = Pool(self.jobs)
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+
+    def digests(self, path: str, block_size: int) -> tuple[int, bytes]:
+        size = os.path.getsize(path)
+        segment_size = max(
+            self.segment_size - self.segment_size % block_size, block_size
+        )
+        segments = [
+            (path, offset, min(segment_size, size - offset), block_size)
+            for offset in range(0, size, segment_size)
+        ]
+        if self.pool is None:
+            parts = map(hash_blocks_args, segments)
+        else:
+            parts = self.pool.imap(hash_blocks_args, segments)
+
+        return size, b"".join(parts)
+
+    def manifest(self, path: str, block_size: int) -> BlockManifest:
+        size, digests = self.digests(path, block_size)
+        return BlockManifest(path, size, block_size, digests)
+
+    def verify(self, manifest: BlockManifest, path: str = None) -> Verification:
+        path = path or manifest.path
+        start = time.perf_counter()
+        size, digests = self.digests(path, manifest.block_size)
+        seconds = time.perf_counter() - start
+
+        n = BlockManifest.digest_size
+        block_size = manifest.block_size
+        common = min(len(digests), len(manifest.digests)) // n
+        damaged = []
+        # whole runs of digests are compared first, blocks only in differing runs
+        run = 4096
+        for first in range(0, common, run):
+            last = min(first + run, common)
+            if digests[first * n : last * n] == manifest.digests[first * n : last * n]:
+                continue
+            damaged += [
+                i
+                for i in range(first, last)
+                if digests[i * n : (i + 1) * n] != manifest.digests[i * n : (i + 1) * n]
+            ]
+
+        ranges = []
+        for i in damaged:
+            begin, end = i * block_size, min((i + 1) * block_size, size, manifest.size)
+            if ranges and ranges[-1][1] == begin:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((begin, end))
+        if size != manifest.size:
+            begin, end = min(size, manifest.size), max(size, manifest.size)
+            if ranges and ranges[-1][1] >= begin:
+                begin = ranges.pop()[0]
+            ranges.append((begin, end))
+
+        return Verification(
+            path, size, len(digests) // n, len(damaged), ranges, seconds
+        )
+
+
+class Report:
+    fields = [
+        "file-name",
+        "file-size",
+        "when",
+        "bytes",
+        "blocks",
+        "damaged-blocks",
+        "damaged-bytes",
+        "damaged-ranges",
+        "seconds",
+        "throughput",
+    ]
+
+    def __init__(self, verifications: list[Verification], file_size: str, when: str):
+        self.verifications = verifications
+        self.rows = [
+            [
+                os.path.basename(v.path),
+                file_size,
+                when,
+                v.bytes,
+                v.blocks,
+                v.damaged_blocks,
+                v.damaged_bytes(),
+                # [start, end) byte ranges
+                ";".join(f"{start}-{end}" for start, end in v.ranges),
+                f"{v.seconds:.6f}",
+                f"{v.throughput():.2f}",
+            ]
+            for v in verifications
+        ]
+
+    def print(self):
+        for v in self.verifications:
+            state = "OK" if not v.ranges else f"{v.damaged_bytes()} bytes damaged"
+            logger.info(
+                f"{v.path}: {state}, {v.bytes} bytes in {v.seconds:.3f} s "
+                f"({v.throughput():.2f} MB/s)"
+            )
+            for start, end in v.ranges:
+                logger.info(f"{v.path}: bytes {start}-{end} differ")
+
+    def append(self, path: str):
+        """Appends to the csv, like the GNU time results of the tests"""
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a") as file:
+            if new:
+                file.write(",".join(self.fields) + "\n")
+            for row in self.rows:
+                file.write(",".join(str(value) for value in row) + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="block_verify",
+        description="Block checksum manifests of files and their verification",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="processes (default: number of cores)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    manifest = commands.add_parser("manifest", help="write manifests of files")
+    manifest.add_argument("files", nargs="+")
+    manifest.add_argument(
+        "-o",
+        "--output-dir",
+        required=True,
+        help=f"directory of the manifests, named after the files with {BlockManifest.suffix}",
+    )
+    manifest.add_argument("-b", "--block-size", type=int, default=4096)
+
+    verify = commands.add_parser("verify", help="compare files with manifests")
+    verify.add_argument("manifests", nargs="+")
+    verify.add_argument("-o", "--output", help="csv the results are appended to")
+    verify.add_argument("--file-size", default="", help="value of the file-size column")
+    verify.add_argument("--when", default="", help="value of the when column")
+    verify.add_argument(
+        "--strict",
+        action="store_true",
+        help="exit with 1 when a file is damaged, after the results are written",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with BlockVerifier(args.jobs) as verifier:
+        if args.command == "manifest":
+            os.makedirs(args.output_dir, exist_ok=True)
+            for path in args.files:
+                manifest = verifier.manifest(path, args.block_size)
+                out = (
+                    f"{args.output_dir}/{os.path.basename(path)}{BlockManifest.suffix}"
+                )
+                manifest.write(out)
+                logger.info(f"{path}: {manifest.blocks()} block digests in {out}")
+            return
+
+        verifications = [
+            verifier.verify(BlockManifest.read(path)) for path in args.manifests
+        ]
+
+    report = Report(verifications, args.file_size, args.when)
+    report.print()
+    if args.output:
+        report.append(args.output)
+    if args.strict and any(v.ranges for v in verifications):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# Runs in the test boxes too (python3 and python3-numpy of Debian bullseye)
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import Pool
+import argparse
+import hashlib
+import logging
+import math
+import mmap
+import os
+import sys
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler(sys.stderr))
+logger.handlers[0].setFormatter(
+    logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+)
+
+DIGEST_SIZE = 16  # truncated sha256, collisions are negligible for counting
+
+
+@dataclass(frozen=True)
+class Chunking:
+    method: str  # fixed or cdc
+    size: int  # block size, or average chunk size of cdc
+
+    FIXED = "fixed"
+    CDC = "cdc"
+
+    def __str__(self):
+        return f"{self.method}-{self.size}"
+
+
+class ContentDefinedChunker:
+    """
+    Cuts after a byte where the sum of random weights of the last 48 bytes is
+    below a limit, at least min_size and at most max_size after the previous
+    cut. The window sums of a whole block come from one cumulative sum and are
+    shared by all average sizes, so only the candidate cuts, about one per
+    average size, are walked in Python.
+    """
+
+    window = 48
+    seed = 29047
+    block_size = 2**20  # bytes of window sums computed at once
+
+    def __init__(self, average_sizes: list[int]):
+        self.min_sizes = [size // 4 for size in average_sizes]
+        self.max_sizes = [size * 4 for size in average_sizes]
+        # a cut is expected every average size - min size bytes after min size
+        self.limits = [
+            np.uint32(2**32 // (size - min_size))
+            for size, min_size in zip(average_sizes, self.min_sizes)
+        ]
+        rng = np.random.default_rng(self.seed)
+        self.weights = rng.integers(0, 2**32, 256, dtype=np.uint64).astype(np.uint32)
+
+    def candidates(self, data: np.ndarray) -> list[np.ndarray]:
+        """Offsets after the bytes where a cut is allowed, per average size"""
+        w = self.window
+        weights = np.empty(self.block_size + w, dtype=np.uint32)
+        sums = np.empty(self.block_size + w, dtype=np.uint32)
+        window_sums = np.empty(self.block_size, dtype=np.uint32)
+        max_limit = max(self.limits, default=0)
+
+        result = [[] for _ in self.limits]
+        for start in range(w, len(data), self.block_size):
+            block = data[start - w : start + self.block_size]
+            n = len(block)
+            np.take(self.weights, block, out=weights[:n])
+            np.cumsum(weights[:n], out=sums[:n])
+            # sum over the window ending at byte start + i, modulo 2**32
+            np.subtract(sums[w:n], sums[: n - w], out=window_sums[: n - w])
+            offsets = np.flatnonzero(window_sums[: n - w] < max_limit)
+            values = window_sums[offsets]
+            for candidates, limit in zip(result, self.limits):
+                candidates.append(offsets[values < limit] + start + 1)
+
+        return [np.concatenate(c) if c else np.empty(0, dtype=np.int64) for c in result]
+
+    def cuts(self, data: np.ndarray) -> list[list[int]]:
+        """End offsets of the chunks of data per average size, ending with len(data)"""
+        result = []
+        for candidates, min_size, max_size in zip(
+            self.candidates(data), self.min_sizes, self.max_sizes
+        ):
+            cuts = []
+            last = 0
+            while last < len(data):
+                i = np.searchsorted(candidates, last + min_size)
+                if i < len(candidates) and candidates[i] - last <= max_size:
+                    last = int(candidates[i])
+                else:
+                    last = min(last + max_size, len(data))
+                cuts.append(last)
+            result.append(cuts)
+
+        return result
+
+
+@dataclass
+class Chunks:
+    """Distinct chunks seen by one chunking, with the bytes scanned"""
+
+    chunking: Chunking
+    total_bytes: int = 0
+    total_chunks: int = 0
+    digests: np.ndarray = None
+    lengths: np.ndarray = None
+
+    def add(self, digests: np.ndarray, lengths: np.ndarray):
+        self.total_bytes += int(lengths.sum())
+        self.total_chunks += len(lengths)
+        self.merge(digests, lengths)
+
+    def merge(self, digests: np.ndarray, lengths: np.ndarray):
+        if self.digests is not None:
+            digests = np.concatenate([self.digests, digests])
+            lengths = np.concatenate([self.lengths, lengths])
+        self.digests, index = np.unique(digests, return_index=True)
+        self.lengths = lengths[index]
+
+    def combine(self, other: Chunks):
+        self.total_bytes += other.total_bytes
+        self.total_chunks += other.total_chunks
+        if other.digests is not None:
+            self.merge(other.digests, other.lengths)
+
+    def unique_bytes(self) -> int:
+        return int(self.lengths.sum()) if self.lengths is not None else 0
+
+    def unique_chunks(self) -> int:
+        return len(self.lengths) if self.lengths is not None else 0
+
+
+def digest_chunks(view: memoryview, cuts: list[int]) -> np.ndarray:
+    digests = bytearray()
+    start = 0
+    for end in cuts:
+        digests += hashlib.sha256(view[start:end]).digest()[:DIGEST_SIZE]
+        start = end
+
+    return np.frombuffer(bytes(digests), dtype=f"V{DIGEST_SIZE}")
+
+
+def scan_fixed(view: memoryview, sizes: list[int]) -> list[tuple]:
+    """
+    Only the smallest blocks are hashed, a larger block is identified by the
+    digests of the small blocks it consists of.
+    """
+    if not sizes:
+        return []
+
+    smallest = sizes[0]
+    cuts = list(range(smallest, len(view), smallest)) + [len(view)]
+    digests = digest_chunks(view, cuts)
+    lengths = np.diff(cuts, prepend=0)
+
+    result = []
+    for size in sizes:
+        k = size // smallest
+        rows = -(-len(digests) // k)
+        padded = np.zeros(rows * k, dtype=digests.dtype)
+        padded[: len(digests)] = digests
+        block_digests = padded.view(f"V{DIGEST_SIZE * k}")
+        block_lengths = np.add.reduceat(lengths, np.arange(0, len(lengths), k))
+        result.append((block_digests, block_lengths))
+
+    return result
+
+
+def scan_segment(
+    path: str, offset: int, length: int, fixed: list[int], cdc: list[int]
+) -> list[Chunks]:
+    """Distinct chunks of one segment of a file, a cdc chunk starts with it"""
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL, offset - offset % mmap.PAGESIZE)
+
+        view = memoryview(mapped)[offset : offset + length]
+        data = np.frombuffer(view, dtype=np.uint8)
+        try:
+            chunks = []
+            for size, (digests, lengths) in zip(fixed, scan_fixed(view, fixed)):
+                chunks.append(Chunks(Chunking(Chunking.FIXED, size)))
+                chunks[-1].add(digests, lengths)
+
+            for size, cuts in zip(cdc, ContentDefinedChunker(cdc).cuts(data)):
+                chunks.append(Chunks(Chunking(Chunking.CDC, size)))
+                chunks[-1].add(digest_chunks(view, cuts), np.diff(cuts, prepend=0))
+        finally:
+            # the map can be closed only without exported buffers
+            del data
+            view.release()
+
+    return chunks
+
+
+def scan_segment_args(args: tuple) -> list[Chunks]:
+    return scan_segment(*args)
+
+
+class DedupPotential:
+    """
+    Bytes that deduplication could reclaim from a set of files, with fixed
+    blocks of several sizes and with content-defined chunks of several average
+    sizes. Files are memory mapped and scanned in segments on all cores. A
+    segment is a multiple of every fixed block size, cdc restarts at its
+    start, which may split one chunk per segment compared to a single pass.
+    """
+
+    segment_size = 64 * 2**20
+
+    def __init__(self, fixed: list[int], cdc: list[int], jobs: int = None):
+        self.fixed = sorted(fixed)
+        self.cdc = sorted(cdc)
+        self.jobs = jobs or os.cpu_count()
+        alignment = math.lcm(*self.fixed) if self.fixed else 1
+        self.segment_size -= self.segment_size % alignment
+        self.segment_size = max(self.segment_size, alignment)
+
+    @staticmethod
+    def files(paths: list[str]) -> list[str]:
+        result = []
+        for path in paths:
+            if os.path.isdir(path):
+                for subdir, _, files in os.walk(path):
+                    result.extend(
+                        os.path.join(subdir, f)
+                        for f in sorted(files)
+                        if os.path.isfile(os.path.join(subdir, f))
+                        and not os.path.islink(os.path.join(subdir, f))
+                    )
+            else:
+                result.append(path)
+
+        return result
+
+    def segments(self, files: list[str]):
+        for path in files:
+            size = os.path.getsize(path)
+            for offset in range(0, size, self.segment_size):
+                length = min(self.segment_size, size - offset)
+                yield path, offset, length, self.fixed, self.cdc
+
+    def scan(self, paths: list[str]) -> list[Chunks]:
+        files = self.files(paths)
+        segments = list(self.segments(files))
+        logger.info(
+            f"Scanning {len(files)} files in {len(segments)} segments "
+            f"on {self.jobs} processes"
+        )
+
+        result = [Chunks(Chunking(Chunking.FIXED, size)) for size in self.fixed]
+        result += [Chunks(Chunking(Chunking.CDC, size)) for size in self.cdc]
+        if self.jobs == 1:
+            scanned = map(scan_segment_args, segments)
+            for chunks in scanned:
+                for total, part in zip(result, chunks):
+                    total.combine(part)
+            return result
+
+        with Pool(self.jobs) as pool:
+            for chunks in pool.imap_unordered(scan_segment_args, segments):
+                for total, part in zip(result, chunks):
+                    total.combine(part)
+
+        return result
+
+
+class Report:
+    fields = [
+        "method",
+        "block-size",
+        "total-bytes",
+        "unique-bytes",
+        "reclaimable-bytes",
+        "total-chunks",
+        "unique-chunks",
+        "file-size",
+    ]
+
+    def __init__(self, chunks: list[Chunks], file_size: str = ""):
+        self.rows = [
+            [
+                c.chunking.method,
+                c.chunking.size,
+                c.total_bytes,
+                c.unique_bytes(),
+                c.total_bytes - c.unique_bytes(),
+                c.total_chunks,
+                c.unique_chunks(),
+                file_size,
+            ]
+            for c in chunks
+        ]
+
+    def print(self):
+        for method, size, total, unique, reclaimable, *_ in self.rows:
+            ratio = reclaimable / total * 100 if total else 0
+            logger.info(
+                f"{method:>5} {size:>8}: {reclaimable} of {total} bytes "
+                f"reclaimable ({ratio:.2f}%), {unique} unique"
+            )
+
+    def append(self, path: str):
+        """Appends to the csv, like the GNU time results of the tests"""
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a") as file:
+            if new:
+                file.write(",".join(self.fields) + "\n")
+            for row in self.rows:
+                file.write(",".join(str(value) for value in row) + "\n")
+
+
+def size(value: str) -> int:
+    """Size with an optional k, m or g suffix (powers of 1024)"""
+    value = value.strip().lower().removesuffix("ib").removesuffix("b")
+    units = {"k": 2**10, "m": 2**20, "g": 2**30}
+    if value and value[-1] in units:
+        return int(value[:-1]) * units[value[-1]]
+    return int(value)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="dedup_potential",
+        description="Estimate the bytes deduplication could reclaim from files",
+    )
+    parser.add_argument("paths", nargs="+", help="files and directories to scan")
+    parser.add_argument(
+        "-b",
+        "--block-sizes",
+        nargs="*",
+        type=size,
+        default=[4096, 16384, 65536, 131072],
+        help="fixed block sizes, multiples of the smallest one",
+    )
+    parser.add_argument(
+        "-c",
+        "--cdc-sizes",
+        nargs="*",
+        type=size,
+        default=[8192, 65536],
+        help="average chunk sizes of content-defined chunking",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="processes (default: number of cores)"
+    )
+    parser.add_argument("-o", "--output", help="csv the results are appended to")
+    parser.add_argument(
+        "--file-size",
+        default="",
+        help="value of the file-size column, ex. the generated size of the test",
+    )
+    args = parser.parse_args()
+
+    smallest = min(args.block_sizes, default=1)
+    if any(size % smallest for size in args.block_sizes):
+        parser.error("fixed block sizes must be multiples of the smallest one")
+    if any(size < 64 for size in args.cdc_sizes):
+        parser.error("cdc average sizes must be at least 64 bytes")
+    return args
+
+
+def main():
+    args = parse_args()
+    potential = DedupPotential(args.block_sizes, args.cdc_sizes, args.jobs)
+    report = Report(potential.scan(args.paths), args.file_size)
+    report.print()
+    if args.output:
+        report.append(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# Runs in the test boxes too, needs only the python3 of Debian bullseye
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import argparse
+import configparser
+import itertools
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler(sys.stderr))
+logger.handlers[0].setFormatter(
+    logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+)
+
+
+@dataclass(frozen=True)
+class Variant:
+    """One point of the parameter grid, a job file in its own directory"""
+
+    blocksize: str
+    iodepth: int
+    ioengine: str
+
+    # engines that complete every I/O before submitting the next one
+    synchronous_engines = ("sync", "psync", "vsync", "pvsync", "pvsync2")
+    job_filename = "fio-job.cfg"
+
+    def name(self) -> str:
+        return f"{self.ioengine}-bs{self.blocksize}-qd{self.iodepth}"
+
+    def is_redundant(self) -> bool:
+        """A queue deeper than 1 is the same job for a synchronous engine"""
+        return self.ioengine in self.synchronous_engines and self.iodepth > 1
+
+
+class JobSweep:
+    """
+    Variants of a fio job file over block size, iodepth and ioengine. Logs of
+    the job file are left out, fio reports a variant in its json output, and
+    every variant runs once for at most runtime seconds.
+    """
+
+    logs = ("write_bw_log", "write_lat_log", "write_iops_log", "write_hist_log")
+
+    def __init__(self, job_file: str, loops: int, runtime: int, direct: bool):
+        self.config = configparser.ConfigParser(interpolation=None)
+        # keys of fio are case sensitive
+        self.config.optionxform = str
+        self.config.read(job_file)
+        self.loops = loops
+        self.runtime = runtime
+        self.direct = direct
+
+    @staticmethod
+    def variants(
+        blocksizes: list[str], iodepths: list[int], ioengines: list[str]
+    ) -> list[Variant]:
+        variants = [
+            Variant(blocksize, iodepth, ioengine)
+            for ioengine, blocksize, iodepth in itertools.product(
+                ioengines, blocksizes, iodepths
+            )
+        ]
+        skipped = [variant for variant in variants if variant.is_redundant()]
+        if skipped:
+            logger.info(
+                f"Skipping {len(skipped)} variants with iodepth above 1 "
+                "of synchronous engines"
+            )
+        return [variant for variant in variants if not variant.is_redundant()]
+
+    def write(self, variant: Variant, output_dir: str) -> str:
+        config = configparser.ConfigParser(interpolation=None)
+        config.optionxform = str
+        config.read_dict(self.config)
+
+        options = config["global"]
+        for log in self.logs:
+            options.pop(log, None)
+        options["blocksize"] = variant.blocksize
+        options["iodepth"] = str(variant.iodepth)
+        options["ioengine"] = variant.ioengine
+        options["loops"] = str(self.loops)
+        options["runtime"] = str(self.runtime)
+        if self.direct:
+            options["direct"] = "1"
+
+        directory = f"{output_dir}/{variant.name()}"
+        os.makedirs(directory, exist_ok=True)
+        path = f"{directory}/{Variant.job_filename}"
+        with open(path, "w") as file:
+            config.write(file, space_around_delimiters=False)
+        return path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="fio_sweep",
+        description="Job files of a fio job over a grid of block sizes, "
+        "iodepths and ioengines, one directory per variant",
+    )
+    parser.add_argument("job_file")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("-b", "--blocksizes", nargs="+", default=["4k", "64k", "1m"])
+    parser.add_argument("-d", "--iodepths", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument(
+        "-e",
+        "--ioengines",
+        nargs="+",
+        default=["sync", "psync", "libaio", "io_uring"],
+    )
+    parser.add_argument("--loops", type=int, default=1)
+    parser.add_argument(
+        "--runtime", type=int, default=30, help="limit of a variant in seconds"
+    )
+    parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="bypass the page cache, asynchronous engines queue only direct I/O",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sweep = JobSweep(args.job_file, args.loops, args.runtime, args.direct)
+    variants = sweep.variants(args.blocksizes, args.iodepths, args.ioengines)
+    for variant in variants:
+        # the directories of the variants for the test script
+        print(os.path.dirname(sweep.write(variant, args.output_dir)))
+    logger.info(f"{len(variants)} variants of {args.job_file} in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -83,6 +83,45 @@ fio_test() {
     destroy_fs
 }
 
+fio_sweep_test() {
+    DIR=$OUTPUT_DIRECTORY/fio-sweep
+    CFG_FILE=/tests/fio-job.cfg
+    SWEEP_DIR=/tmp/fio-sweep
+
+	echo "################################################################################"
+	echo "### Fio parameter sweep for cfg file $CFG_FILE, output directory $DIR"
+	echo "################################################################################"
+
+    # fuse file systems may refuse O_DIRECT, their engines queue buffered I/O
+    DIRECT=()
+    if [[ $FS_NAME != COPYFS && $FS_NAME != WAYBACKFS ]]; then
+        DIRECT=(--direct)
+    fi
+
+    VARIANTS=$(python3 /tests/fio_sweep.py $CFG_FILE \
+        --output-dir $SWEEP_DIR \
+        --blocksizes "${FIO_SWEEP_BLOCK_SIZES[@]}" \
+        --iodepths "${FIO_SWEEP_IODEPTHS[@]}" \
+        --ioengines "${FIO_SWEEP_IOENGINES[@]}" \
+        --runtime $FIO_SWEEP_RUNTIME \
+        "${DIRECT[@]}")
+
+    for VARIANT in $VARIANTS; do
+        OUT=$DIR/$(basename $VARIANT)
+        mkdir -pv $OUT
+        cp $VARIANT/fio-job.cfg $OUT/
+
+        for TEST in random_read_test random_write_test sequential_read_test sequential_write_test; do
+            mount_fs
+            pushd $DESTINATION
+                fio $VARIANT/fio-job.cfg --section $TEST \
+                    --output-format=json --output=$OUT/$TEST.json
+            popd
+            destroy_fs
+        done
+    done
+}
+
 main() {
     echo "################################################################################"
 	echo "################################################################################"
@@ -99,6 +138,10 @@ main() {
 
     fio_test
 
+    if [[ $FIO_SWEEP -eq 1 ]]; then
+        fio_sweep_test
+    fi
+
     echo "################################################################################"
 	echo "################################################################################"
 	echo "### FINISHED PERFORMANCE TEST"
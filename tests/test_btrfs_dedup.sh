@@ -23,7 +23,11 @@ setup() {
 	df > "$DIR/df_before_deduplication_${TOOL_NAME}_${GEN_SIZE}.txt"
 
 	calculate_csum $DIR $GEN_SIZE
+	create_block_manifests
+	verify_blocks $DIR $GEN_SIZE before
 	validate_csum $DIR $GEN_SIZE before
+	estimate_dedup_potential $DIR $GEN_SIZE
+	measure_fragmentation $DIR $GEN_SIZE before
 }
 
 setup_not_same() {
@@ -45,7 +49,11 @@ setup_not_same() {
 	df > "$DIR/df_before_deduplication_${TOOL_NAME}_${GEN_SIZE}.txt"
 
 	calculate_csum $DIR $GEN_SIZE
+	create_block_manifests
+	verify_blocks $DIR $GEN_SIZE before
 	validate_csum $DIR $GEN_SIZE before
+	estimate_dedup_potential $DIR $GEN_SIZE
+	measure_fragmentation $DIR $GEN_SIZE before
 }
 
 teardown() {
@@ -56,7 +64,9 @@ teardown() {
 	echo "Saving filesystem size after deduplication"
 	remount_fs
 	df > "$DIR/df_after_deduplication_${TOOL_NAME}_${GEN_SIZE}.txt"
+	verify_blocks $DIR $GEN_SIZE after
 	validate_csum $DIR $GEN_SIZE after
+	measure_fragmentation $DIR $GEN_SIZE after
 	destroy_fs
 }
 
@@ -16,6 +16,15 @@ FILESYSTEM_FILE_SIZE=20GiB
 OUTPUT_DIRECTORY=/vagrant/out
 LOOP_INTERFACE=/dev/loop0
 DEDUP_TEST_RANGE_END=64
+BLOCK_MANIFEST_DIRECTORY=/tmp/block-manifests
+# 1 runs the fio job over the grid below after the fio test, slow
+FIO_SWEEP=0
+FIO_SWEEP_BLOCK_SIZES=(4k 64k 1m)
+FIO_SWEEP_IODEPTHS=(1 4 16 64)
+FIO_SWEEP_IOENGINES=(sync psync libaio io_uring)
+FIO_SWEEP_RUNTIME=30
+FRAGMENTATION_FIO_CONFIG=/tests/fio-fragmentation.cfg
+FRAGMENTATION_RUNTIME=5
 
 calculate_csum() {
 	DIR=$1
@@ -50,6 +59,61 @@ calculate_csum() {
 	echo ",${GEN_SIZE},f2" >> $TIME_FILE
 }
 
+create_block_manifests() {
+	python3 /tests/block_verify.py manifest \
+		--output-dir $BLOCK_MANIFEST_DIRECTORY \
+		$DESTINATION/f1 $DESTINATION/f2
+}
+
+# before validate_csum, which stops the test on a damaged file
+verify_blocks() {
+	DIR=$1
+	GEN_SIZE=$2
+	WHEN=$3
+
+	python3 /tests/block_verify.py verify \
+		--file-size $GEN_SIZE \
+		--when $WHEN \
+		--output $DIR/block-verify.csv \
+		$BLOCK_MANIFEST_DIRECTORY/f1.blocks $BLOCK_MANIFEST_DIRECTORY/f2.blocks
+}
+
+estimate_dedup_potential() {
+	DIR=$1
+	GEN_SIZE=$2
+
+	python3 /tests/dedup_potential.py \
+		--file-size $GEN_SIZE \
+		--output $DIR/dedup-potential.csv \
+		$DESTINATION/f1 $DESTINATION/f2
+}
+
+# read performance of the generated files and their extents, the layout
+# deduplication changes, logs go to fragmentation/GEN_SIZE/WHEN/FILE
+measure_fragmentation() {
+	DIR=$1
+	GEN_SIZE=$2
+	WHEN=$3
+
+	for FILE in f1 f2; do
+		LOG_DIR=$DIR/fragmentation/$GEN_SIZE/$WHEN/$FILE
+		mkdir -p $LOG_DIR
+		filefrag -v $DESTINATION/$FILE > $LOG_DIR/extents.filefrag
+
+		for TEST in sequential_read_test random_read_test; do
+			# reads of the previous test or checksum must not hit the cache
+			sync
+			echo 3 > /proc/sys/vm/drop_caches
+			(
+				cd $LOG_DIR
+				FRAGMENTATION_FILE=$DESTINATION/$FILE \
+				FRAGMENTATION_RUNTIME=$FRAGMENTATION_RUNTIME \
+					fio $FRAGMENTATION_FIO_CONFIG --section $TEST
+			)
+		done
+	done
+}
+
 validate_csum() {
 	DIR=$1
 	GEN_SIZE=$2
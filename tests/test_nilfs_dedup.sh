@@ -47,7 +47,11 @@ dedup_test() {
 	remount_fs
 
 	calculate_csum $DIR $GEN_SIZE
+	create_block_manifests
+	verify_blocks $DIR $GEN_SIZE before
 	validate_csum $DIR $GEN_SIZE before
+	estimate_dedup_potential $DIR $GEN_SIZE
+	measure_fragmentation $DIR $GEN_SIZE before
 
 	df > $DIR/df_before_deduplication_dedup_$GEN_SIZE.txt
 
@@ -56,7 +60,9 @@ dedup_test() {
 	echo "Saving filesystem size after deduplication"
 	remount_fs
 
+	verify_blocks $DIR $GEN_SIZE after
 	validate_csum $DIR $GEN_SIZE after
+	measure_fragmentation $DIR $GEN_SIZE after
 
 	df > $DIR/df_after_deduplication_dedup_$GEN_SIZE.txt
 	destroy_fs
@@ -84,7 +90,11 @@ dedup_test_not_same() {
 	remount_fs
 
 	calculate_csum $DIR $GEN_SIZE
+	create_block_manifests
+	verify_blocks $DIR $GEN_SIZE before
 	validate_csum $DIR $GEN_SIZE before
+	estimate_dedup_potential $DIR $GEN_SIZE
+	measure_fragmentation $DIR $GEN_SIZE before
 
 	df > $DIR/df_before_deduplication_dedup_$GEN_SIZE.txt
 
@@ -93,7 +103,9 @@ dedup_test_not_same() {
 	echo "Saving filesystem size after deduplication"
 	remount_fs
 
+	verify_blocks $DIR $GEN_SIZE after
 	validate_csum $DIR $GEN_SIZE after
+	measure_fragmentation $DIR $GEN_SIZE after
 
 	df > $DIR/df_after_deduplication_dedup_$GEN_SIZE.txt
 	destroy_fs